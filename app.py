@@ -1,25 +1,157 @@
 import os
+import hashlib
+import threading
+import time
 import uuid
-from flask import Flask, request, render_template, render_template_string
+from flask import (
+    Flask, Request, Response, request, render_template, jsonify, send_from_directory, abort,
+    redirect, url_for, make_response
+)
 from werkzeug.utils import secure_filename
-from main import generate_map
+from main import analyze_photos, load_track, render_map
+from src.instrumentation import PipelineMetrics, get_metrics_registry
+from src.jobs import JobFailed, JobQueue, QueueFullError
+from src.model_registry import DEFAULT_MODEL_KEY, get_registry
+from src.photo_locator import MAX_UTC_OFFSET_S
+from src.render_cache import RenderCache, hash_inputs
+from src.scene_cache import default_cache_stats
+from src.session_store import SessionStore
+from src.thumbnails import THUMBNAIL_DIRNAME, ThumbnailGenerator
+from src.uploads import MAX_REQUEST_MB, PhotoUploader, UploadRejected, capped_stream_factory, save_gpx
+from src.visualizer import AURA_MODES, ROUTE_METRICS
+
+class UploadRequest(Request):
+    """
+    multipart 파싱 중에 파일별 크기 제한을 적용하는 요청 클래스.
+    """
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return capped_stream_factory(total_content_length, content_type, filename, content_length)
 
 app = Flask(__name__)
+app.request_class = UploadRequest
+# 요청 전체 크기 제한 (초과 시 본문을 읽기 전에 413 으로 거절)
+app.config['MAX_CONTENT_LENGTH'] = MAX_REQUEST_MB * 1024 * 1024
 
 # --- 경로 설정 ---
 project_root = os.path.dirname(os.path.abspath(__file__))
-GPX_SAVE_DIR = os.path.join(project_root, 'data', 'gpx')
-TEMP_UPLOAD_DIR = os.path.join(project_root, 'data', 'uploads') # 사진 임시 업로드 폴더
+TEMP_UPLOAD_DIR = os.path.join(project_root, 'data', 'uploads') # 세션별 업로드 폴더 (GPX, 사진, 중간 결과)
+JOB_STATE_DIR = os.path.join(project_root, 'data', 'jobs') # 작업 상태/결과 (워커 프로세스 간 공유)
+
+# 썸네일을 지도 HTML 에 인라인하지 않고 /thumbs 경로의 정적 파일로 제공할지 여부
+SERVE_THUMBNAILS = os.environ.get('RUNNERS_VIEW_SERVE_THUMBNAILS', '1') == '1'
+# 렌더링 캐시에 저장할 때 세션별 썸네일 URL(/thumbs/<session_id>) 대신 넣는 문자열
+THUMBS_URL_PLACEHOLDER = '__RUNNERS_VIEW_THUMBS__'
+
+# 지도 생성 작업 워커 수와 대기열 크기 (대기열이 가득 차면 503 으로 거절)
+JOB_WORKERS = int(os.environ.get('RUNNERS_VIEW_JOB_WORKERS', '2'))
+JOB_QUEUE_SIZE = int(os.environ.get('RUNNERS_VIEW_JOB_QUEUE_SIZE', '16'))
+job_queue = JobQueue(max_workers=JOB_WORKERS, max_queue=JOB_QUEUE_SIZE, state_dir=JOB_STATE_DIR)
+
+# 세션별 중간 결과(gpx_df, photo_df)와 렌더링 옵션 (사진 추가/삭제, 스타일 변경 시 재사용)
+# 마지막 사용 후 SESSION_TTL_HOURS 가 지난 세션 폴더와 작업 기록은 CLEANUP_INTERVAL_SECONDS 마다 삭제
+SESSION_TTL_HOURS = float(os.environ.get('RUNNERS_VIEW_SESSION_TTL_HOURS', '24'))
+CLEANUP_INTERVAL_SECONDS = int(os.environ.get('RUNNERS_VIEW_CLEANUP_INTERVAL', '600'))
+session_store = SessionStore(TEMP_UPLOAD_DIR, ttl_seconds=SESSION_TTL_HOURS * 3600)
+
+ALLOWED_PHOTO_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.heic']
+photo_uploader = PhotoUploader()
+
+# 스타일 변경 요청에서 받을 수 있는 렌더링 옵션과 변환 함수
+RENDER_OPTIONS = {
+    'aura_mode': str,
+    'simplify_tolerance_m': float,
+    'hr_bins': int,
+    'color_by': str,
+    'split_m': float,
+    'max_hr': float,
+}
+
+# 숫자 렌더링 옵션의 허용 범위 (최솟값, 최댓값). 너무 작은 구간 간격처럼 지도가 지나치게 커지는 값도 막음.
+RENDER_OPTION_RANGES = {
+    'simplify_tolerance_m': (0, 1000),
+    'hr_bins': (1, 100),
+    'split_m': (100, 100000),
+    'max_hr': (100, 250),
+}
+
+# 같은 입력(GPX, 사진, 렌더링 옵션)의 렌더링 결과 HTML 캐시 (디스크, LRU)
+RENDER_CACHE_MB = int(os.environ.get('RUNNERS_VIEW_RENDER_CACHE_MB', '1024'))
+render_cache = RenderCache(max_bytes=RENDER_CACHE_MB * 1024 * 1024) if RENDER_CACHE_MB > 0 else None
+
+BUSY_RESPONSE = ("서버가 혼잡합니다. 잠시 후 다시 시도해주세요.", 503, {'Retry-After': '30'})
+
+RESULT_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+    <title>Runner's View</title>
+    <style>
+        body { font-family: sans-serif; margin: 0; }
+        .container { display: flex; flex-direction: column; height: 100vh; }
+        .header { 
+            background-color: #f8f9fa; padding: 0 20px; border-bottom: 1px solid #dee2e6;
+            position: fixed;
+            top: 0;
+            width: 100%;
+            z-index: 1001;
+            box-sizing: border-box;
+            display: flex;
+            justify-content: space-between;
+            align-items: center;
+            height: 60px;
+        }
+        .header h1 {
+            font-size: 1.5em;
+            margin: 0;
+        }
+        .header .back-button {
+            background-color: white; padding: 8px 12px; border-radius: 5px;
+            box-shadow: 0 2px 5px rgba(0,0,0,0.1); text-decoration: none; color: black;
+            font-weight: bold;
+        }
+        .header .back-button:hover {
+            background-color: #f0f0f0;
+        }
+        .header-placeholder { /* 제목 중앙 정렬을 위한 빈 공간 */
+            width: 120px;
+        }
+        .map-container { 
+            flex-grow: 1; 
+            margin-top: 60px; /* 고정된 헤더 높이만큼 마진 추가 */
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <a href="/" class="back-button"> &larr; 다시 업로드</a>
+            <h1>Runner's View</h1>
+            <div class="header-placeholder"></div>
+        </div>
+        <div class="map-container">
+            {{ map_html|safe }}
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+# 결과 페이지 ETag 에 포함 (페이지 틀이 바뀌면 브라우저 캐시도 무효화)
+RESULT_PAGE_HASH = hashlib.sha256(RESULT_PAGE_TEMPLATE.encode('utf-8')).hexdigest()[:12]
+
+# 지도 HTML 을 메모리에 모두 올리지 않고 결과 파일에서 스트리밍하도록 페이지 틀을 앞/뒤로 나눔
+RESULT_PAGE_HEAD, RESULT_PAGE_TAIL = RESULT_PAGE_TEMPLATE.split('{{ map_html|safe }}')
+RESULT_CHUNK_SIZE = 256 * 1024
 
 # 서버 시작 시 폴더 생성
-os.makedirs(GPX_SAVE_DIR, exist_ok=True)
 os.makedirs(TEMP_UPLOAD_DIR, exist_ok=True)
+os.makedirs(JOB_STATE_DIR, exist_ok=True)
 
 @app.route('/', methods=['GET', 'POST'])
 def upload_and_display():
     """
     GET: 파일 업로드 페이지 렌더링.
-    POST: 업로드된 GPX와 사진 파일 처리 후 지도 시각화 결과 반환.
+    POST: 업로드된 GPX와 사진 파일을 저장하고 지도 생성 작업을 대기열에 등록.
+          작업 대기 페이지로 이동 (Accept: application/json 이면 작업 ID 를 JSON 으로 반환).
     """
     if request.method == 'POST':
         if 'gpx_file' not in request.files:
@@ -31,97 +163,403 @@ def upload_and_display():
         if gpx_file.filename == '':
             return "GPX 파일이 선택되지 않음", 400
 
-        # 1. GPX 파일 저장
-        gpx_filename = "mock_run.gpx"
-        gpx_path = os.path.join(GPX_SAVE_DIR, gpx_filename)
-        gpx_file.save(gpx_path)
+        try:
+            photo_options = parse_photo_options(request.form)
+        except ValueError as e:
+            return str(e), 400
+
+        # 대기열이 가득 찼다면 파일을 저장하기 전에 거절
+        if job_queue.is_full():
+            return BUSY_RESPONSE
 
-        # 2. 사진 파일 저장 (세션별 임시 폴더)
+        # 1. GPX 파일 저장 (요청마다 별도의 세션 폴더에 저장하므로 동시 요청끼리 섞이지 않음)
         session_id = str(uuid.uuid4())
-        photo_session_dir = os.path.join(TEMP_UPLOAD_DIR, session_id)
-        os.makedirs(photo_session_dir, exist_ok=True)
-
-        for photo in photo_files:
-            if photo and photo.filename != '':
-                basename, extension = os.path.splitext(photo.filename)
-                
-                allowed_extensions = ['.jpg', '.jpeg', '.png', '.heic']
-                if not extension or extension.lower() not in allowed_extensions:
-                    continue
-
-                safe_basename = secure_filename(basename)
-                if not safe_basename:
-                    safe_basename = str(uuid.uuid4())
-                
-                final_filename = f"{safe_basename}{extension}"
-                save_path = os.path.join(photo_session_dir, final_filename)
-                photo.save(save_path)
+        photo_session_dir = session_store.create(session_id)
+        try:
+            save_gpx(gpx_file, session_store.gpx_path(session_id))
+        except UploadRejected as e:
+            session_store.delete(session_id)
+            return f"GPX 파일 오류: {e}", 400
+        session_store.save(session_id, photo_options=photo_options)
+
+        # 2. 사진 파일 저장 및 검증 (같은 세션 폴더)
+        saved, rejected = photo_uploader.save_all(photo_files, photo_session_dir)
         
-        # 3. 지도 생성 로직 호출
-        folium_map = generate_map(gpx_path, photo_session_dir)
-
-        if folium_map is None:
-            return "지도 생성 실패. GPX 파일 확인 필요.", 500
-
-        # 4. 결과 HTML 페이지 렌더링
-        map_html = folium_map._repr_html_()
-        return render_template_string("""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <title>Runner's View</title>
-                <style>
-                    body { font-family: sans-serif; margin: 0; }
-                    .container { display: flex; flex-direction: column; height: 100vh; }
-                    .header { 
-                        background-color: #f8f9fa; padding: 0 20px; border-bottom: 1px solid #dee2e6;
-                        position: fixed;
-                        top: 0;
-                        width: 100%;
-                        z-index: 1001;
-                        box-sizing: border-box;
-                        display: flex;
-                        justify-content: space-between;
-                        align-items: center;
-                        height: 60px;
-                    }
-                    .header h1 {
-                        font-size: 1.5em;
-                        margin: 0;
-                    }
-                    .header .back-button {
-                        background-color: white; padding: 8px 12px; border-radius: 5px;
-                        box-shadow: 0 2px 5px rgba(0,0,0,0.1); text-decoration: none; color: black;
-                        font-weight: bold;
-                    }
-                    .header .back-button:hover {
-                        background-color: #f0f0f0;
-                    }
-                    .header-placeholder { /* 제목 중앙 정렬을 위한 빈 공간 */
-                        width: 120px;
-                    }
-                    .map-container { 
-                        flex-grow: 1; 
-                        margin-top: 60px; /* 고정된 헤더 높이만큼 마진 추가 */
-                    }
-                </style>
-            </head>
-            <body>
-                <div class="container">
-                    <div class="header">
-                        <a href="/" class="back-button"> &larr; 다시 업로드</a>
-                        <h1>Runner's View</h1>
-                        <div class="header-placeholder"></div>
-                    </div>
-                    <div class="map-container">
-                        {{ map_html|safe }}
-                    </div>
-                </div>
-            </body>
-            </html>
-        """, map_html=map_html)
+        # 3. 지도 생성 작업을 대기열에 등록
+        try:
+            job = submit_session_job(session_id)
+        except QueueFullError:
+            session_store.delete(session_id)
+            return BUSY_RESPONSE
+
+        if request.accept_mimetypes.best == 'application/json':
+            return job_response(job, session_id, saved, rejected)
+        return redirect(url_for('job_page', job_id=job.id))
 
     return render_template('index.html')
 
+def cleanup_expired():
+    """
+    만료된 세션 폴더와 오래된 작업 상태/결과 파일을 삭제.
+    """
+    session_store.cleanup()
+    job_queue.cleanup_state(SESSION_TTL_HOURS * 3600)
+
+_cleanup_started = threading.Event()
+
+def start_cleanup_thread():
+    """
+    CLEANUP_INTERVAL_SECONDS 마다 cleanup_expired() 를 실행하는 백그라운드 스레드를 시작.
+    작업 워커처럼 첫 작업 등록 시점에 프로세스당 한 번 시작 (gunicorn fork 이후에 생성되도록).
+    """
+    if CLEANUP_INTERVAL_SECONDS <= 0 or _cleanup_started.is_set():
+        return
+    _cleanup_started.set()
+
+    def loop():
+        while True:
+            try:
+                cleanup_expired()
+            except Exception as e:
+                print(f"Error cleaning up expired sessions: {e}")
+            time.sleep(CLEANUP_INTERVAL_SECONDS)
+
+    threading.Thread(target=loop, name='session-cleanup', daemon=True).start()
+
+def parse_render_options(data):
+    """
+    요청 JSON 에서 렌더링 옵션을 검증하여 반환. 잘못된 값이면 ValueError.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("렌더링 옵션은 JSON 객체여야 함")
+
+    unknown = set(data) - set(RENDER_OPTIONS)
+    if unknown:
+        raise ValueError(f"알 수 없는 옵션: {', '.join(sorted(unknown))}")
+
+    options = {}
+    for name, value in data.items():
+        # null 은 기본값 사용 (옵션을 생략한 것과 같음)
+        if value is None:
+            continue
+        try:
+            options[name] = RENDER_OPTIONS[name](value)
+        except (TypeError, ValueError):
+            raise ValueError(f"잘못된 옵션 값: {name}={value!r}")
+
+    for name, (low, high) in RENDER_OPTION_RANGES.items():
+        if name in options and not low <= options[name] <= high:
+            raise ValueError(f"{name} 는 {low} ~ {high} 범위여야 함")
+
+    if options.get('aura_mode', 'layer') not in AURA_MODES:
+        raise ValueError(f"aura_mode 는 {', '.join(AURA_MODES)} 중 하나여야 함")
+    if options.get('color_by', 'heart_rate') not in ROUTE_METRICS:
+        raise ValueError(f"color_by 는 {', '.join(ROUTE_METRICS)} 중 하나여야 함")
+    return options
+
+def parse_photo_options(form):
+    """
+    업로드 폼에서 사진 위치 옵션을 읽어 ImageAnalyzer 인자로 반환. 잘못된 값이면 ValueError.
+    - clock_offset_s: 카메라 시계 보정값(초)
+    - utc_offset_h: 시간대 정보가 없는 사진의 UTC 오프셋(시간, 예: 9). 비우면 경로 시각으로 추정
+    """
+    options = {}
+    for field, name, scale, limit in (
+        ('clock_offset_s', 'clock_offset_s', 1, 86400),
+        ('utc_offset_h', 'utc_offset_s', 3600, MAX_UTC_OFFSET_S),
+    ):
+        raw = (form.get(field) or '').strip()
+        if not raw:
+            continue
+        try:
+            value = float(raw) * scale
+        except ValueError:
+            raise ValueError(f"잘못된 옵션 값: {field}={raw!r}")
+        if not abs(value) <= limit:
+            raise ValueError(f"{field} 범위 초과: {raw}")
+        options[name] = value
+    return options
+
+def submit_session_job(session_id, render_options=None, reanalyze=True):
+    start_cleanup_thread()
+    image_base_url = f"/thumbs/{session_id}" if SERVE_THUMBNAILS else None
+    return job_queue.submit(
+        run_map_job, session_id, image_base_url, render_options=render_options, reanalyze=reanalyze
+    )
+
+def job_response(job, session_id, saved=(), rejected=()):
+    """
+    작업 등록 응답. saved 는 세션에 실제로 저장된 사진 파일 이름 (확장자가 판별된 형식으로 바뀌거나
+    이름이 겹치면 임의의 접미사가 붙으므로, 사진을 삭제할 때는 이 이름을 사용).
+    """
+    return jsonify({
+        'job_id': job.id,
+        'session_id': session_id,
+        'saved': list(saved),
+        'rejected': [{'filename': name, 'reason': reason} for name, reason in rejected],
+        'status_url': url_for('job_status', job_id=job.id),
+        'result_url': url_for('job_result', job_id=job.id),
+    }), 202
+
+def run_map_job(job, session_id, image_base_url, render_options=None, reanalyze=True):
+    """
+    작업 워커에서 실행되는 지도 생성 파이프라인. 렌더링된 지도 HTML 을 반환.
+    세션에 저장된 중간 결과가 있으면 재사용:
+    - GPX 는 처음 한 번만 파싱
+    - reanalyze=True 이면 새로 추가되거나 바뀐 사진만 분류 (삭제된 사진은 결과에서 제외)
+    - reanalyze=False 이면 저장된 사진 분석 결과로 지도만 다시 렌더링
+    render_options 가 None 이면 세션의 마지막 렌더링 옵션을 사용.
+    """
+    metrics = PipelineMetrics(job.id)
+    photo_session_dir = session_store.session_dir(session_id)
+    try:
+        with session_store.lock(session_id):
+            session_store.touch(session_id)
+            if render_options is None:
+                render_options = session_store.load_render_options(session_id)
+            else:
+                session_store.save(session_id, render_options=render_options)
+
+            # 같은 입력으로 렌더링한 결과가 있으면 파이프라인 전체를 건너뜀
+            cache_key = None
+            if render_cache:
+                with metrics.stage('render_cache_lookup'):
+                    cache_key = render_cache_key(session_id, image_base_url, render_options)
+                    map_html = render_cache.get(cache_key)
+                if map_html is not None:
+                    print(f"Render cache hit for session {session_id}")
+                    if image_base_url:
+                        # 캐시된 HTML 은 다른 세션에서 만들어졌을 수 있으므로 이 세션의 썸네일을 만들고 URL 을 바꿔 넣음
+                        with metrics.stage('thumbnails'):
+                            ThumbnailGenerator().create_many(session_photo_paths(session_id))
+                        map_html = map_html.replace(THUMBS_URL_PLACEHOLDER, image_base_url)
+                    return map_html
+
+            gpx_df = session_store.load_gpx_df(session_id)
+            if gpx_df is None:
+                gpx_df = load_track(session_store.gpx_path(session_id), progress=job.update, metrics=metrics)
+                if gpx_df is None or gpx_df.empty:
+                    raise JobFailed("지도 생성 실패. GPX 파일 확인 필요.")
+                session_store.save(session_id, gpx_df=gpx_df)
+
+            photo_df = session_store.load_photo_df(session_id)
+            if reanalyze or photo_df is None:
+                photo_df = analyze_photos(
+                    gpx_df, photo_session_dir, previous_photo_df=photo_df, progress=job.update, metrics=metrics,
+                    **session_store.load_photo_options(session_id)
+                )
+                session_store.save(session_id, photo_df=photo_df)
+
+        folium_map = render_map(
+            gpx_df, photo_df, image_base_url=image_base_url, progress=job.update, metrics=metrics,
+            **render_options
+        )
+
+        with metrics.stage('serialize'):
+            map_html = folium_map._repr_html_()
+
+        if cache_key:
+            try:
+                cached_html = map_html.replace(image_base_url, THUMBS_URL_PLACEHOLDER) if image_base_url else map_html
+                render_cache.put(cache_key, cached_html)
+            except OSError as e:
+                print(f"Error writing render cache: {e}")
+        return map_html
+    finally:
+        metrics.finish()
+
+def session_photo_paths(session_id):
+    session_dir = session_store.session_dir(session_id)
+    return [
+        os.path.join(session_dir, name) for name in os.listdir(session_dir)
+        if os.path.splitext(name)[1].lower() in ALLOWED_PHOTO_EXTENSIONS
+    ]
+
+def render_cache_key(session_id, image_base_url, render_options):
+    """
+    세션의 GPX, 사진 파일 내용과 사진 위치/렌더링 옵션으로 렌더링 결과 캐시 키를 계산.
+    세션별 썸네일 URL 은 캐시된 HTML 에서 THUMBS_URL_PLACEHOLDER 로 바뀌므로 키에는
+    썸네일을 URL 로 제공하는지 여부만 넣음 (같은 입력을 다시 올린 새 세션도 캐시를 씀).
+    """
+    options = {
+        'render': render_options,
+        'photos': session_store.load_photo_options(session_id),
+        'thumbnail_urls': image_base_url is not None,
+        'model_id': DEFAULT_MODEL_KEY,
+    }
+    return hash_inputs(session_store.gpx_path(session_id), session_photo_paths(session_id), options)
+
+def require_session(session_id):
+    if secure_filename(session_id) != session_id or not session_store.exists(session_id):
+        abort(404)
+
+@app.route('/sessions/<session_id>/photos', methods=['POST'])
+def add_session_photos(session_id):
+    """
+    기존 세션에 사진을 추가하고 지도를 다시 생성. 새로 추가된 사진만 분류함.
+    """
+    require_session(session_id)
+    if job_queue.is_full():
+        return BUSY_RESPONSE
+
+    saved, rejected = photo_uploader.save_all(
+        request.files.getlist('photo_files'), session_store.session_dir(session_id)
+    )
+    if not saved:
+        return jsonify({
+            'error': "추가할 사진 없음",
+            'rejected': [{'filename': name, 'reason': reason} for name, reason in rejected],
+        }), 400
+
+    try:
+        job = submit_session_job(session_id)
+    except QueueFullError:
+        return BUSY_RESPONSE
+    return job_response(job, session_id, saved, rejected)
+
+@app.route('/sessions/<session_id>/photos/<filename>', methods=['DELETE'])
+def remove_session_photo(session_id, filename):
+    """
+    세션에서 사진 한 장을 삭제하고 지도를 다시 생성. 남은 사진은 다시 분류하지 않음.
+    """
+    require_session(session_id)
+    if secure_filename(filename) != filename:
+        abort(404)
+
+    photo_path = os.path.join(session_store.session_dir(session_id), filename)
+    if os.path.splitext(filename)[1].lower() not in ALLOWED_PHOTO_EXTENSIONS or not os.path.isfile(photo_path):
+        abort(404)
+    if job_queue.is_full():
+        return BUSY_RESPONSE
+
+    os.remove(photo_path)
+    try:
+        job = submit_session_job(session_id)
+    except QueueFullError:
+        return BUSY_RESPONSE
+    return job_response(job, session_id)
+
+@app.route('/sessions/<session_id>/render', methods=['POST'])
+def restyle_session(session_id):
+    """
+    저장된 GPX/사진 분석 결과로 지도만 다시 렌더링
+    (JSON 본문: aura_mode, simplify_tolerance_m, hr_bins, color_by, split_m, max_hr).
+    """
+    require_session(session_id)
+    try:
+        render_options = parse_render_options(request.get_json(silent=True) or {})
+    except ValueError as e:
+        return str(e), 400
+
+    try:
+        job = submit_session_job(session_id, render_options=render_options, reanalyze=False)
+    except QueueFullError:
+        return BUSY_RESPONSE
+    return job_response(job, session_id)
+
+@app.errorhandler(413)
+def upload_too_large(error):
+    return f"업로드 크기 제한({app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)} MB) 초과", 413
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_page(job_id):
+    """
+    작업 진행 상황을 보여주고, 완료되면 결과 페이지로 이동하는 대기 페이지.
+    """
+    if job_queue.status(job_id) is None:
+        abort(404)
+    return render_template('job.html', job_id=job_id)
+
+@app.route('/jobs/<job_id>/status', methods=['GET'])
+def job_status(job_id):
+    """
+    작업 상태와 단계별 진행률을 JSON 으로 반환.
+    """
+    status = job_queue.status(job_id)
+    if status is None:
+        abort(404)
+    return jsonify(status)
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    """
+    완료된 작업의 지도 시각화 결과 페이지 반환.
+    """
+    status = job_queue.status(job_id)
+    if status is None:
+        abort(404)
+    if status['status'] == 'failed':
+        return status['error'] or "지도 생성 실패", 500
+
+    if status['status'] != 'done':
+        return redirect(url_for('job_page', job_id=job_id))
+
+    # 완료된 작업의 결과는 바뀌지 않으므로 작업 ID 로 ETag 를 만들고, 일치하면 결과를 읽지 않고 304 반환
+    etag = f"{job_id}-{RESULT_PAGE_HASH}"
+    if etag in request.if_none_match:
+        response = make_response('', 304)
+    else:
+        response = Response(result_page_chunks(job_id), mimetype='text/html')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def result_page_chunks(job_id):
+    """
+    결과 페이지 조각들의 이터레이터를 반환. 결과 파일이 있으면 파일에서 나눠 읽음.
+    응답을 시작하기 전에 결과를 찾을 수 없으면 404.
+    """
+    path = job_queue.result_path(job_id)
+    if path:
+        try:
+            f = open(path, 'r', encoding='utf-8')
+        except OSError:
+            abort(404)
+
+        def chunks():
+            with f:
+                yield RESULT_PAGE_HEAD
+                while True:
+                    chunk = f.read(RESULT_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    yield chunk
+                yield RESULT_PAGE_TAIL
+        return chunks()
+
+    map_html = job_queue.result(job_id)
+    if map_html is None:
+        abort(404)
+    return iter((RESULT_PAGE_HEAD, map_html, RESULT_PAGE_TAIL))
+
+@app.route('/thumbs/<session_id>/<path:filename>', methods=['GET'])
+def serve_thumbnail(session_id, filename):
+    """
+    세션별로 생성된 사진 썸네일 파일 제공.
+    """
+    if secure_filename(session_id) != session_id:
+        abort(404)
+    thumb_dir = os.path.join(session_store.session_dir(session_id), THUMBNAIL_DIRNAME)
+    return send_from_directory(thumb_dir, filename, max_age=86400)
+
+@app.route('/models', methods=['GET'])
+def model_status():
+    """
+    현재 워커에 로딩된 모델의 로딩 시간과 메모리 사용량 반환 (워커 수 산정용).
+    """
+    stats = get_registry().stats()
+    stats['jobs'] = job_queue.stats()
+    return jsonify(stats)
+
+@app.route('/metrics', methods=['GET'])
+def pipeline_metrics():
+    """
+    단계별 소요 시간 히스토그램과 최근 요청의 단계별 분석 결과 반환.
+    """
+    snapshot = get_metrics_registry().snapshot()
+    snapshot['render_cache'] = render_cache.stats() if render_cache else None
+    snapshot['scene_cache'] = default_cache_stats()
+    return jsonify(snapshot)
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=8080)
@@ -0,0 +1,293 @@
+"""
+여러 러닝 기록의 지도를 한 번에 생성하는 배치 CLI.
+
+사용 예 (프로젝트 루트에서 실행):
+    python batch.py data/archive --output-dir output/batch --workers 8
+    python batch.py runs.json --summary output/batch/summary.json
+
+입력은 러닝별 폴더(폴더 안의 .gpx 파일 하나와 사진들)가 모인 디렉터리,
+또는 각 러닝의 name/gpx/photos 를 적은 매니페스트(.json 배열 또는 .csv) 파일.
+
+- GPX 파싱과 지도 렌더링/저장은 프로세스 풀에서 병렬로 실행
+- 사진 분석은 메인 프로세스에서 한 번 로딩한 모델을 모든 러닝이 공유
+- 러닝 하나가 실패해도 나머지를 계속 처리하고, 러닝별 소요 시간을 요약 JSON 으로 저장
+"""
+import os
+import argparse
+import csv
+import itertools
+import json
+import multiprocessing
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from werkzeug.utils import secure_filename
+
+from src.atomic_write import write_atomic
+from src.data_loader import DataLoader
+from src.track_metrics import add_track_metrics
+from src.visualizer import AURA_MODES, ROUTE_METRICS
+
+PHOTO_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.heic']
+
+# 프로세스 풀에 동시에 올려 두는 작업(파싱 + 렌더링) 수 = 워커 수 x 이 값
+MAX_IN_FLIGHT_PER_WORKER = 2
+
+
+class Run:
+    """
+    배치에서 처리할 러닝 하나의 입력 경로와 처리 결과.
+    """
+    def __init__(self, name, gpx_path, photo_dir=None):
+        self.name = name
+        self.gpx_path = gpx_path
+        self.photo_dir = photo_dir
+        self.status = 'pending'
+        self.error = None
+        self.output = None
+        self.points = None
+        self.photos = None
+        self.timings = {}
+
+    def fail(self, stage, error):
+        self.status = 'failed'
+        self.error = f"{stage}: {error}"
+        print(f"[{self.name}] failed during {stage}: {error}")
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'gpx': self.gpx_path,
+            'photos_dir': self.photo_dir,
+            'status': self.status,
+            'error': self.error,
+            'output': self.output,
+            'points': self.points,
+            'photos': self.photos,
+            'timings': {stage: round(seconds, 4) for stage, seconds in self.timings.items()},
+        }
+
+
+def discover_runs(source):
+    """
+    입력 경로에서 러닝 목록을 만듦.
+    디렉터리면 .gpx 파일이 있는 하위 폴더 하나를 러닝 하나로 보고, 파일이면 매니페스트로 읽음.
+    """
+    if os.path.isdir(source):
+        runs = []
+        for entry in sorted(os.listdir(source)):
+            run_dir = os.path.join(source, entry)
+            if not os.path.isdir(run_dir):
+                continue
+            gpx_files = sorted(f for f in os.listdir(run_dir) if f.lower().endswith('.gpx'))
+            if not gpx_files:
+                print(f"Skipping {run_dir}: no .gpx file")
+                continue
+            runs.append(Run(entry, os.path.join(run_dir, gpx_files[0]), run_dir))
+        return runs
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    with open(source, 'r', encoding='utf-8') as f:
+        if source.lower().endswith('.csv'):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = json.load(f)
+
+    def resolve(path):
+        return path if not path or os.path.isabs(path) else os.path.join(base_dir, path)
+
+    runs = []
+    for i, row in enumerate(rows):
+        gpx_path = resolve(row.get('gpx'))
+        name = row.get('name') or os.path.splitext(os.path.basename(gpx_path or f"run_{i}"))[0]
+        runs.append(Run(name, gpx_path, resolve(row.get('photos') or None)))
+    return runs
+
+
+def output_path_for(run, output_dir, used):
+    """
+    러닝 이름으로 결과 파일 경로를 정함. 이름이 겹치면 번호를 붙임.
+    """
+    base = secure_filename(run.name) or 'run'
+    filename = f"{base}.html"
+    i = 1
+    while filename in used:
+        filename = f"{base}_{i}.html"
+        i += 1
+    used.add(filename)
+    return os.path.join(output_dir, filename)
+
+
+def parse_gpx(gpx_path):
+    """
+    프로세스 풀에서 실행: GPX 를 읽고 파생 지표를 추가하여 (DataFrame, 소요 시간) 을 반환.
+    """
+    started = time.perf_counter()
+    if not gpx_path or not os.path.exists(gpx_path):
+        raise FileNotFoundError(f"GPX file not found: {gpx_path}")
+    gpx_df = DataLoader(gpx_path).load_gpx_data()
+    if gpx_df is None or gpx_df.empty:
+        raise ValueError("GPX file has no track points")
+    return add_track_metrics(gpx_df), time.perf_counter() - started
+
+
+def render_to_file(gpx_df, photo_df, output_path, render_options):
+    """
+    프로세스 풀에서 실행: 지도를 렌더링하여 HTML 파일로 저장하고 {'render', 'serialize'} 소요 시간을 반환.
+    사진 썸네일은 결과 파일만으로 열 수 있도록 HTML 에 인라인.
+    """
+    from main import render_map
+
+    started = time.perf_counter()
+    folium_map = render_map(gpx_df, photo_df, **render_options)
+    rendered = time.perf_counter()
+
+    write_atomic(output_path, folium_map.save)
+    return {'render': rendered - started, 'serialize': time.perf_counter() - rendered}
+
+
+def has_photos(photo_dir):
+    return bool(photo_dir) and os.path.isdir(photo_dir) and any(
+        os.path.splitext(name)[1].lower() in PHOTO_EXTENSIONS for name in os.listdir(photo_dir)
+    )
+
+
+def analyze_run(run, gpx_df, batch_size, photo_options=None):
+    """
+    메인 프로세스에서 실행: 공유 모델로 러닝의 사진을 분석하여 photo_df 를 반환.
+    photo_options 는 ImageAnalyzer 의 사진 위치 옵션(clock_offset_s, utc_offset_s).
+    """
+    import pandas as pd
+
+    if not has_photos(run.photo_dir):
+        return pd.DataFrame()
+
+    from src.analyzer import ImageAnalyzer
+
+    analyzer = ImageAnalyzer(run.photo_dir, batch_size=batch_size, **(photo_options or {}))
+    return analyzer.analyze_photos(gpx_df)
+
+
+def run_batch(runs, output_dir, workers, batch_size=16, render_options=None, photo_options=None):
+    """
+    러닝 목록을 처리하고 Run 목록을 반환.
+    GPX 파싱이 끝난 러닝부터 사진을 분석하고, 분석이 끝나면 바로 렌더링을 프로세스 풀에 넘겨
+    파싱/분석/렌더링이 서로 겹쳐서 진행되도록 함.
+    동시에 풀에 올리는 작업은 workers 의 MAX_IN_FLIGHT_PER_WORKER 배로 제한하여
+    러닝이 많아도 파싱된 DataFrame 과 future 가 메모리에 쌓이지 않게 함.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    render_options = render_options or {}
+    used_names = set()
+    max_in_flight = max(1, workers) * MAX_IN_FLIGHT_PER_WORKER
+    pending_runs = iter(runs)
+    in_flight = {}
+
+    # 모델(torch)을 로딩한 프로세스를 fork 하지 않도록 spawn 방식으로 워커를 생성
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        while True:
+            # 렌더링이 파싱 뒤에 밀리지 않도록 빈 자리만큼만 새 러닝의 파싱을 넣음
+            for run in itertools.islice(pending_runs, max_in_flight - len(in_flight)):
+                in_flight[pool.submit(parse_gpx, run.gpx_path)] = ('gpx_load', run)
+            if not in_flight:
+                break
+
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage, run = in_flight.pop(future)
+                if stage == 'render':
+                    finish_render(run, future)
+                    continue
+
+                try:
+                    gpx_df, run.timings['gpx_load'] = future.result()
+                    run.points = len(gpx_df)
+                except Exception as e:
+                    run.fail('gpx_load', e)
+                    continue
+
+                started = time.perf_counter()
+                try:
+                    photo_df = analyze_run(run, gpx_df, batch_size, photo_options)
+                    run.photos = len(photo_df)
+                except Exception as e:
+                    traceback.print_exc()
+                    run.fail('photo_analysis', e)
+                    continue
+                finally:
+                    run.timings['photo_analysis'] = time.perf_counter() - started
+
+                run.output = output_path_for(run, output_dir, used_names)
+                in_flight[pool.submit(render_to_file, gpx_df, photo_df, run.output, render_options)] = ('render', run)
+                del gpx_df, photo_df
+
+    return runs
+
+
+def finish_render(run, future):
+    try:
+        run.timings.update(future.result())
+        run.status = 'done'
+        print(f"[{run.name}] saved to {run.output}")
+    except Exception as e:
+        run.output = None
+        run.fail('render', e)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runner's View batch map generation")
+    parser.add_argument('source', help='러닝별 폴더가 모인 디렉터리 또는 매니페스트(.json/.csv) 파일')
+    parser.add_argument('--output-dir', default=os.path.join('output', 'batch'))
+    parser.add_argument('--summary', help='요약 JSON 경로 (기본: <output-dir>/summary.json)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='GPX 파싱/렌더링 프로세스 수')
+    parser.add_argument('--batch-size', type=int, default=16, help='사진 분석 배치 크기')
+    parser.add_argument('--aura-mode', default='layer', choices=AURA_MODES)
+    parser.add_argument('--hr-bins', type=int, help='경로 색상 구간 수')
+    parser.add_argument('--color-by', default='heart_rate', choices=list(ROUTE_METRICS), help='경로 색상 기준')
+    parser.add_argument('--split-m', type=float, help='구간 표시 간격(m), 예: 1000')
+    parser.add_argument('--max-hr', type=float, help='심박 존 기준 최대 심박수 (생략하면 러닝마다 기록된 최댓값)')
+    parser.add_argument('--clock-offset', type=float, default=0, help='카메라 시계 보정값(초)')
+    parser.add_argument('--utc-offset', type=float, help='시간대 정보가 없는 사진의 UTC 오프셋(시간, 예: 9). 생략하면 경로 시각으로 추정')
+    args = parser.parse_args()
+
+    runs = discover_runs(args.source)
+    print(f"--- Running in Batch Mode: {len(runs)} run(s), {args.workers} worker(s) ---")
+
+    started = time.perf_counter()
+    run_batch(
+        runs, args.output_dir, args.workers, batch_size=args.batch_size,
+        render_options={
+            'aura_mode': args.aura_mode, 'hr_bins': args.hr_bins,
+            'color_by': args.color_by, 'split_m': args.split_m, 'max_hr': args.max_hr,
+        },
+        photo_options={
+            'clock_offset_s': args.clock_offset,
+            'utc_offset_s': None if args.utc_offset is None else args.utc_offset * 3600,
+        },
+    )
+    elapsed = time.perf_counter() - started
+
+    done = sum(run.status == 'done' for run in runs)
+    summary = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'source': args.source,
+        'workers': args.workers,
+        'total_seconds': round(elapsed, 3),
+        'runs_total': len(runs),
+        'runs_done': done,
+        'runs_failed': len(runs) - done,
+        'runs': [run.to_dict() for run in runs],
+    }
+    summary_path = args.summary or os.path.join(args.output_dir, 'summary.json')
+    os.makedirs(os.path.dirname(os.path.abspath(summary_path)), exist_ok=True)
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+
+    print(f"Batch finished in {elapsed:.1f}s: {done} done, {len(runs) - done} failed. Summary: {summary_path}")
+    return 0 if done == len(runs) else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
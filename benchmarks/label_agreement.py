@@ -0,0 +1,134 @@
+"""
+양자화/내보내기한 추론 백엔드가 기준(fp32 torch) 모델과 같은 장면 라벨을 내는지 확인하는 스크립트.
+
+사용 예 (프로젝트 루트에서 실행):
+    python -m benchmarks.label_agreement data/sample_photos --quantize int8
+    python -m benchmarks.label_agreement data/sample_photos --backend onnx --quantize int8 --threads 4 \
+        --output agreement.json
+
+두 설정으로 같은 사진들을 분류하여 최상위 라벨 일치율, 평균 확률 차이, 불일치 사진 목록,
+설정별 로딩 시간과 처리량(장/초)을 출력.
+"""
+import os
+import argparse
+import json
+import time
+
+from src.inference_backend import DEFAULT_MODEL_ID, INFERENCE_BACKENDS, QUANTIZE_MODES, InferenceConfig, apply_thread_settings
+from src.model_registry import ModelRegistry
+
+PHOTO_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.heic']
+
+
+def classify(photo_files, photo_dir, model_key, batch_size):
+    """
+    설정 하나로 사진들을 분류하여 ({경로: 확률 텐서}, 통계) 를 반환.
+    레지스트리와 장면 캐시를 공유하지 않도록 매번 새로 만듦.
+    """
+    import torch
+    from src.analyzer import ImageAnalyzer
+
+    analyzer = ImageAnalyzer(photo_dir, model_id=model_key, registry=ModelRegistry(),
+                             batch_size=batch_size, scene_cache=False)
+    load_seconds = analyzer.load_model()
+
+    probs = {}
+    started = time.perf_counter()
+    for loaded in analyzer.iter_batches(photo_files):
+        if not loaded:
+            continue
+        paths, tensors = zip(*loaded)
+        batch_probs = analyzer.predict_probs(torch.stack(tensors))
+        for fpath, row in zip(paths, batch_probs):
+            probs[fpath] = row
+    elapsed = time.perf_counter() - started
+
+    return analyzer, probs, {
+        'model': model_key,
+        'load_seconds': round(load_seconds, 3),
+        'seconds': round(elapsed, 3),
+        'photos_per_second': round(len(probs) / elapsed, 2) if elapsed else None,
+    }
+
+
+def compare_labels(analyzer, baseline, candidate):
+    """
+    두 결과의 최상위 라벨 일치율과 평균 절대 확률 차이, 불일치 목록을 계산.
+    """
+    common = [fpath for fpath in baseline if fpath in candidate]
+    agree = 0
+    abs_diff = 0.0
+    mismatches = []
+    for fpath in common:
+        base_idx = baseline[fpath].argmax().item()
+        cand_idx = candidate[fpath].argmax().item()
+        abs_diff += (baseline[fpath] - candidate[fpath]).abs().mean().item()
+        if base_idx == cand_idx:
+            agree += 1
+        else:
+            mismatches.append({
+                'photo': os.path.basename(fpath),
+                'baseline': analyzer.describe(base_idx, baseline[fpath][base_idx].item())[1],
+                'candidate': analyzer.describe(cand_idx, candidate[fpath][cand_idx].item())[1],
+            })
+
+    return {
+        'photos': len(common),
+        'top1_agreement': round(agree / len(common), 4) if common else None,
+        'mean_abs_prob_diff': round(abs_diff / len(common), 6) if common else None,
+        'mismatches': mismatches,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare scene labels of an inference backend against fp32 torch")
+    parser.add_argument('photo_dir', help='분류할 사진 폴더')
+    parser.add_argument('--model', default=DEFAULT_MODEL_ID, help='모델 ID 또는 로컬 경로')
+    parser.add_argument('--backend', default='torch', choices=INFERENCE_BACKENDS)
+    parser.add_argument('--quantize', default='int8', choices=QUANTIZE_MODES)
+    parser.add_argument('--baseline-model', help='기준 모델 ID (기본: --model 과 동일, fp32 torch)')
+    parser.add_argument('--threads', type=int, help='연산 스레드 수')
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--min-agreement', type=float, default=0.95, help='이보다 낮으면 종료 코드 1')
+    parser.add_argument('--output', help='결과 JSON 경로')
+    args = parser.parse_args()
+
+    photo_files = sorted(
+        os.path.join(args.photo_dir, f) for f in os.listdir(args.photo_dir)
+        if os.path.splitext(f)[1].lower() in PHOTO_EXTENSIONS
+    )
+    if not photo_files:
+        print(f"No photos found in {args.photo_dir}")
+        return 1
+
+    num_threads = apply_thread_settings(args.threads)
+    baseline_key = InferenceConfig(args.baseline_model or args.model, 'torch', 'none').key
+    candidate_key = InferenceConfig(args.model, args.backend, args.quantize).key
+    print(f"--- {len(photo_files)} photo(s), {num_threads} thread(s): {baseline_key} vs {candidate_key} ---")
+
+    analyzer, baseline, baseline_stats = classify(photo_files, args.photo_dir, baseline_key, args.batch_size)
+    _, candidate, candidate_stats = classify(photo_files, args.photo_dir, candidate_key, args.batch_size)
+
+    report = {
+        'num_threads': num_threads,
+        'baseline': baseline_stats,
+        'candidate': candidate_stats,
+        **compare_labels(analyzer, baseline, candidate),
+    }
+
+    for stats in (baseline_stats, candidate_stats):
+        print(f"{stats['model']:60s} load {stats['load_seconds']:>7.2f}s  {stats['photos_per_second']} photos/s")
+    print(f"Top-1 agreement: {report['top1_agreement']}  mean |dp|: {report['mean_abs_prob_diff']}")
+    for mismatch in report['mismatches']:
+        print(f"  {mismatch['photo']}: {mismatch['baseline']} -> {mismatch['candidate']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Results saved to: {args.output}")
+
+    return 0 if (report['top1_agreement'] or 0) >= args.min_agreement else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,348 @@
+"""
+모의 데이터로 파이프라인 각 단계의 처리량과 메모리를 측정하여 JSON 으로 저장하는 벤치마크.
+
+사용 예 (프로젝트 루트에서 실행):
+    python -m benchmarks.run_benchmarks --duration 3600 --rate 1 --photos 100 --seed 42 \
+        --output bench_results.json --compare previous.json
+"""
+import os
+import argparse
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from PIL import Image
+from generage_mock import create_mock_gpx, create_mock_photos
+from src.data_loader import DataLoader
+from src.image_decode import CLIP_INPUT_SIZE, decode_image
+from src.instrumentation import get_rss_mb
+from src.track_metrics import add_track_metrics
+from src.visualizer import AURA_MODES, Visualizer
+
+# 모의 러닝 시작 시각 (재현성을 위해 고정)
+MOCK_START_TIME = datetime(2024, 1, 1, 7, 0, 0)
+
+# 앱/CLI 임포트 시점에 로딩되면 안 되는 무거운 모듈
+HEAVY_MODULES = ('torch', 'transformers', 'folium', 'branca')
+
+STARTUP_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+print(json.dumps({{
+    'seconds': time.perf_counter() - started,
+    'loaded': [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+def measure(func, repeat=1):
+    """
+    func 를 repeat 번 실행하여 (마지막 결과, 측정값) 을 반환.
+    측정값: 실행 시간 중앙값/최솟값, tracemalloc 기준 파이썬 힙 최대 사용량, RSS 변화량.
+    """
+    timings = []
+    peak_mb = 0.0
+    rss_before = get_rss_mb()
+    result = None
+    for _ in range(repeat):
+        tracemalloc.start()
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+        peak_mb = max(peak_mb, tracemalloc.get_traced_memory()[1] / (1024 * 1024))
+        tracemalloc.stop()
+
+    return result, {
+        'seconds': round(statistics.median(timings), 4),
+        'min_seconds': round(min(timings), 4),
+        'py_peak_mb': round(peak_mb, 2),
+        'rss_delta_mb': round(get_rss_mb() - rss_before, 1),
+    }
+
+
+def bench_startup(repeat):
+    """
+    새 인터프리터에서 app / main 을 임포트하는 시간과 그 시점에 로딩된 무거운 모듈을 측정.
+    torch 등이 임포트 시점에 로딩되면 'lazy_ok' 가 False 가 됨.
+    """
+    results = {}
+    for module in ('app', 'main'):
+        script = STARTUP_SCRIPT.format(module=module, heavy=HEAVY_MODULES)
+        timings = []
+        loaded = []
+        for _ in range(repeat):
+            output = subprocess.run(
+                [sys.executable, '-c', script], capture_output=True, text=True, check=True
+            ).stdout.strip().splitlines()[-1]
+            info = json.loads(output)
+            timings.append(info['seconds'])
+            loaded = info['loaded']
+        results[module] = {
+            'seconds': round(statistics.median(timings), 4),
+            'heavy_modules_loaded': loaded,
+            'lazy_ok': not loaded,
+        }
+    return results
+
+
+def bench_data_loader(gpx_path, repeat):
+    results = {}
+    gpx_df = None
+    loaders = {
+        'stream': lambda: DataLoader(gpx_path, parser='stream', cache='off'),
+        'gpxpy': lambda: DataLoader(gpx_path, parser='gpxpy', cache='off'),
+    }
+    try:
+        import pyarrow  # noqa: F401
+        # 사이드카 캐시를 한 번 만든 뒤 캐시 읽기만 측정
+        for cache in ('feather', 'parquet'):
+            DataLoader(gpx_path, cache=cache).load_gpx_data()
+            loaders[f"cached_{cache}"] = lambda cache=cache: DataLoader(gpx_path, cache=cache)
+    except ImportError:
+        pass
+
+    for name, make_loader in loaders.items():
+        df, stats = measure(lambda: make_loader().load_gpx_data(), repeat)
+        stats['points'] = len(df)
+        stats['points_per_second'] = round(len(df) / stats['seconds'], 1) if stats['seconds'] else None
+        stats['frame_mb'] = round(df.memory_usage(deep=True).sum() / (1024 * 1024), 3)
+        results[name] = stats
+        gpx_df = df if gpx_df is None else gpx_df
+    return gpx_df, results
+
+
+def bench_analyzer(photo_dir, gpx_df, use_stub, batch_size, cache_dir):
+    from src.analyzer import ImageAnalyzer
+    from src.model_registry import DEFAULT_MODEL_KEY, ModelRegistry
+
+    registry = ModelRegistry()
+    model_id = DEFAULT_MODEL_KEY
+    if use_stub:
+        from benchmarks.stub_model import STUB_MODEL_ID, register_stub_model
+        register_stub_model(registry, cache_dir=cache_dir)
+        model_id = STUB_MODEL_ID
+
+    analyzer = ImageAnalyzer(
+        photo_dir, model_id=model_id, registry=registry, batch_size=batch_size, scene_cache=False
+    )
+    _, load_stats = measure(analyzer.load_model)
+    photo_df, stats = measure(lambda: analyzer.analyze_photos(gpx_df))
+
+    stats['photos'] = len(photo_df)
+    stats['photos_per_second'] = round(len(photo_df) / stats['seconds'], 2) if stats['seconds'] else None
+    stats['batch_size'] = batch_size
+    stats['model_id'] = model_id
+    stats['model_load'] = load_stats
+    return photo_df, stats
+
+
+def bench_track_metrics(gpx_df, repeat):
+    df, stats = measure(lambda: add_track_metrics(gpx_df), repeat)
+    stats['points'] = len(df)
+    stats['points_per_second'] = round(len(df) / stats['seconds'], 1) if stats['seconds'] else None
+    return df, stats
+
+
+def bench_image_decode(photo_dir, repeat):
+    """
+    사진을 원본 해상도로 디코딩하는 경우와 모델 입력 크기 근처로 축소 디코딩하는 경우를 비교.
+    Pillow 버퍼는 tracemalloc 에 잡히지 않으므로 디코딩된 픽셀 수(MP)를 함께 기록.
+    """
+    photo_files = sorted(
+        os.path.join(photo_dir, f) for f in os.listdir(photo_dir) if f.lower().endswith(('.jpg', '.jpeg', '.png'))
+    )
+
+    def full_decode():
+        sizes = []
+        for fpath in photo_files:
+            with Image.open(fpath) as img:
+                sizes.append(img.convert('RGB').size)
+        return sizes
+
+    def reduced_decode():
+        sizes = []
+        for fpath in photo_files:
+            with decode_image(fpath, CLIP_INPUT_SIZE) as img:
+                sizes.append(img.size)
+        return sizes
+
+    results = {}
+    for name, func in (('full', full_decode), ('reduced', reduced_decode)):
+        sizes, stats = measure(func, repeat)
+        stats['photos'] = len(sizes)
+        stats['ms_per_photo'] = round(stats['seconds'] * 1000 / len(sizes), 2) if sizes else None
+        stats['decoded_mpixels'] = round(sum(w * h for w, h in sizes) / 1e6, 2)
+        results[name] = stats
+    return results
+
+
+def mock_photo_df(photo_dir, gpx_df, seed):
+    """
+    사진 분석을 생략할 때 지도 벤치마크에 사용할 사진 DataFrame 을 생성.
+    위치는 실제 파이프라인과 같이 EXIF 시각으로 정하고, 장면 색상은 시드 기반으로 지정.
+    """
+    import glob
+    import numpy as np
+    import pandas as pd
+    from src.photo_locator import PhotoLocator, read_photo_metadata
+
+    photo_files = sorted(glob.glob(os.path.join(photo_dir, '*.jpg')))
+    placements = PhotoLocator(gpx_df).locate([read_photo_metadata(f) for f in photo_files])
+    colors = ['#708090', '#FF0000', '#00A000', '#0077FF', '#FF6347', '#8A2BE2']
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'filename': [os.path.basename(f) for f in photo_files],
+        'filepath': photo_files,
+        'lat': placements['lat'],
+        'lon': placements['lon'],
+        'color': [colors[i] for i in rng.integers(len(colors), size=len(photo_files))],
+        'scene': 'Mock',
+        'time': placements['time'],
+    })
+
+
+def bench_visualizer(gpx_df, photo_df, repeat):
+    results = {}
+    for aura_mode in AURA_MODES:
+        folium_map, build_stats = measure(
+            lambda: Visualizer(gpx_df).create_map(photo_df=photo_df, aura_mode=aura_mode), repeat
+        )
+        html, render_stats = measure(lambda: folium_map.get_root().render())
+        results[aura_mode] = {
+            'build': build_stats,
+            'render': render_stats,
+            'html_bytes': len(html.encode('utf-8')),
+            'circles': html.count('L.circle('),
+            'polylines': html.count('L.polyline('),
+            'markers': html.count('L.marker('),
+        }
+    return results
+
+
+def bench_photo_layer(gpx_df, photo_df, count, seed, repeat):
+    """
+    사진 수가 많은 지도(count 장)의 생성/직렬화 시간과 HTML 크기를 측정.
+    모의 사진을 반복하여 경로 주변에 흩뿌리고, 썸네일은 URL 로 참조하여 사진 레이어 비용만 봄.
+    """
+    import numpy as np
+
+    if photo_df.empty or not count:
+        return {}
+
+    rng = np.random.default_rng(seed)
+    many = photo_df.iloc[np.arange(count) % len(photo_df)].reset_index(drop=True)
+    many['lat'] = many['lat'] + rng.normal(0, 0.001, count)
+    many['lon'] = many['lon'] + rng.normal(0, 0.001, count)
+
+    folium_map, build_stats = measure(
+        lambda: Visualizer(gpx_df).create_map(photo_df=many, image_base_url='/static/thumbs'), repeat
+    )
+    html, render_stats = measure(lambda: folium_map.get_root().render())
+    return {
+        'photos': count,
+        'build': build_stats,
+        'render': render_stats,
+        'html_bytes': len(html.encode('utf-8')),
+        'html_bytes_per_photo': round(len(html.encode('utf-8')) / count, 1),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline, path=''):
+    """
+    두 결과에서 같은 위치의 'seconds' / 'html_bytes' 값을 비교하여 (경로, 이전, 현재, 비율) 목록을 반환.
+    """
+    rows = []
+    for key, value in current.items():
+        other = baseline.get(key) if isinstance(baseline, dict) else None
+        if other is None:
+            continue
+        if isinstance(value, dict):
+            rows.extend(compare(value, other, f"{path}{key}."))
+        elif key in ('seconds', 'html_bytes', 'py_peak_mb') and isinstance(value, (int, float)) and other:
+            rows.append((f"{path}{key}", other, value, value / other))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runner's View pipeline benchmarks")
+    parser.add_argument('--duration', type=int, default=1500, help='모의 러닝 시간(초)')
+    parser.add_argument('--rate', type=float, default=1.0, help='GPS 기록 빈도(Hz)')
+    parser.add_argument('--photos', type=int, default=20, help='모의 사진 수')
+    parser.add_argument('--photo-size', type=int, nargs=2, default=(1024, 768), metavar=('W', 'H'))
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=3, help='GPX 로딩/지도 생성 반복 횟수')
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--layer-photos', type=int, default=1000, help='사진 레이어 벤치마크의 사진 수 (0: 생략)')
+    parser.add_argument('--real-model', action='store_true', help='소형 모델 대신 실제 CLIP 모델 사용')
+    parser.add_argument('--skip-analyzer', action='store_true', help='사진 분석 단계 생략 (torch 불필요)')
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--compare', help='비교할 이전 결과 JSON 경로')
+    parser.add_argument('--workdir', help='모의 데이터 생성 폴더 (기본: 임시 폴더, 실행 후 삭제)')
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='runners_view_bench_')
+    try:
+        gpx_path = create_mock_gpx(
+            duration=args.duration, sample_interval=1.0 / args.rate, seed=args.seed,
+            output_path=os.path.join(workdir, 'bench_run.gpx'), start_time=MOCK_START_TIME
+        )
+        photo_dir = os.path.join(workdir, 'photos')
+        create_mock_photos(
+            args.photos, photo_dir, seed=args.seed, size=tuple(args.photo_size),
+            start_time=MOCK_START_TIME, duration=args.duration
+        )
+
+        results = {'startup': bench_startup(args.repeat)}
+        gpx_df, results['data_loader'] = bench_data_loader(gpx_path, args.repeat)
+        gpx_df, results['track_metrics'] = bench_track_metrics(gpx_df, args.repeat)
+        results['image_decode'] = bench_image_decode(photo_dir, args.repeat)
+
+        if args.skip_analyzer:
+            photo_df = mock_photo_df(photo_dir, gpx_df, args.seed)
+        else:
+            photo_df, results['analyzer'] = bench_analyzer(
+                photo_dir, gpx_df, not args.real_model, args.batch_size, os.path.join(workdir, 'cache', 'text_features')
+            )
+
+        results['visualizer'] = bench_visualizer(gpx_df, photo_df, args.repeat)
+        results['photo_layer'] = bench_photo_layer(gpx_df, photo_df, args.layer_photos, args.seed, args.repeat)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'params': vars(args),
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Benchmark results saved to: {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"--- Compared with {args.compare} (commit {baseline.get('commit')}) ---")
+        for key, before, after, ratio in compare(results, baseline.get('results', {})):
+            print(f"{key:70s} {before:>12} -> {after:>12}  ({ratio:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
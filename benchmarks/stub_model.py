@@ -0,0 +1,89 @@
+import zlib
+import numpy as np
+import torch
+from PIL import Image
+from src.model_registry import LoadedModel
+
+STUB_MODEL_ID = "stub/tiny-clip"
+
+
+class StubClipModel(torch.nn.Module):
+    """
+    CLIPModel 과 같은 메서드(get_image_features, get_text_features, logit_scale)를 가진 소형 모델.
+    가중치 다운로드 없이 파이프라인 전체(배치, 캐시, 배치 위치 결정)의 처리량을 측정하기 위한 용도.
+    """
+    def __init__(self, embed_dim=64, vocab_size=4096, seed=0):
+        super().__init__()
+        generator = torch.Generator().manual_seed(seed)
+        self.vision = torch.nn.Sequential(
+            torch.nn.Conv2d(3, 16, kernel_size=8, stride=8),
+            torch.nn.ReLU(),
+            torch.nn.AdaptiveAvgPool2d(4),
+            torch.nn.Flatten(),
+            torch.nn.Linear(16 * 4 * 4, embed_dim),
+        )
+        self.token_embedding = torch.nn.Embedding(vocab_size, embed_dim)
+        self.logit_scale = torch.nn.Parameter(torch.tensor(np.log(100.0), dtype=torch.float32))
+        for param in self.parameters():
+            if param.dim() > 1:
+                param.data = torch.randn(param.shape, generator=generator) * 0.05
+
+    def get_image_features(self, pixel_values):
+        return self.vision(pixel_values)
+
+    def get_text_features(self, input_ids, attention_mask=None):
+        embeddings = self.token_embedding(input_ids)
+        if attention_mask is None:
+            return embeddings.mean(dim=1)
+        mask = attention_mask.unsqueeze(-1).float()
+        return (embeddings * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+
+
+class StubProcessor:
+    """
+    CLIPProcessor 와 같은 호출 방식을 흉내내는 전처리기.
+    이미지는 224x224 로 축소 후 정규화, 텍스트는 단어 해시 기반 토큰으로 변환.
+    """
+    def __init__(self, image_size=224, vocab_size=4096):
+        self.image_size = image_size
+        self.vocab_size = vocab_size
+
+    def __call__(self, text=None, images=None, return_tensors="pt", padding=True):
+        outputs = {}
+        if images is not None:
+            images = images if isinstance(images, list) else [images]
+            arrays = [
+                np.asarray(img.convert('RGB').resize((self.image_size, self.image_size), Image.BILINEAR), dtype=np.float32)
+                for img in images
+            ]
+            pixels = torch.from_numpy(np.stack(arrays)).permute(0, 3, 1, 2) / 255.0
+            outputs['pixel_values'] = (pixels - 0.5) / 0.5
+
+        if text is not None:
+            tokenized = [
+                [zlib.crc32(word.encode('utf-8')) % self.vocab_size for word in sentence.lower().split()]
+                for sentence in text
+            ]
+            length = max(len(tokens) for tokens in tokenized)
+            input_ids = torch.zeros((len(tokenized), length), dtype=torch.long)
+            attention_mask = torch.zeros((len(tokenized), length), dtype=torch.long)
+            for i, tokens in enumerate(tokenized):
+                input_ids[i, :len(tokens)] = torch.tensor(tokens)
+                attention_mask[i, :len(tokens)] = 1
+            outputs['input_ids'] = input_ids
+            outputs['attention_mask'] = attention_mask
+
+        return outputs
+
+
+def register_stub_model(registry, model_id=STUB_MODEL_ID, cache_dir=None):
+    """
+    레지스트리에 소형 모델을 등록하고 LoadedModel 을 반환.
+    텍스트 임베딩은 cache_dir(벤치마크 작업 폴더 등)에만 저장하고, 없으면 디스크에 저장하지 않음.
+    (실제 모델용 data/cache 에 소형 모델의 결과가 섞이지 않도록 함)
+    """
+    model = StubClipModel()
+    model.eval()
+    return registry.register(
+        model_id, LoadedModel(model_id, model, StubProcessor(), 0.0, 0.0, text_cache_dir=cache_dir)
+    )
@@ -5,9 +5,21 @@ import gpxpy
 import gpxpy.gpx
 from datetime import datetime, timedelta
 
-def create_mock_gpx():
+# 모의 사진 생성 시 사용할 장면별 기본 색상 (analyzer 의 매핑 색상과 유사)
+MOCK_PHOTO_COLORS = [
+    (112, 128, 144), (54, 69, 79), (255, 0, 0), (160, 82, 45),
+    (0, 160, 0), (255, 87, 51), (124, 252, 0), (240, 248, 255),
+    (0, 119, 255), (0, 191, 255), (255, 99, 71), (138, 43, 226),
+]
 
+def create_mock_gpx(duration=1500, sample_interval=1.0, seed=None, output_path=None, start_time=None):
+    """
+    모의 러닝 GPX 파일을 생성.
+    duration: 총 러닝 시간(초), sample_interval: 기록 간격(초), seed: 난수 시드(재현용)
+    output_path 를 지정하지 않으면 data/gpx/mock_run.gpx 에 저장. 저장한 경로를 반환.
+    """
     print("Creating mock GPX data...")
+    rng = random.Random(seed)
     
     gpx = gpxpy.gpx.GPX()
     gpx_track = gpxpy.gpx.GPXTrack()
@@ -19,36 +31,39 @@ def create_mock_gpx():
     start_lat, start_lon = 37.548, 127.042 # 시작점: 서울숲 북쪽
     RIVER_BOUNDARY_LAT = 37.541            # 경로 생성 하한선 (강)
     
-    total_duration = 1500  # 총 러닝 시간 (초)
+    total_duration = duration  # 총 러닝 시간 (초)
     turn_point = total_duration // 2 # 반환점 (시간 기준)
 
     warmup_duration = 180  # 준비운동 시간 (초)
     cooldown_start = total_duration - 180 # 정리운동 시작 시간 (초)
     
-    main_heading_rad = math.radians(random.uniform(0, 180)) # 시작 방향 (북쪽)
+    main_heading_rad = math.radians(rng.uniform(0, 180)) # 시작 방향 (북쪽)
     current_heading_rad = main_heading_rad
     m_per_deg_lat = 111000 
     m_per_deg_lon = 88800
 
-    start_time = datetime.now()
+    start_time = start_time or datetime.now()
     lat, lon = start_lat, start_lon
 
-    for i in range(total_duration):
+    num_points = int(total_duration / sample_interval)
+    for n in range(num_points):
+        i = int(n * sample_interval)  # 경과 시간 (초)
+
         # --- 1. 동적 경로 생성 ---
-        base_speed_mps = random.uniform(2.0, 2.5) 
-        step_m = base_speed_mps + random.uniform(-0.5, 0.5)
+        base_speed_mps = rng.uniform(2.0, 2.5) 
+        step_m = (base_speed_mps + rng.uniform(-0.5, 0.5)) * sample_interval
         
         delta_lat = (step_m / m_per_deg_lat) * math.cos(current_heading_rad)
         delta_lon = (step_m / m_per_deg_lon) * math.sin(current_heading_rad)
 
         if lat + delta_lat < RIVER_BOUNDARY_LAT:
-            current_heading_rad = math.radians(random.uniform(45, 135))
+            current_heading_rad = math.radians(rng.uniform(45, 135))
             delta_lat = abs(delta_lat)
 
-        if i == turn_point:
+        if i <= turn_point < i + sample_interval:
             main_heading_rad += math.pi
 
-        noise_rad = math.radians(random.uniform(-25, 25))
+        noise_rad = math.radians(rng.uniform(-25, 25))
         current_heading_rad += noise_rad * 0.5
         current_heading_rad += (main_heading_rad - current_heading_rad) * 0.02
         
@@ -60,33 +75,71 @@ def create_mock_gpx():
         if i < warmup_duration:
             progress = i / warmup_duration
             base_hr = 100 + 40 * progress
-            heart_rate = int(base_hr + random.randint(-2, 2))
+            heart_rate = int(base_hr + rng.randint(-2, 2))
         elif i > cooldown_start:
             progress = (i - cooldown_start) / (total_duration - cooldown_start)
             base_hr = 150 - 40 * progress
-            heart_rate = int(base_hr + random.randint(-2, 2))
+            heart_rate = int(base_hr + rng.randint(-2, 2))
         else:
             base_hr = 155
             interval_variation = 15 * math.sin((i - warmup_duration) * (2 * math.pi / 300))
             short_variation = 5 * math.sin(i * 0.1)
-            heart_rate = int(base_hr + interval_variation + short_variation + random.randint(-4, 4))
+            heart_rate = int(base_hr + interval_variation + short_variation + rng.randint(-4, 4))
         
         # GPX 트랙포인트 생성
-        point_time = start_time + timedelta(seconds=i)
+        point_time = start_time + timedelta(seconds=n * sample_interval)
         point = gpxpy.gpx.GPXTrackPoint(latitude=lat, longitude=lon, time=point_time)
         point.description = f"hr={heart_rate}"
         gpx_segment.points.append(point)
 
     # --- 3. GPX 파일 저장 ---
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    DATA_GPX_DIR = os.path.join(script_dir, "data", "gpx")
-    
-    os.makedirs(DATA_GPX_DIR, exist_ok=True)
-    gpx_filename = os.path.join(DATA_GPX_DIR, "mock_run.gpx")
+    if output_path is None:
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        DATA_GPX_DIR = os.path.join(script_dir, "data", "gpx")
+        output_path = os.path.join(DATA_GPX_DIR, "mock_run.gpx")
+
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    gpx_filename = output_path
 
     with open(gpx_filename, "w") as f:
         f.write(gpx.to_xml())
     print(f"Mock GPX file created successfully: {gpx_filename}")
+    return gpx_filename
+
+def create_mock_photos(count, output_dir, seed=None, size=(1024, 768), start_time=None, duration=1500):
+    """
+    장면 색상 기반의 모의 사진(JPEG)을 count 장 생성.
+    start_time 을 지정하면 러닝 시간 동안 고르게 분포된 EXIF 촬영 시각(DateTimeOriginal)을 기록.
+    생성한 파일 경로 목록을 반환.
+    """
+    import numpy as np
+    import piexif
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    os.makedirs(output_dir, exist_ok=True)
+
+    width, height = size
+    gradient = np.linspace(0.6, 1.0, height, dtype=np.float32)[:, None, None]
+    paths = []
+    for i in range(count):
+        base = np.array(MOCK_PHOTO_COLORS[int(rng.integers(len(MOCK_PHOTO_COLORS)))], dtype=np.float32)
+        noise = rng.normal(0, 12, size=(height, width, 3)).astype(np.float32)
+        pixels = np.clip(base * gradient + noise, 0, 255).astype(np.uint8)
+
+        exif_bytes = b""
+        if start_time is not None:
+            taken = start_time + timedelta(seconds=float(rng.uniform(0, duration)))
+            exif_bytes = piexif.dump({
+                'Exif': {piexif.ExifIFD.DateTimeOriginal: taken.strftime('%Y:%m:%d %H:%M:%S').encode('ascii')}
+            })
+
+        path = os.path.join(output_dir, f"mock_{i:04d}.jpg")
+        Image.fromarray(pixels).save(path, 'JPEG', quality=90, exif=exif_bytes)
+        paths.append(path)
+
+    print(f"{count} mock photos created in: {output_dir}")
+    return paths
 
 if __name__ == "__main__":
     create_mock_gpx()
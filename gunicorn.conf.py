@@ -0,0 +1,25 @@
+import os
+
+bind = os.environ.get('RUNNERS_VIEW_BIND', '0.0.0.0:8080')
+workers = int(os.environ.get('RUNNERS_VIEW_WORKERS', '2'))
+threads = int(os.environ.get('RUNNERS_VIEW_THREADS', '4'))
+timeout = int(os.environ.get('RUNNERS_VIEW_TIMEOUT', '300'))
+
+# 워커마다 torch 가 모든 코어를 쓰면 서로 경쟁하므로, 지정하지 않았으면 (코어 수 / 워커 수) 로 나눔.
+# 모델 ID/백엔드/양자화는 RUNNERS_VIEW_MODEL, RUNNERS_VIEW_BACKEND, RUNNERS_VIEW_QUANTIZE 로 지정.
+os.environ.setdefault('RUNNERS_VIEW_TORCH_THREADS', str(max(1, (os.cpu_count() or 1) // workers)))
+
+# 워커가 뜰 때 CLIP 모델을 미리 로딩할지 여부 (기본값: 사용)
+PRELOAD_MODEL = os.environ.get('RUNNERS_VIEW_PRELOAD_MODEL', '1') == '1'
+
+
+def post_fork(server, worker):
+    """
+    워커 프로세스 생성 직후 모델을 로딩하여 첫 요청의 지연을 없앰.
+    """
+    if not PRELOAD_MODEL:
+        return
+
+    from src.model_registry import warm_up, get_registry
+    warm_up()
+    server.log.info(f"Worker {worker.pid} model ready: {get_registry().stats()}")
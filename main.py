@@ -2,36 +2,89 @@ import os
 from src.data_loader import DataLoader
 from src.visualizer import Visualizer
 from src.analyzer import ImageAnalyzer
+from src.instrumentation import PipelineMetrics
+from src.track_metrics import add_track_metrics
 
-def generate_map(gpx_path, photo_dir):
+def _reporter(progress):
+    def report(stage, fraction=0.0):
+        if progress:
+            progress(stage, fraction)
+    return report
+
+def load_track(gpx_path, progress=None, metrics=None):
     """
-    GPX 파일과 사진 폴더 경로를 입력받아, Folium 지도 객체를 생성하여 반환
+    1단계: GPX 파일을 읽어 파생 지표가 추가된 경로 DataFrame 을 반환. 파일이 없으면 None.
     """
+    metrics = metrics or PipelineMetrics()
     if not os.path.exists(gpx_path):
         print(f"Error: GPX file not found at {gpx_path}")
         return None
-    
-    # 1단계: GPX 데이터 로딩
+
     print("--- [1/3] Loading GPX Data ---")
-    loader = DataLoader(gpx_path)
-    gpx_df = loader.load_gpx_data()
+    _reporter(progress)('gpx')
+    with metrics.stage('gpx_load'):
+        loader = DataLoader(gpx_path)
+        gpx_df = loader.load_gpx_data()
+    if gpx_df.empty:
+        return gpx_df
+
+    # 거리/페이스/경사도/심박 존 등 점별 파생 지표 (경로 색상과 구간 표시에 사용)
+    with metrics.stage('track_metrics'):
+        return add_track_metrics(gpx_df)
+
+def analyze_photos(gpx_df, photo_dir, previous_photo_df=None, progress=None, metrics=None, **photo_options):
+    """
+    2단계: 사진을 분석하여 GPX 경로에 매핑한 DataFrame 을 반환.
+    previous_photo_df(이전 분석 결과)가 주어지면 변경되지 않은 사진은 다시 분류하지 않음.
+    photo_options 는 ImageAnalyzer 의 사진 위치 옵션(clock_offset_s, utc_offset_s)으로 전달.
+    """
+    metrics = metrics or PipelineMetrics()
+    report = _reporter(progress)
 
-    # 2단계: 사진 분석 및 GPX 경로에 매핑
     print("--- [2/3] Analyzing Photos ---")
-    analyzer = ImageAnalyzer(photo_dir)
-    photo_df = analyzer.analyze_photos(gpx_df)
+    report('photos')
+    # 모델은 분류할 사진이 있을 때 analyze_photos 안에서 로딩되며, 그 시간은 'model_load' 로 기록됨
+    analyzer = ImageAnalyzer(photo_dir, **photo_options)
+    with metrics.stage('photo_analysis'):
+        photo_df = analyzer.analyze_photos(
+            gpx_df, progress=lambda fraction: report('photos', fraction), metrics=metrics,
+            previous=previous_photo_df
+        )
     
     if not photo_df.empty:
         print(f"Photo mapping successful for {len(photo_df)} images.")
     else:
         print("No photos were mapped.")
+    return photo_df
+
+def render_map(gpx_df, photo_df, image_base_url=None, progress=None, metrics=None, **render_options):
+    """
+    3단계: 경로와 사진 DataFrame 으로 Folium 지도 객체를 생성.
+    render_options 는 Visualizer.create_map 의 옵션(aura_mode, hr_bins 등)으로 전달.
+    """
+    metrics = metrics or PipelineMetrics()
 
-    # 3단계: 지도 시각화
     print("--- [3/3] Generating Visualization ---")
-    viz = Visualizer(gpx_df)
-    folium_map = viz.create_map(photo_df=photo_df)
+    _reporter(progress)('render')
+    with metrics.stage('render'):
+        viz = Visualizer(gpx_df)
+        return viz.create_map(photo_df=photo_df, image_base_url=image_base_url, **render_options)
+
+def generate_map(gpx_path, photo_dir, image_base_url=None, progress=None, metrics=None):
+    """
+    GPX 파일과 사진 폴더 경로를 입력받아, Folium 지도 객체를 생성하여 반환
+    image_base_url 을 지정하면 사진 썸네일을 HTML 에 인라인하지 않고 해당 URL 로 참조
+    progress(stage, fraction) 콜백이 주어지면 단계('gpx', 'photos', 'render')별 진행률을 보고
+    metrics(PipelineMetrics) 가 주어지면 단계별 소요 시간과 메모리 변화를 기록
+    """
+    metrics = metrics or PipelineMetrics()
+
+    gpx_df = load_track(gpx_path, progress=progress, metrics=metrics)
+    if gpx_df is None:
+        return None
 
-    return folium_map
+    photo_df = analyze_photos(gpx_df, photo_dir, progress=progress, metrics=metrics)
+    return render_map(gpx_df, photo_df, image_base_url=image_base_url, progress=progress, metrics=metrics)
 
 def main():
     """
@@ -49,13 +102,16 @@ def main():
     os.makedirs(output_dir, exist_ok=True)
     
     # 지도 생성 함수 호출
-    folium_map = generate_map(gpx_file, photo_dir)
+    metrics = PipelineMetrics('cli')
+    folium_map = generate_map(gpx_file, photo_dir, metrics=metrics)
 
     # 결과 저장
     if folium_map:
         save_path = os.path.join(output_dir, output_file)
-        folium_map.save(save_path)
+        with metrics.stage('serialize'):
+            folium_map.save(save_path)
         print(f"Map saved successfully to: {save_path}")
+    metrics.finish()
 
 if __name__ == "__main__":
     main()
@@ -1,23 +1,40 @@
 import os
 import glob
-import random
+import time
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
-from PIL import Image
-import torch
-from transformers import CLIPProcessor, CLIPModel
+from src.image_decode import CLIP_INPUT_SIZE, decode_image
+from src.model_registry import DEFAULT_MODEL_KEY, get_registry
+from src.photo_locator import PhotoLocator, read_photo_metadata
+from src.scene_cache import SceneCache, get_default_cache, hash_candidates, hash_file
 
 class ImageAnalyzer:
     """
     CLIP 모델을 사용하여 이미지의 장면을 분석하고,
     미리 정의된 색상 및 라벨과 매핑하는 클래스
     """
-    def __init__(self, photo_dir):
+    def __init__(self, photo_dir, model_id=DEFAULT_MODEL_KEY, registry=None,
+                 batch_size=16, num_workers=4, scene_cache=None,
+                 clock_offset_s=0, tolerance_s=300, utc_offset_s=None):
         self.photo_dir = photo_dir
+        # 카메라 시계 보정값(초), GPX 기록 지점과의 허용 시간 차(초),
+        # 시간대 정보가 없는 사진의 UTC 오프셋(초, None 이면 경로 시각으로 추정)
+        self.clock_offset_s = clock_offset_s
+        self.tolerance_s = tolerance_s
+        self.utc_offset_s = utc_offset_s
+        # 한 번의 모델 호출에 넣을 이미지 수와 디코딩/전처리 스레드 수
+        self.batch_size = max(1, int(batch_size))
+        self.num_workers = max(1, int(num_workers))
+        # 분류 결과 캐시 (None: 프로세스 공용 캐시 사용, False: 캐시 비활성화)
+        self._scene_cache = scene_cache
+        self._cache_keys = {}
         
-        print("Loading AI Model (OpenAI CLIP)...")
-        model_id = "openai/clip-vit-large-patch14"
-        self.model = CLIPModel.from_pretrained(model_id)
-        self.processor = CLIPProcessor.from_pretrained(model_id, use_fast=True)
+        # 모델은 요청마다 새로 로딩하지 않고 워커 전역 레지스트리에서 공유.
+        # 실제로 분류할 사진이 있을 때 처음 접근하는 시점에 로딩 (GPX 만 있거나 모두 캐시에 있으면 로딩하지 않음).
+        self.model_id = model_id
+        self.registry = registry or get_registry()
+        self._clip = None
+        self._text_features = None
         
         # CLIP 모델이 이미지를 분류할 때 참고하는 텍스트 후보 목록.
         self.candidates = [
@@ -51,77 +68,291 @@ class ImageAnalyzer:
             ('#8A2BE2', 'Night/Lights')
         ]
 
-    def predict_scene_and_color(self, img):
+        self.candidates_hash = hash_candidates(self.candidates)
+
+    @property
+    def scene_cache(self):
+        # 공용 캐시는 분류할 사진이 있을 때 처음 접근하는 시점에 엶 (GPX 만 있는 요청은 캐시 파일을 만들지 않음)
+        if self._scene_cache is None:
+            self._scene_cache = get_default_cache()
+        return self._scene_cache
+
+    @property
+    def clip(self):
+        if self._clip is None:
+            self._clip = self.registry.get(self.model_id)
+        return self._clip
+
+    @property
+    def model(self):
+        return self.clip.model
+
+    @property
+    def processor(self):
+        return self.clip.processor
+
+    @property
+    def decode_size(self):
         """
-        주어진 이미지 한 장을 CLIP 모델로 분석하여 가장 유사한 장면의 색상과 라벨을 반환
+        사진을 축소 디코딩할 목표 크기 (프로세서가 짧은 변을 줄이는 크기).
         """
-        try:
-            inputs = self.processor(
-                text=self.candidates, 
-                images=img, 
-                return_tensors="pt", 
-                padding=True
-            )
-
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-            
-            probs = outputs.logits_per_image.softmax(dim=1)
-            best_idx = probs.argmax().item()
-            confidence = probs[0][best_idx].item()
-            
-            color, label = self.mapping[best_idx]
-            
-            return color, f"{label} ({confidence*100:.0f}%)"
+        image_processor = getattr(self.processor, 'image_processor', None)
+        size = getattr(image_processor, 'size', None) or {}
+        return size.get('shortest_edge', CLIP_INPUT_SIZE)
 
-        except Exception as e:
-            print(f"AI Prediction Error: {e}")
-            return '#808080', "Unknown"
+    @property
+    def text_features(self):
+        # 후보 문장은 바뀌지 않으므로 텍스트 임베딩은 한 번만 계산해 재사용.
+        if self._text_features is None:
+            self._text_features = self.clip.text_features(self.candidates)
+        return self._text_features
+
+    def load_model(self):
+        """
+        모델과 텍스트 임베딩을 준비하고 걸린 시간(초)을 반환.
+        """
+        started = time.perf_counter()
+        self.text_features
+        return time.perf_counter() - started
+
+    def describe(self, best_idx, confidence):
+        """
+        가장 유사한 장면의 인덱스와 확률로 색상과 라벨 문자열을 생성.
+        """
+        color, label = self.mapping[best_idx]
+
+        return color, f"{label} ({confidence*100:.0f}%)"
+
+    def predict_probs(self, pixel_values):
+        """
+        전처리된 이미지 텐서 묶음(N, 3, H, W)을 한 번의 모델 호출로 분석하여
+        후보 장면별 확률 행렬(N, 후보 수)을 반환.
+        """
+        logits = self.clip.image_logits(pixel_values, self.text_features)
+        return logits.softmax(dim=1)
+
+    def _load_pixels(self, fpath):
+        """
+        이미지 파일을 열어 모델 입력 텐서(3, H, W)로 전처리. 스레드 풀에서 실행됨.
+        원본 해상도 대신 모델 입력 크기 근처로 축소 디코딩하고 EXIF 방향을 적용.
+        """
+        with decode_image(fpath, self.decode_size) as img:
+            return self.processor(images=img, return_tensors="pt")['pixel_values'][0]
+
+    def _chunk_sizes(self, count):
+        return [min(self.batch_size, count - i) for i in range(0, count, self.batch_size)]
+
+    def _timed_load_pixels(self, fpath, metrics):
+        started = time.perf_counter()
+        pixels = self._load_pixels(fpath)
+        metrics.record('photo_preprocess', time.perf_counter() - started)
+        return pixels
+
+    def iter_batches(self, photo_files, metrics=None):
+        """
+        스레드 풀에서 디코딩/전처리를 수행하며, batch_size 단위로 (경로, 텐서) 목록을 생성.
+        현재 배치가 모델에서 처리되는 동안 다음 배치를 미리 준비.
+        실패한 이미지는 해당 이미지만 건너뜀.
+        """
+        chunks = [
+            photo_files[i:i + self.batch_size]
+            for i in range(0, len(photo_files), self.batch_size)
+        ]
+
+        def submit(pool, fpath):
+            if metrics:
+                return pool.submit(self._timed_load_pixels, fpath, metrics)
+            return pool.submit(self._load_pixels, fpath)
+
+        with ThreadPoolExecutor(max_workers=self.num_workers) as pool:
+            pending = [submit(pool, f) for f in chunks[0]] if chunks else []
+            for chunk_idx, chunk in enumerate(chunks):
+                current = pending
+                if chunk_idx + 1 < len(chunks):
+                    pending = [submit(pool, f) for f in chunks[chunk_idx + 1]]
 
-    def analyze_photos(self, gpx_df):
+                loaded = []
+                for fpath, future in zip(chunk, current):
+                    try:
+                        loaded.append((fpath, future.result()))
+                    except Exception as e:
+                        print(f"Error processing {fpath}: {e}")
+                yield loaded
+
+    def analyze_photos(self, gpx_df, progress=None, metrics=None, previous=None):
         """
         사진 폴더 내의 모든 이미지를 분석하고, 각 사진을 GPX 경로의 특정 지점에 매핑.
+        progress 가 주어지면 배치마다 분석 완료 비율(0~1)로 호출.
+        metrics(PipelineMetrics) 가 주어지면 사진별 전처리/배치별 추론 시간을 기록.
+        previous 로 이전 분석 결과(photo_df)를 주면 크기/수정 시각이 같은 사진은 그 분류 결과를 재사용.
         """
         if not self.photo_dir or not os.path.exists(self.photo_dir):
             return pd.DataFrame()
 
         photo_files = glob.glob(os.path.join(self.photo_dir, "*"))
         valid_exts = ['.jpg', '.jpeg', '.png', '.heic']
-        photo_files = [f for f in photo_files if os.path.splitext(f)[1].lower() in valid_exts]
+        photo_files = sorted(f for f in photo_files if os.path.splitext(f)[1].lower() in valid_exts)
         
         if not photo_files:
             return pd.DataFrame()
 
-        print(f"Analyzing {len(photo_files)} photos...")
+        print(f"Analyzing {len(photo_files)} photos (batch size {self.batch_size})...")
         
         results = []
         
-        # GPX 경로상에서 사진을 배치할 지점을 랜덤으로 선택.
-        if len(gpx_df) < len(photo_files):
-            indices = random.choices(range(len(gpx_df)), k=len(photo_files))
-        else:
-            indices = sorted(random.sample(range(len(gpx_df)), len(photo_files)))
-        
-        for i, fpath in enumerate(photo_files):
+        # EXIF 촬영 시각/GPS 로 각 사진이 놓일 GPX 경로상의 위치를 결정.
+        started = time.perf_counter()
+        placements = self.locate_photos(photo_files, gpx_df)
+        if metrics:
+            metrics.record('photo_locate', time.perf_counter() - started)
+        for fpath, placement in zip(photo_files, placements['placement']):
+            if placement == 'unmatched':
+                print(f"{os.path.basename(fpath)}: taken outside the GPX time range, placing it along the route")
+        placements.index = photo_files
+
+        # 같은 세션의 이전 결과, 같은 내용의 사진에 대한 캐시 순으로 분류 결과를 재사용하고, 나머지만 모델로 분석.
+        predictions = self._reuse_previous(photo_files, previous)
+        if predictions:
+            print(f"Reusing {len(predictions)} unchanged photo(s) from the previous result")
+
+        started = time.perf_counter()
+        cached = self._lookup_cache([f for f in photo_files if f not in predictions])
+        if metrics:
+            metrics.record('photo_cache_lookup', time.perf_counter() - started)
+        predictions.update(cached)
+        pending_files = [f for f in photo_files if f not in predictions]
+        if cached:
+            print(f"Scene cache: {len(cached)} hit(s), {len(pending_files)} to analyze")
+
+        if pending_files:
+            # torch 는 실제 추론이 필요할 때만 임포트 (캐시 적중만으로 끝나는 요청은 로딩하지 않음)
+            import torch
+
+            load_seconds = self.load_model()
+            if metrics:
+                metrics.record('model_load', load_seconds)
+
+        done = len(predictions)
+        for chunk_size, loaded in zip(self._chunk_sizes(len(pending_files)), self.iter_batches(pending_files, metrics)):
+            done += chunk_size
+            if progress:
+                progress(done / len(photo_files))
+            if not loaded:
+                continue
+
+            pixel_values = torch.stack([pixels for _, pixels in loaded])
             try:
-                with Image.open(fpath) as img:
-                    semantic_color, scene_desc = self.predict_scene_and_color(img)
-                    
-                    target_idx = indices[i]
-                    target_point = gpx_df.iloc[target_idx]
-
-                    print(f"Mapping: {os.path.basename(fpath)} -> {scene_desc}")
-
-                    results.append({
-                        'filename': os.path.basename(fpath),
-                        'filepath': fpath,
-                        'lat': target_point['lat'],
-                        'lon': target_point['lon'],
-                        'color': semantic_color,
-                        'scene': scene_desc,
-                        'time': target_point['time']
-                    })
+                started = time.perf_counter()
+                probs = self.predict_probs(pixel_values)
+                if metrics:
+                    metrics.record('photo_inference', time.perf_counter() - started)
             except Exception as e:
-                print(f"Error processing {fpath}: {e}")
+                print(f"AI Prediction Error: {e}")
+                for fpath, _ in loaded:
+                    predictions[fpath] = ('#808080', "Unknown")
+                continue
+
+            for (fpath, _), image_probs in zip(loaded, probs):
+                best_idx = image_probs.argmax().item()
+                predictions[fpath] = self.describe(best_idx, image_probs[best_idx].item())
+                self._store_cache(fpath, image_probs, best_idx)
+
+        for fpath in photo_files:
+            if fpath not in predictions:
+                continue
+
+            semantic_color, scene_desc = predictions[fpath]
+            target_point = placements.loc[fpath]
+            stat = os.stat(fpath)
+
+            print(f"Mapping: {os.path.basename(fpath)} -> {scene_desc}")
 
-        return pd.DataFrame(results)
\ No newline at end of file
+            results.append({
+                'filename': os.path.basename(fpath),
+                'filepath': fpath,
+                'lat': target_point['lat'],
+                'lon': target_point['lon'],
+                'color': semantic_color,
+                'scene': scene_desc,
+                'time': target_point['time'],
+                'placement': target_point['placement'],
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns
+            })
+
+        return pd.DataFrame(results)
+
+    def locate_photos(self, photo_files, gpx_df):
+        """
+        사진들의 EXIF 메타데이터를 병렬로 읽고, GPX 경로상의 위치를 계산.
+        """
+        with ThreadPoolExecutor(max_workers=self.num_workers) as pool:
+            metas = list(pool.map(read_photo_metadata, photo_files))
+
+        locator = PhotoLocator(
+            gpx_df, clock_offset_s=self.clock_offset_s, tolerance_s=self.tolerance_s, utc_offset_s=self.utc_offset_s
+        )
+        return locator.locate(metas)
+
+    def _reuse_previous(self, photo_files, previous):
+        """
+        이전 결과에서 경로, 크기, 수정 시각이 모두 같은 사진의 {경로: (색상, 라벨)} 을 반환.
+        """
+        if previous is None or previous.empty or 'mtime_ns' not in previous.columns:
+            return {}
+
+        known = {row.filepath: row for row in previous.itertuples(index=False)}
+        reused = {}
+        for fpath in photo_files:
+            row = known.get(fpath)
+            if row is None:
+                continue
+            try:
+                stat = os.stat(fpath)
+            except OSError:
+                continue
+            if stat.st_size == row.size and stat.st_mtime_ns == row.mtime_ns:
+                reused[fpath] = (row.color, row.scene)
+        return reused
+
+    def _lookup_cache(self, photo_files):
+        """
+        사진 내용 해시로 장면 캐시를 조회하여 {경로: (색상, 라벨)} 을 반환.
+        """
+        self._cache_keys = {}
+        if not photo_files or not self.scene_cache:
+            return {}
+
+        def safe_hash(fpath):
+            try:
+                return hash_file(fpath)
+            except OSError as e:
+                print(f"Error hashing {fpath}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.num_workers) as pool:
+            content_hashes = list(pool.map(safe_hash, photo_files))
+
+        predictions = {}
+        for fpath, content_hash in zip(photo_files, content_hashes):
+            if content_hash is None:
+                continue
+
+            key = SceneCache.make_key(content_hash, self.model_id, self.candidates_hash)
+            self._cache_keys[fpath] = key
+
+            cached = self.scene_cache.get(key)
+            if cached is not None:
+                probs, label_index, _ = cached
+                predictions[fpath] = self.describe(label_index, probs[label_index])
+        return predictions
+
+    def _store_cache(self, fpath, probs, best_idx):
+        key = self._cache_keys.get(fpath)
+        if not self.scene_cache or key is None:
+            return
+
+        try:
+            self.scene_cache.put(key, probs.tolist(), best_idx, self.mapping[best_idx][1])
+        except Exception as e:
+            print(f"Error writing scene cache: {e}")
@@ -0,0 +1,27 @@
+import os
+import threading
+
+
+def write_atomic(path, write):
+    """
+    write(임시 파일 경로) 로 같은 폴더의 임시 파일을 만든 뒤 path 로 교체(os.replace).
+    다른 스레드나 워커 프로세스가 읽어도 반쯤 쓰인 파일을 보지 않음. 실패하면 임시 파일을 지우고 예외를 다시 발생.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_text_atomic(path, text):
+    """
+    문자열을 UTF-8 로 path 에 원자적으로 기록.
+    """
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+    write_atomic(path, write)
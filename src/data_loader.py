@@ -1,19 +1,273 @@
+import os
 import gpxpy
+import json
 import pandas as pd
+import numpy as np
 import re
+from array import array
 from datetime import datetime
+import xml.etree.ElementTree as ET
+from src.atomic_write import write_atomic
+from src.scene_cache import hash_file
+
+HR_PATTERN = re.compile(r'hr=(\d+)')
+
+# 파싱 결과를 GPX 옆에 저장해 두는 사이드카 캐시 형식 ('feather', 'parquet', 'off')
+# feather(Arrow IPC, 비압축)는 메모리 맵으로 읽을 수 있어 반복 로딩이 가장 빠름. pyarrow 가 없으면 사용 안 함.
+# 사용자의 입력 폴더에 파일을 만들므로 기본값은 'off' (같은 GPX 를 반복해서 읽을 때만 켬)
+TRACK_CACHE_FORMAT = os.environ.get('RUNNERS_VIEW_TRACK_CACHE', 'off')
+
+# 열 구성/타입이 바뀌면 올려서 기존 사이드카 캐시를 무효화
+TRACK_SCHEMA_VERSION = 1
+TRACK_CACHE_METADATA_KEY = b'runners_view'
+
+
+def compact_track(df):
+    """
+    경로 DataFrame 을 작은 타입으로 정리.
+    - time: datetime64 (UTC)
+    - lat/lon: float64 (float32 는 1초 간격 점 사이 거리 계산에 쓰기엔 오차가 커서 유지)
+    - elevation: float32
+    - heart_rate: nullable UInt8 (0~255 범위 밖의 값은 결측 처리)
+    """
+    heart_rates = pd.to_numeric(df['heart_rate'], errors='coerce') if 'heart_rate' in df.columns else None
+    compact = pd.DataFrame({
+        'time': pd.to_datetime(df['time'], utc=True),
+        'lat': df['lat'].astype(np.float64),
+        'lon': df['lon'].astype(np.float64),
+        'elevation': pd.to_numeric(df['elevation'], errors='coerce').astype(np.float32),
+    })
+    if heart_rates is not None:
+        heart_rates = heart_rates.where((heart_rates >= 0) & (heart_rates <= 255))
+        compact['heart_rate'] = heart_rates.astype('Float64').round().astype('UInt8')
+    return compact
+
+
+def _parse_heart_rate(text):
+    """
+    심박수 문자열을 정수로 변환. 숫자가 아니거나 0~255 범위 밖이면 None (해당 값만 무시).
+    """
+    try:
+        value = int(float(text))
+    except (TypeError, ValueError, OverflowError):
+        return None
+    return value if 0 <= value <= 255 else None
+
+
+def _local_name(tag):
+    """
+    네임스페이스를 제거한 XML 태그 이름을 반환. (예: '{ns}trkpt' -> 'trkpt')
+    """
+    return tag.rsplit('}', 1)[-1]
+
 
 class DataLoader:
     """
     GPX 파일을 읽어 Pandas DataFrame으로 변환하는 클래스.
+
+    parser:
+      - 'stream': iterparse 기반 스트리밍 파서 (타입이 지정된 열 배열을 직접 채움)
+      - 'gpxpy': gpxpy 객체 트리로 파싱
+      - 'auto': 스트리밍 파서를 우선 사용하고, 실패하면 gpxpy 로 재시도
+
+    cache: 'feather' / 'parquet' 이면 파싱 결과를 '<gpx 경로>.<형식>' 사이드카 파일로 저장하고,
+      다음 로딩 때 GPX 의 크기/수정 시각(다르면 내용 해시)이 같으면 XML 대신 사이드카를 읽음. 'off' 면 사용 안 함.
     """
-    def __init__(self, gpx_path):
+    def __init__(self, gpx_path, parser='auto', cache=TRACK_CACHE_FORMAT):
         self.gpx_path = gpx_path
+        self.parser = parser
+        self.cache = cache if cache in ('feather', 'parquet') else None
 
     def load_gpx_data(self):
         """
         GPX 파일을 파싱하여 시간, 좌표, 고도, 심박수 등의 데이터를 DataFrame으로 반환.
         """
+        df = self._read_cache()
+        if df is not None:
+            print(f"Data loaded: {len(df)} points (cached)")
+            return df
+
+        if self.parser in ('auto', 'stream'):
+            try:
+                df = self._load_streaming()
+            except Exception as e:
+                if self.parser == 'stream':
+                    print(f"Error reading or parsing GPX file: {e}")
+                    return pd.DataFrame()
+                print(f"Streaming GPX parser failed ({e}), falling back to gpxpy")
+                df = self._load_gpxpy()
+        else:
+            df = self._load_gpxpy()
+
+        if df.empty:
+            return df
+
+        df = compact_track(df)
+
+        # 심박수 데이터가 없는 경우, 이전/이후 데이터로 채워넣어 유효한 값으로 변환.
+        if 'heart_rate' in df.columns:
+            df['heart_rate'] = df['heart_rate'].ffill().bfill()
+
+        self._write_cache(df)
+        print(f"Data loaded: {len(df)} points")
+        return df
+
+    def _cache_path(self):
+        return f"{self.gpx_path}.{self.cache}"
+
+    def _source_signature(self, with_hash=False):
+        stat = os.stat(self.gpx_path)
+        signature = {
+            'version': TRACK_SCHEMA_VERSION,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+        }
+        if with_hash:
+            signature['sha256'] = hash_file(self.gpx_path)
+        return signature
+
+    def _read_cache(self):
+        """
+        유효한 사이드카 캐시가 있으면 DataFrame 으로 읽어 반환. 없거나 GPX 가 바뀌었으면 None.
+        """
+        if not self.cache or not os.path.exists(self._cache_path()):
+            return None
+        try:
+            import pyarrow.feather as feather
+            import pyarrow.parquet as pq
+
+            if self.cache == 'feather':
+                table = feather.read_table(self._cache_path(), memory_map=True)
+            else:
+                table = pq.read_table(self._cache_path(), memory_map=True)
+
+            cached = json.loads((table.schema.metadata or {}).get(TRACK_CACHE_METADATA_KEY, b'{}'))
+            current = self._source_signature()
+            if cached.get('version') != current['version'] or cached.get('size') != current['size']:
+                return None
+            if cached.get('mtime_ns') == current['mtime_ns']:
+                return table.to_pandas()
+
+            # 복사 등으로 수정 시각만 바뀐 경우는 내용 해시로 확인하고,
+            # 같으면 새 수정 시각으로 서명을 갱신하여 다음 로딩부터는 다시 해시하지 않음
+            current['sha256'] = hash_file(self.gpx_path)
+            if cached.get('sha256') != current['sha256']:
+                return None
+            df = table.to_pandas()
+            self._write_table(table, current)
+            return df
+        except ImportError:
+            return None
+        except Exception as e:
+            print(f"Ignoring unreadable track cache {self._cache_path()}: {e}")
+            return None
+
+    def _write_cache(self, df):
+        if not self.cache:
+            return
+        try:
+            import pyarrow as pa
+        except ImportError:
+            return
+
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except Exception as e:
+            print(f"Error writing track cache {self._cache_path()}: {e}")
+            return
+        self._write_table(table, self._source_signature(with_hash=True))
+
+    def _write_table(self, table, signature):
+        """
+        GPX 서명(signature)을 메타데이터로 붙여 사이드카 파일을 원자적으로 기록.
+        """
+        import pyarrow.feather as feather
+        import pyarrow.parquet as pq
+
+        path = self._cache_path()
+        try:
+            encoded = json.dumps(signature).encode('utf-8')
+            table = table.replace_schema_metadata({**(table.schema.metadata or {}), TRACK_CACHE_METADATA_KEY: encoded})
+            if self.cache == 'feather':
+                write_atomic(path, lambda tmp_path: feather.write_feather(table, tmp_path, compression='uncompressed'))
+            else:
+                write_atomic(path, lambda tmp_path: pq.write_table(table, tmp_path))
+        except Exception as e:
+            print(f"Error writing track cache {path}: {e}")
+
+    def _load_streaming(self):
+        """
+        트랙포인트를 하나씩 읽으며 열 배열(lat/lon/elevation/time/heart_rate)을 채움.
+        처리한 요소는 즉시 트리에서 제거하여 메모리 사용량을 일정하게 유지.
+        심박수는 description 의 'hr=' 값과 Garmin TrackPointExtension 의 <hr> 요소를 모두 지원.
+        """
+        lats = array('d')
+        lons = array('d')
+        elevations = array('d')
+        heart_rates = array('h')
+        times = []
+
+        stack = []
+        with open(self.gpx_path, 'rb') as f:
+            for event, elem in ET.iterparse(f, events=('start', 'end')):
+                if event == 'start':
+                    stack.append(elem)
+                    continue
+
+                stack.pop()
+                if _local_name(elem.tag) != 'trkpt':
+                    continue
+
+                elevation = np.nan
+                point_time = None
+                hr = -1
+                for child in elem.iter():
+                    name = _local_name(child.tag)
+                    if name == 'ele' and child.text:
+                        elevation = float(child.text)
+                    elif name == 'time' and child.text:
+                        point_time = child.text.strip()
+                    elif name == 'hr' and child.text and hr < 0:
+                        value = _parse_heart_rate(child.text)
+                        hr = hr if value is None else value
+                    elif name == 'desc' and child.text and 'hr=' in child.text and hr < 0:
+                        hr_match = HR_PATTERN.search(child.text)
+                        if hr_match:
+                            value = _parse_heart_rate(hr_match.group(1))
+                            hr = hr if value is None else value
+
+                lats.append(float(elem.get('lat')))
+                lons.append(float(elem.get('lon')))
+                elevations.append(elevation)
+                heart_rates.append(hr)
+                times.append(point_time)
+
+                if stack:
+                    stack[-1].remove(elem)
+
+        if not lats:
+            return pd.DataFrame()
+
+        hr_values = np.frombuffer(heart_rates, dtype=np.int16)
+        return pd.DataFrame({
+            'time': pd.to_datetime(pd.Series(times, dtype=object), format='ISO8601', utc=True),
+            'lat': np.frombuffer(lats, dtype=np.float64),
+            'lon': np.frombuffer(lons, dtype=np.float64),
+            'elevation': np.frombuffer(elevations, dtype=np.float64),
+            'heart_rate': pd.arrays.IntegerArray(hr_values.copy(), hr_values < 0),
+        })
+
+    @staticmethod
+    def _extension_heart_rate(extensions):
+        for extension in extensions or []:
+            for child in extension.iter():
+                if _local_name(child.tag) == 'hr' and child.text:
+                    value = _parse_heart_rate(child.text)
+                    if value is not None:
+                        return value
+        return None
+
+    def _load_gpxpy(self):
         try:
             with open(self.gpx_path, 'r', encoding='utf-8') as f:
                 gpx = gpxpy.parse(f)
@@ -32,26 +286,19 @@ class DataLoader:
                         'elevation': point.elevation,
                         'heart_rate': None
                     }
-                    
-                    # GPX 파일의 description 필드에서 심박수 정보를 추출. (예: "hr=145")
+
+                    # GPX 파일의 description 필드(예: "hr=145")나 Garmin TrackPointExtension 의 <hr> 에서
+                    # 심박수 정보를 추출. (스트리밍 파서와 같은 순서와 규칙)
                     if point.description and 'hr=' in point.description:
-                        try:
-                            hr_match = re.search(r'hr=(\d+)', point.description)
-                            if hr_match:
-                                point_data['heart_rate'] = int(hr_match.group(1))
-                        except Exception as e:
-                            print(f"Error parsing heart rate: {e}")
-                            
+                        hr_match = HR_PATTERN.search(point.description)
+                        if hr_match:
+                            point_data['heart_rate'] = _parse_heart_rate(hr_match.group(1))
+                    if point_data['heart_rate'] is None:
+                        point_data['heart_rate'] = self._extension_heart_rate(point.extensions)
+
                     data.append(point_data)
-        
+
         if not data:
             return pd.DataFrame()
 
-        df = pd.DataFrame(data)
-        
-        # 심박수 데이터가 없는 경우, 이전/이후 데이터로 채워넣어 유효한 값으로 변환.
-        if 'heart_rate' in df.columns:
-            df['heart_rate'] = df['heart_rate'].ffill().bfill()
-        
-        print(f"Data loaded: {len(df)} points")
-        return df
+        return pd.DataFrame(data)
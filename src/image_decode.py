@@ -0,0 +1,57 @@
+from PIL import Image, ImageOps
+
+try:
+    # HEIC/HEIF(아이폰 기본 형식)는 pillow-heif 가 설치된 경우에만 열 수 있음.
+    from pillow_heif import register_heif_opener
+    register_heif_opener()
+    HEIF_SUPPORTED = True
+except ImportError:
+    HEIF_SUPPORTED = False
+
+# CLIP 전처리 입력 크기 (짧은 변을 이 크기로 줄인 뒤 가운데를 잘라냄)
+CLIP_INPUT_SIZE = 224
+
+
+def _reducible(img):
+    """
+    reduce 가 지원하지 않는 모드(P, 1, I;16 등)를 지원하는 모드로 변환. 필요 없으면 그대로 반환.
+    - 팔레트(P/PA): 투명도가 있으면 RGBA, 없으면 RGB
+    - 1비트(1): L
+    - 16비트 흑백(I;16*): 상위 8비트만 남겨 L (그대로 RGB 로 바꾸면 255 이상이 모두 흰색이 됨)
+    """
+    if img.mode in ('P', 'PA'):
+        has_alpha = img.mode == 'PA' or 'transparency' in img.info
+        return img.convert('RGBA' if has_alpha else 'RGB')
+    if img.mode == '1':
+        return img.convert('L')
+    if img.mode.startswith('I;16'):
+        return img.convert('I').point(lambda v: v * (1 / 256)).convert('L')
+    return img
+
+
+def decode_image(path, min_size=CLIP_INPUT_SIZE, mode='RGB'):
+    """
+    이미지를 짧은 변이 min_size 이상인 범위에서 최대한 작게 디코딩하고 EXIF 방향을 적용하여 반환.
+    - JPEG: draft 로 DCT 단계에서 1/2, 1/4, 1/8 축소 디코딩 (원본 해상도 버퍼를 만들지 않음)
+    - 그 외(PNG, HEIC 등): 디코딩 후 reduce 로 정수 배 축소 (reduce 가 지원하지 않는 모드는 먼저 변환)
+    회전은 축소가 끝난 작은 이미지에 적용. mode 가 None 이면 원래 색상 모드(투명도 등)를 유지.
+    """
+    img = Image.open(path)
+    try:
+        img.draft('RGB', (min_size, min_size))
+        img.load()
+
+        decoded = _reducible(img)
+        factor = min(decoded.size) // min_size
+        if factor > 1:
+            decoded = decoded.reduce(factor)
+        decoded = ImageOps.exif_transpose(decoded)
+        if mode and decoded.mode != mode:
+            decoded = decoded.convert(mode)
+    except Exception:
+        img.close()
+        raise
+
+    if decoded is not img:
+        img.close()
+    return decoded
@@ -0,0 +1,191 @@
+import os
+import re
+from src.atomic_write import write_atomic
+
+# 추론 설정 기본값 (환경 변수로 변경)
+#  - RUNNERS_VIEW_MODEL: Hugging Face 모델 ID 또는 로컬 경로 (예: openai/clip-vit-base-patch32)
+#  - RUNNERS_VIEW_BACKEND: 'torch' (기본), 'torchscript', 'onnx'
+#  - RUNNERS_VIEW_QUANTIZE: 'none' (기본), 'int8' (Linear 레이어 동적 양자화)
+#  - RUNNERS_VIEW_TORCH_THREADS: 워커 프로세스당 연산 스레드 수 (기본: torch 기본값)
+DEFAULT_MODEL_ID = os.environ.get('RUNNERS_VIEW_MODEL', "openai/clip-vit-large-patch14")
+DEFAULT_BACKEND = os.environ.get('RUNNERS_VIEW_BACKEND', 'torch')
+DEFAULT_QUANTIZE = os.environ.get('RUNNERS_VIEW_QUANTIZE', 'none')
+TORCH_THREADS = int(os.environ.get('RUNNERS_VIEW_TORCH_THREADS', '0')) or None
+
+INFERENCE_BACKENDS = ('torch', 'torchscript', 'onnx')
+QUANTIZE_MODES = ('none', 'int8')
+
+# key 끝의 '@backend+quantize' 부분. 로컬 경로에 '@' 가 들어 있어도 알려진 조합일 때만 분리함.
+VARIANT_PATTERN = re.compile(rf"^(.+)@({'|'.join(INFERENCE_BACKENDS)})\+({'|'.join(QUANTIZE_MODES)})$")
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXPORT_DIR = os.path.join(project_root, 'data', 'cache', 'exports')
+
+
+class InferenceConfig:
+    """
+    모델 ID(또는 로컬 경로)와 비전 타워 추론 방식(백엔드, 양자화)의 조합.
+    key 는 레지스트리와 장면 캐시의 모델 식별자로 쓰이며, 'model_id@backend+quantize' 형식
+    (기본 설정인 torch/none 이면 model_id 그대로).
+    """
+    def __init__(self, model_id=DEFAULT_MODEL_ID, backend=DEFAULT_BACKEND, quantize=DEFAULT_QUANTIZE):
+        if backend not in INFERENCE_BACKENDS:
+            raise ValueError(f"Unknown inference backend: {backend} (expected one of {INFERENCE_BACKENDS})")
+        if quantize not in QUANTIZE_MODES:
+            raise ValueError(f"Unknown quantize mode: {quantize} (expected one of {QUANTIZE_MODES})")
+        self.model_id = model_id
+        self.backend = backend
+        self.quantize = quantize
+
+    @property
+    def key(self):
+        if self.backend == 'torch' and self.quantize == 'none':
+            return self.model_id
+        return f"{self.model_id}@{self.backend}+{self.quantize}"
+
+    @classmethod
+    def parse(cls, key):
+        """
+        key 문자열에서 설정을 복원. '@backend+quantize' 로 끝나지 않으면 key 전체를 모델 ID 로 보고 torch/none 으로 봄.
+        """
+        match = VARIANT_PATTERN.match(key)
+        if not match:
+            return cls(key, 'torch', 'none')
+        model_id, backend, quantize = match.groups()
+        return cls(model_id, backend, quantize)
+
+    def export_path(self, ext, export_dir=EXPORT_DIR):
+        safe_key = re.sub(r'[^A-Za-z0-9._+-]+', '_', self.key)
+        return os.path.join(export_dir, f"{safe_key}{ext}")
+
+    def to_dict(self):
+        return {'model_id': self.model_id, 'backend': self.backend, 'quantize': self.quantize}
+
+
+DEFAULT_MODEL_KEY = InferenceConfig().key
+
+
+def apply_thread_settings(num_threads=TORCH_THREADS):
+    """
+    torch 연산 스레드 수를 지정. 워커 여러 개가 한 노드의 코어를 나눠 쓰도록 (코어 수 / 워커 수) 로 맞춤.
+    """
+    import torch
+
+    if num_threads:
+        torch.set_num_threads(num_threads)
+    return torch.get_num_threads()
+
+
+def _image_size(processor):
+    crop_size = getattr(processor.image_processor, 'crop_size', None) or {}
+    return crop_size.get('height', 224), crop_size.get('width', 224)
+
+
+def _vision_module(model):
+    import torch
+
+    class VisionEncoder(torch.nn.Module):
+        """
+        pixel_values -> 이미지 임베딩 (정규화 전). 내보내기(trace/ONNX)용 래퍼.
+        """
+        def __init__(self, clip_model):
+            super().__init__()
+            self.clip_model = clip_model
+
+        def forward(self, pixel_values):
+            return self.clip_model.get_image_features(pixel_values=pixel_values)
+
+    return VisionEncoder(model).eval()
+
+
+def _torchscript_encoder(model, processor, config):
+    """
+    비전 타워를 TorchScript 로 trace 하여 파일로 저장(이미 있으면 재사용)하고 인코더 함수를 반환.
+    """
+    import torch
+
+    path = config.export_path('.torchscript.pt')
+    if os.path.exists(path):
+        traced = torch.jit.load(path)
+    else:
+        height, width = _image_size(processor)
+        example = torch.zeros(2, 3, height, width)
+        with torch.no_grad():
+            traced = torch.jit.trace(_vision_module(model), example, check_trace=False)
+        traced = torch.jit.freeze(traced.eval())
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_atomic(path, lambda tmp_path: torch.jit.save(traced, tmp_path))
+        print(f"TorchScript vision encoder saved to {path}")
+
+    return traced
+
+
+def _onnx_encoder(model, processor, config, num_threads=TORCH_THREADS):
+    """
+    비전 타워를 ONNX 로 내보내고(int8 이면 onnxruntime 동적 양자화 적용) ONNX Runtime 인코더 함수를 반환.
+    torch 의 동적 양자화 모델은 ONNX 로 내보낼 수 없으므로, 양자화는 ONNX 파일 단계에서 수행.
+    """
+    import torch
+    import onnxruntime as ort
+
+    path = config.export_path('.onnx')
+    if not os.path.exists(path):
+        height, width = _image_size(processor)
+        fp32_path = InferenceConfig(config.model_id, 'onnx', 'none').export_path('.onnx')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if not os.path.exists(fp32_path):
+            def export(tmp_path):
+                with torch.no_grad():
+                    torch.onnx.export(
+                        _vision_module(model), torch.zeros(1, 3, height, width), tmp_path,
+                        input_names=['pixel_values'], output_names=['image_embeds'],
+                        dynamic_axes={'pixel_values': {0: 'batch'}, 'image_embeds': {0: 'batch'}},
+                        opset_version=17,
+                    )
+            write_atomic(fp32_path, export)
+            print(f"ONNX vision encoder saved to {fp32_path}")
+
+        if config.quantize == 'int8':
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            write_atomic(path, lambda tmp_path: quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8))
+            print(f"Quantized ONNX vision encoder saved to {path}")
+
+    options = ort.SessionOptions()
+    if num_threads:
+        options.intra_op_num_threads = num_threads
+    session = ort.InferenceSession(path, sess_options=options, providers=['CPUExecutionProvider'])
+
+    def encode(pixel_values):
+        outputs = session.run(None, {'pixel_values': pixel_values.numpy()})
+        return torch.from_numpy(outputs[0])
+
+    return encode
+
+
+def load_clip(config, num_threads=TORCH_THREADS):
+    """
+    설정에 맞게 CLIP 모델과 프로세서를 로딩하고 (model, processor, image_encoder) 를 반환.
+    image_encoder(pixel_values) 는 정규화 전 이미지 임베딩을 반환하는 함수.
+    텍스트 임베딩은 모든 백엔드에서 (캐시된) torch 모델로 계산.
+    """
+    import torch
+    from transformers import CLIPProcessor, CLIPModel
+
+    apply_thread_settings(num_threads)
+
+    model = CLIPModel.from_pretrained(config.model_id)
+    model.eval()
+    processor = CLIPProcessor.from_pretrained(config.model_id, use_fast=True)
+
+    if config.backend == 'onnx':
+        return model, processor, _onnx_encoder(model, processor, config, num_threads)
+
+    if config.quantize == 'int8':
+        # Linear 레이어 가중치를 int8 로 바꾸고 활성값은 실행 시 동적으로 양자화 (CPU 전용)
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    if config.backend == 'torchscript':
+        return model, processor, _torchscript_encoder(model, processor, config)
+
+    return model, processor, lambda pixel_values: model.get_image_features(pixel_values=pixel_values)
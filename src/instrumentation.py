@@ -0,0 +1,207 @@
+import os
+import json
+import logging
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+# 단계별 소요 시간 히스토그램 구간 (초)
+HISTOGRAM_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# RUNNERS_VIEW_TRACEMALLOC=1 이면 파이썬 힙의 단계별 최대 사용량도 기록
+# (프로세스 전역 추적이므로 동시 요청이 있으면 값이 섞일 수 있음)
+TRACE_PYTHON_MEMORY = os.environ.get('RUNNERS_VIEW_TRACEMALLOC', '0') == '1'
+
+_logger = logging.getLogger('runners_view.metrics')
+if not _logger.handlers:
+    _handler = logging.StreamHandler(sys.stdout)
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    _logger.addHandler(_handler)
+    _logger.setLevel(logging.INFO)
+    _logger.propagate = False
+
+
+def get_rss_mb():
+    """
+    현재 프로세스의 상주 메모리(RSS)를 MB 단위로 반환.
+    /proc 를 읽을 수 없는 환경에서는 최대 RSS 값으로 대체.
+    """
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def get_peak_rss_mb():
+    """
+    프로세스 시작 이후 최대 RSS(MB). (Linux 기준 ru_maxrss 는 KB 단위)
+    """
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Histogram:
+    """
+    누적 구간 카운트 방식의 간단한 히스토그램.
+    """
+    def __init__(self, buckets=HISTOGRAM_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def to_dict(self):
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(list(self.buckets) + ['+Inf'], self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {
+            'count': self.count,
+            'sum': round(self.total, 4),
+            'max': round(self.max, 4),
+            'buckets': buckets,
+        }
+
+
+class MetricsRegistry:
+    """
+    프로세스 전역의 단계별 히스토그램과 최근 요청별 단계 분석 결과를 보관.
+    """
+    def __init__(self, recent_size=50):
+        self._histograms = {}
+        self._recent = deque(maxlen=recent_size)
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds):
+        with self._lock:
+            self._histograms.setdefault(name, Histogram()).observe(seconds)
+
+    def add_request(self, breakdown):
+        with self._lock:
+            self._recent.append(breakdown)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'pid': os.getpid(),
+                'rss_mb': round(get_rss_mb(), 1),
+                'process_peak_rss_mb': round(get_peak_rss_mb(), 1),
+                'histograms': {name: h.to_dict() for name, h in sorted(self._histograms.items())},
+                'recent_requests': list(self._recent),
+            }
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics_registry():
+    return _registry
+
+
+class PipelineMetrics:
+    """
+    요청 하나의 파이프라인 단계별 소요 시간과 메모리 변화를 기록하는 클래스.
+
+    - stage(name): with 블록의 시간, RSS 변화, (선택) 파이썬 힙 최대 사용량을 기록
+    - record(name, seconds): 사진별 전처리/배치 추론처럼 여러 번 반복되는 작업의 시간을 누적
+
+    요청 단위 메모리는 시작 시점과 각 단계 전후에 잰 RSS 로 계산 (rss_delta_mb, max_rss_mb).
+    process_peak_rss_mb 는 워커 프로세스가 시작된 이후의 최댓값이라 요청별 값이 아님.
+    """
+    def __init__(self, request_id=None, registry=None):
+        self.request_id = request_id
+        self.registry = registry or get_metrics_registry()
+        self.stages = {}
+        self.counters = {}
+        self.started = time.perf_counter()
+        self.rss_start_mb = get_rss_mb()
+        self.max_rss_mb = self.rss_start_mb
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        rss_before = get_rss_mb()
+        tracing = TRACE_PYTHON_MEMORY
+        if tracing:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            rss_after = get_rss_mb()
+            info = {
+                'seconds': round(seconds, 4),
+                'rss_mb': round(rss_after, 1),
+                'rss_delta_mb': round(rss_after - rss_before, 1),
+            }
+            if tracing:
+                info['py_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+
+            with self._lock:
+                self.stages[name] = info
+                self.max_rss_mb = max(self.max_rss_mb, rss_before, rss_after)
+            self.registry.observe(name, seconds)
+
+    def record(self, name, seconds, count=1):
+        with self._lock:
+            counter = self.counters.setdefault(name, {'count': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+            counter['count'] += count
+            counter['seconds'] += seconds
+            counter['max_seconds'] = max(counter['max_seconds'], seconds)
+        self.registry.observe(name, seconds)
+
+    def to_dict(self):
+        rss_mb = get_rss_mb()
+        with self._lock:
+            return {
+                'request_id': self.request_id,
+                'total_seconds': round(time.perf_counter() - self.started, 4),
+                'rss_start_mb': round(self.rss_start_mb, 1),
+                'rss_delta_mb': round(rss_mb - self.rss_start_mb, 1),
+                'max_rss_mb': round(max(self.max_rss_mb, rss_mb), 1),
+                'process_peak_rss_mb': round(get_peak_rss_mb(), 1),
+                'stages': dict(self.stages),
+                'counters': {
+                    name: {
+                        'count': c['count'],
+                        'seconds': round(c['seconds'], 4),
+                        'max_seconds': round(c['max_seconds'], 4),
+                    }
+                    for name, c in self.counters.items()
+                },
+            }
+
+    def finish(self):
+        """
+        요청 처리가 끝나면 호출. 전체 시간을 히스토그램에 기록하고 JSON 로그 한 줄을 출력.
+        """
+        breakdown = self.to_dict()
+        self.registry.observe('total', breakdown['total_seconds'])
+        self.registry.add_request(breakdown)
+        _logger.info(json.dumps({'event': 'pipeline_metrics', **breakdown}, ensure_ascii=False))
+        return breakdown
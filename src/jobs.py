@@ -0,0 +1,269 @@
+import json
+import os
+import queue
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from src.atomic_write import write_text_atomic
+
+
+# 작업 실패 원인을 사용자에게 보여줄 수 없을 때(예상하지 못한 예외)의 오류 메시지
+GENERIC_ERROR_MESSAGE = "지도 생성 중 오류가 발생했습니다."
+
+
+class QueueFullError(Exception):
+    """
+    대기열이 가득 차서 작업을 더 받을 수 없을 때 발생.
+    """
+
+
+class JobFailed(Exception):
+    """
+    사용자에게 그대로 보여줘도 되는 메시지로 작업을 실패 처리할 때 발생.
+    그 밖의 예외는 서버 로그에만 남기고 사용자에게는 GENERIC_ERROR_MESSAGE 를 반환.
+    """
+
+
+class Job:
+    """
+    지도 생성 작업 하나의 상태와 단계별 진행률을 보관하는 클래스.
+    """
+    def __init__(self, func, args, kwargs, on_change=None):
+        self.id = uuid.uuid4().hex
+        self.on_change = on_change
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+        self.status = 'queued'   # queued -> running -> done / failed
+        self.stage = 'queued'
+        self.progress = 0.0
+        self.stages = {}
+        self.result = None
+        self.result_path = None
+        self.error = None
+
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def update(self, stage, progress=0.0):
+        """
+        현재 단계와 그 단계의 진행률(0~1)을 기록. 파이프라인에서 콜백으로 호출됨.
+        """
+        with self._lock:
+            if stage != self.stage and self.stage in self.stages:
+                self.stages[self.stage]['progress'] = 1.0
+            self.stage = stage
+            self.progress = max(0.0, min(1.0, float(progress)))
+            self.stages.setdefault(stage, {'started_at': time.time(), 'progress': 0.0})
+            self.stages[stage]['progress'] = self.progress
+        if self.on_change:
+            self.on_change(self)
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'job_id': self.id,
+                'status': self.status,
+                'stage': self.stage,
+                'progress': round(self.progress, 3),
+                'stages': {
+                    name: {'progress': round(info['progress'], 3)}
+                    for name, info in self.stages.items()
+                },
+                'error': self.error,
+                'queued_seconds': round((self.started_at or time.time()) - self.created_at, 3),
+                'elapsed_seconds': round((self.finished_at or time.time()) - self.started_at, 3) if self.started_at else None,
+            }
+
+
+class JobQueue:
+    """
+    고정된 수의 워커 스레드가 처리하는 크기 제한 작업 대기열.
+    대기열이 가득 차면 submit 이 QueueFullError 를 발생시켜 호출 측에서 요청을 거절(백프레셔)하도록 함.
+    완료된 작업은 최근 max_finished 개만 메모리에 보관.
+
+    state_dir 를 지정하면 작업 상태(<id>.json)와 결과(<id>.html)를 파일로 기록하여,
+    작업을 실행하지 않은 다른 워커 프로세스에서도 상태 조회와 결과 제공이 가능.
+    이때 결과 HTML 은 메모리에 두지 않고 파일 경로만 보관 (result_path 로 스트리밍).
+    """
+    def __init__(self, max_workers=2, max_queue=16, max_finished=100, state_dir=None):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.max_finished = max_finished
+        self.state_dir = state_dir
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._workers = []
+        self._started = False
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            for i in range(self.max_workers):
+                worker = threading.Thread(target=self._work, name=f"map-job-worker-{i}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+            self._started = True
+
+    def submit(self, func, *args, **kwargs):
+        """
+        작업을 대기열에 넣고 Job 을 반환. func 는 첫 인자로 Job 을 받음.
+        """
+        self.start()
+        job = Job(func, args, kwargs, on_change=self._persist)
+        with self._lock:
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                raise QueueFullError(f"Job queue is full ({self.max_queue} pending)")
+            self._jobs[job.id] = job
+            self._trim()
+        self._persist(job)
+        return job
+
+    def is_full(self):
+        return self._queue.full()
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def status(self, job_id):
+        """
+        작업 상태 딕셔너리를 반환. 이 프로세스에 없으면 state_dir 의 기록을 조회. 없으면 None.
+        """
+        job = self.get(job_id)
+        if job is not None:
+            return job.to_dict()
+
+        path = self._state_path(job_id, '.json')
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                return None
+        return None
+
+    def result(self, job_id):
+        """
+        완료된 작업의 결과(지도 HTML)를 반환. 없으면 None.
+        """
+        job = self.get(job_id)
+        if job is not None and job.result is not None:
+            return job.result
+
+        path = self.result_path(job_id)
+        if path:
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+        return None
+
+    def result_path(self, job_id):
+        """
+        완료된 작업의 결과 파일 경로를 반환. 파일로 기록되지 않았으면 None.
+        """
+        path = self._state_path(job_id, '.html')
+        if path and os.path.exists(path):
+            return path
+        return None
+
+    def _state_path(self, job_id, ext):
+        if not self.state_dir or not job_id.isalnum():
+            return None
+        return os.path.join(self.state_dir, f"{job_id}{ext}")
+
+    def _persist(self, job):
+        path = self._state_path(job.id, '.json')
+        if not path:
+            return
+
+        try:
+            write_text_atomic(path, json.dumps(job.to_dict()))
+        except OSError as e:
+            print(f"Error writing job state: {e}")
+
+    def cleanup_state(self, max_age_seconds, now=None):
+        """
+        state_dir 에서 max_age_seconds 보다 오래된 작업 상태/결과 파일을 삭제하고 삭제한 파일 수를 반환.
+        """
+        if not self.state_dir or not os.path.isdir(self.state_dir):
+            return 0
+
+        now = now or time.time()
+        removed = 0
+        for filename in os.listdir(self.state_dir):
+            path = os.path.join(self.state_dir, filename)
+            try:
+                if now - os.path.getmtime(path) >= max_age_seconds:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def stats(self):
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {
+            'workers': self.max_workers,
+            'max_queue': self.max_queue,
+            'queued': self._queue.qsize(),
+            'running': statuses.count('running'),
+        }
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in ('done', 'failed')]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+    def _store_result(self, job, result):
+        """
+        결과를 state_dir 의 파일로 기록하고 경로만 보관. state_dir 가 없거나 기록에 실패하면 메모리에 보관.
+        """
+        path = self._state_path(job.id, '.html')
+        if path and result is not None:
+            try:
+                write_text_atomic(path, result)
+                job.result_path = path
+                return
+            except OSError as e:
+                print(f"Error writing job result: {e}")
+        job.result = result
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            job.status = 'running'
+            job.started_at = time.time()
+            self._persist(job)
+            try:
+                self._store_result(job, job.func(job, *job.args, **job.kwargs))
+                job.status = 'done'
+                job.update('done', 1.0)
+            except JobFailed as e:
+                job.error = str(e)
+                job.status = 'failed'
+            except Exception:
+                # 내부 경로 등이 담긴 예외 내용은 로그에만 남김
+                print(f"Job {job.id} failed:")
+                traceback.print_exc()
+                job.error = GENERIC_ERROR_MESSAGE
+                job.status = 'failed'
+            finally:
+                job.finished_at = time.time()
+                job.func = job.args = job.kwargs = None
+                self._persist(job)
+                with self._lock:
+                    self._trim()
+                self._queue.task_done()
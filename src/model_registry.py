@@ -0,0 +1,180 @@
+import os
+import hashlib
+import json
+import threading
+import time
+from src.atomic_write import write_atomic
+from src.inference_backend import DEFAULT_MODEL_KEY, TORCH_THREADS, InferenceConfig, load_clip
+from src.instrumentation import get_rss_mb
+
+# torch / transformers 는 임포트만으로 수 초와 수백 MB 가 들기 때문에,
+# 실제로 모델이 필요한 시점에 각 함수 안에서 임포트함.
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEXT_FEATURE_CACHE_DIR = os.path.join(project_root, 'data', 'cache', 'text_features')
+
+
+class LoadedModel:
+    """
+    한 번 로딩된 CLIP 모델과 프로세서, 추론용 잠금 및 로딩 통계를 묶어두는 클래스.
+    image_encoder 를 주면 비전 타워 추론에 사용 (TorchScript/ONNX/양자화 백엔드). 없으면 model 을 그대로 사용.
+    text_cache_dir 는 텍스트 임베딩 디스크 캐시 폴더 (None 이면 디스크에 저장하지 않음).
+    """
+    def __init__(self, model_id, model, processor, load_seconds, rss_delta_mb, image_encoder=None, num_threads=None,
+                 text_cache_dir=TEXT_FEATURE_CACHE_DIR):
+        self.model_id = model_id
+        self.model = model
+        self.processor = processor
+        self.load_seconds = load_seconds
+        self.rss_delta_mb = rss_delta_mb
+        self.image_encoder = image_encoder
+        self.num_threads = num_threads
+        self.text_cache_dir = text_cache_dir
+        # 여러 요청 스레드가 같은 모델을 공유하므로 추론은 잠금 안에서 수행.
+        self.lock = threading.Lock()
+        self._text_features = {}
+
+    def text_features(self, prompts):
+        """
+        후보 문장들의 정규화된 텍스트 임베딩 행렬을 반환.
+        모델 ID와 문장 목록으로 키를 만들어 메모리와 디스크(text_cache_dir)에 캐싱.
+        """
+        import torch
+
+        cache_dir = self.text_cache_dir
+
+        key = hashlib.sha256(
+            json.dumps([self.model_id, list(prompts)], ensure_ascii=False).encode('utf-8')
+        ).hexdigest()[:32]
+
+        features = self._text_features.get(key)
+        if features is not None:
+            return features
+
+        cache_path = os.path.join(cache_dir, f"{key}.pt") if cache_dir else None
+        if cache_path and os.path.exists(cache_path):
+            try:
+                features = torch.load(cache_path)
+            except Exception as e:
+                print(f"Error reading text feature cache: {e}")
+
+        if features is None:
+            inputs = self.processor(text=list(prompts), return_tensors="pt", padding=True)
+            with self.lock, torch.no_grad():
+                features = self.model.get_text_features(**inputs)
+            features = features / features.norm(dim=-1, keepdim=True)
+
+            if cache_path:
+                try:
+                    os.makedirs(cache_dir, exist_ok=True)
+                    write_atomic(cache_path, lambda tmp_path: torch.save(features, tmp_path))
+                except OSError as e:
+                    print(f"Error writing text feature cache: {e}")
+
+        self._text_features[key] = features
+        return features
+
+    def image_logits(self, pixel_values, text_features):
+        """
+        비전 타워만 실행한 뒤, 캐싱된 텍스트 행렬과의 행렬곱으로 로짓을 계산.
+        """
+        import torch
+
+        with self.lock, torch.no_grad():
+            if self.image_encoder is not None:
+                image_features = self.image_encoder(pixel_values)
+            else:
+                image_features = self.model.get_image_features(pixel_values=pixel_values)
+            image_features = image_features / image_features.norm(dim=-1, keepdim=True)
+            logit_scale = self.model.logit_scale.exp()
+        return logit_scale * image_features @ text_features.T
+
+    def stats(self):
+        return {
+            'model_id': self.model_id,
+            **InferenceConfig.parse(self.model_id).to_dict(),
+            'num_threads': self.num_threads,
+            'load_seconds': round(self.load_seconds, 3),
+            'rss_delta_mb': round(self.rss_delta_mb, 1),
+        }
+
+
+class ModelRegistry:
+    """
+    프로세스(워커) 단위로 CLIP 모델을 한 번만 로딩해 공유하는 레지스트리.
+    모델은 InferenceConfig.key (모델 ID 또는 'model_id@backend+quantize') 로 구분.
+    """
+    def __init__(self):
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_id=DEFAULT_MODEL_KEY):
+        """
+        요청한 모델을 반환. 아직 로딩되지 않았다면 최초 1회만 로딩.
+        """
+        entry = self._models.get(model_id)
+        if entry is not None:
+            return entry
+
+        with self._lock:
+            entry = self._models.get(model_id)
+            if entry is None:
+                entry = self._load(model_id)
+                self._models[model_id] = entry
+        return entry
+
+    def register(self, model_id, entry):
+        """
+        이미 준비된 LoadedModel 을 등록. (벤치마크용 소형 모델 등)
+        """
+        with self._lock:
+            self._models[model_id] = entry
+        return entry
+
+    def is_loaded(self, model_id=DEFAULT_MODEL_KEY):
+        return model_id in self._models
+
+    def stats(self):
+        """
+        로딩된 모델별 로딩 시간/메모리 증가량과 현재 프로세스 RSS를 반환.
+        """
+        return {
+            'pid': os.getpid(),
+            'rss_mb': round(get_rss_mb(), 1),
+            'models': [entry.stats() for entry in self._models.values()],
+        }
+
+    def _load(self, model_id):
+        config = InferenceConfig.parse(model_id)
+        print(f"Loading AI Model ({config.model_id}, backend={config.backend}, quantize={config.quantize})...")
+        rss_before = get_rss_mb()
+        started = time.perf_counter()
+
+        model, processor, image_encoder = load_clip(config, TORCH_THREADS)
+
+        import torch
+        num_threads = torch.get_num_threads()
+        load_seconds = time.perf_counter() - started
+        rss_delta_mb = get_rss_mb() - rss_before
+        print(
+            f"Model loaded in {load_seconds:.2f}s (+{rss_delta_mb:.0f} MB RSS, "
+            f"{num_threads} threads, pid={os.getpid()})"
+        )
+
+        encoder = None if config.backend == 'torch' and config.quantize == 'none' else image_encoder
+        return LoadedModel(model_id, model, processor, load_seconds, rss_delta_mb, encoder, num_threads)
+
+
+# 프로세스 전역 레지스트리 (gunicorn 워커마다 하나씩 생성됨)
+_registry = ModelRegistry()
+
+
+def get_registry():
+    return _registry
+
+
+def warm_up(model_id=DEFAULT_MODEL_KEY):
+    """
+    첫 요청 전에 모델을 미리 로딩. gunicorn post_fork 훅 등에서 호출.
+    """
+    return _registry.get(model_id)
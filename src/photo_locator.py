@@ -0,0 +1,237 @@
+import os
+from datetime import datetime, timedelta, timezone
+import numpy as np
+import pandas as pd
+import piexif
+from PIL import Image
+
+
+def _rational_to_float(value):
+    numerator, denominator = value
+    return numerator / denominator if denominator else 0.0
+
+
+def _gps_to_degrees(dms, ref):
+    """
+    EXIF GPS 의 (도, 분, 초) 유리수 튜플을 십진수 좌표로 변환.
+    """
+    degrees = _rational_to_float(dms[0]) + _rational_to_float(dms[1]) / 60 + _rational_to_float(dms[2]) / 3600
+    if ref in (b'S', b'W', 'S', 'W'):
+        degrees = -degrees
+    return degrees
+
+
+def _parse_offset(value):
+    """
+    EXIF OffsetTimeOriginal ("+09:00") 을 timezone 객체로 변환.
+    """
+    if isinstance(value, bytes):
+        value = value.decode('ascii', errors='ignore')
+    value = value.strip('\x00 ')
+    if len(value) != 6 or value[0] not in '+-':
+        return None
+
+    sign = 1 if value[0] == '+' else -1
+    hours, minutes = int(value[1:3]), int(value[4:6])
+    return timezone(sign * timedelta(hours=hours, minutes=minutes))
+
+
+def _load_exif(path):
+    try:
+        return piexif.load(path)
+    except Exception:
+        pass
+
+    # JPEG 이외의 형식(PNG, HEIC 등)은 Pillow 가 읽은 EXIF 바이트를 사용.
+    with Image.open(path) as img:
+        exif_bytes = img.info.get('exif')
+    if not exif_bytes:
+        return None
+    return piexif.load(exif_bytes)
+
+
+def read_photo_metadata(path):
+    """
+    사진의 EXIF 에서 촬영 시각(DateTimeOriginal)과 GPS 좌표를 읽어 반환.
+    값이 없으면 각 항목은 None.
+    """
+    meta = {'time': None, 'lat': None, 'lon': None}
+    try:
+        exif = _load_exif(path)
+    except Exception as e:
+        print(f"Error reading EXIF from {os.path.basename(path)}: {e}")
+        return meta
+
+    if not exif:
+        return meta
+
+    exif_ifd = exif.get('Exif') or {}
+    raw_time = exif_ifd.get(piexif.ExifIFD.DateTimeOriginal) or (exif.get('0th') or {}).get(piexif.ImageIFD.DateTime)
+    if raw_time:
+        try:
+            taken = datetime.strptime(raw_time.decode('ascii').strip('\x00 '), '%Y:%m:%d %H:%M:%S')
+            offset = exif_ifd.get(piexif.ExifIFD.OffsetTimeOriginal)
+            tz = _parse_offset(offset) if offset else None
+            meta['time'] = taken.replace(tzinfo=tz) if tz else taken
+        except (ValueError, UnicodeDecodeError):
+            pass
+
+    gps_ifd = exif.get('GPS') or {}
+    try:
+        if piexif.GPSIFD.GPSLatitude in gps_ifd and piexif.GPSIFD.GPSLongitude in gps_ifd:
+            meta['lat'] = _gps_to_degrees(gps_ifd[piexif.GPSIFD.GPSLatitude], gps_ifd.get(piexif.GPSIFD.GPSLatitudeRef))
+            meta['lon'] = _gps_to_degrees(gps_ifd[piexif.GPSIFD.GPSLongitude], gps_ifd.get(piexif.GPSIFD.GPSLongitudeRef))
+    except (TypeError, ValueError, ZeroDivisionError, IndexError):
+        meta['lat'] = meta['lon'] = None
+
+    return meta
+
+
+# 시간대 정보가 없는 사진의 UTC 오프셋을 추정할 때 시도하는 후보 범위와 간격 (UTC-14:00 ~ UTC+14:00, 15분 단위)
+MAX_UTC_OFFSET_S = 14 * 3600
+UTC_OFFSET_STEP_S = 15 * 60
+
+
+class PhotoLocator:
+    """
+    사진의 촬영 시각을 GPX 의 정렬된 시간 인덱스와 대조하여 경로상의 위치를 계산하는 클래스.
+
+    - clock_offset_s: 카메라 시계 보정값(초). 사진 시각에 더해진 뒤 비교됨.
+    - tolerance_s: 경로상 가장 가까운 기록 지점과의 허용 시간 차(초).
+    - utc_offset_s: EXIF 에 시간대 정보가 없는 사진(카메라 현지 시각)의 UTC 오프셋(초, 예: KST 는 32400).
+      None 이면 GPX 경로 시각 범위에 가장 많은 사진이 들어가는 오프셋을 추정.
+      GPX 시각에 시간대가 없으면 사진과 같은 기준 시각으로 간주하여 적용하지 않음.
+    """
+    def __init__(self, gpx_df, clock_offset_s=0, tolerance_s=300, utc_offset_s=None):
+        self.clock_offset_s = clock_offset_s
+        self.tolerance_s = tolerance_s
+        self.utc_offset_s = utc_offset_s
+
+        times = pd.to_datetime(gpx_df['time'], errors='coerce') if 'time' in gpx_df.columns else pd.Series(pd.NaT, index=gpx_df.index)
+        self.all_times = times
+        self.track_tz = getattr(times.dt, 'tz', None) if len(times) else None
+        if self.track_tz is not None:
+            times = times.dt.tz_convert('UTC').dt.tz_localize(None)
+
+        valid = times.notna().to_numpy()
+        order = np.argsort(times[valid].to_numpy(), kind='stable')
+        self.track_ns = times[valid].to_numpy().astype('datetime64[ns]').astype(np.int64)[order]
+        self.track_lat = gpx_df['lat'].to_numpy(dtype=np.float64)[valid][order]
+        self.track_lon = gpx_df['lon'].to_numpy(dtype=np.float64)[valid][order]
+        self.all_lat = gpx_df['lat'].to_numpy(dtype=np.float64)
+        self.all_lon = gpx_df['lon'].to_numpy(dtype=np.float64)
+
+    def _to_track_ns(self, photo_time):
+        """
+        사진 시각을 GPX 시간 인덱스와 같은 기준(ns, 시간대 없는 값)으로 변환하여 (ns, 시간대 없음 여부) 를 반환.
+        시간대가 없는 사진은 아직 현지 시각 그대로이며, locate() 에서 UTC 오프셋을 적용.
+        """
+        if photo_time is None:
+            return None, False
+
+        ts = pd.Timestamp(photo_time) + pd.Timedelta(seconds=self.clock_offset_s)
+        naive = ts.tzinfo is None
+        if not naive:
+            if self.track_tz is not None:
+                ts = ts.tz_convert('UTC')
+            ts = ts.tz_localize(None)
+        return ts.value, naive
+
+    def infer_utc_offset(self, local_ns):
+        """
+        현지 시각(ns) 배열을 UTC 로 바꿨을 때 GPX 시각 범위(허용 오차 포함)에 가장 많은 사진이 들어가는 오프셋(초).
+        같은 개수면 실제 시간대에 흔한 정시 > 30분 > 15분 단위, 그다음 절댓값이 작은 오프셋을 선택.
+        어느 후보도 맞지 않으면 0.
+        """
+        if not len(self.track_ns) or not len(local_ns):
+            return 0
+
+        candidates = np.arange(-MAX_UTC_OFFSET_S, MAX_UTC_OFFSET_S + 1, UTC_OFFSET_STEP_S, dtype=np.int64)
+        order = np.lexsort((np.abs(candidates), candidates % 1800 != 0, candidates % 3600 != 0))
+        candidates = candidates[order]
+        tolerance_ns = int(self.tolerance_s * 1e9)
+        start, end = self.track_ns[0] - tolerance_ns, self.track_ns[-1] + tolerance_ns
+
+        utc_ns = np.asarray(local_ns, dtype=np.int64)[None, :] - candidates[:, None] * 1_000_000_000
+        counts = ((utc_ns >= start) & (utc_ns <= end)).sum(axis=1)
+        best = int(np.argmax(counts))
+        return int(candidates[best]) if counts[best] else 0
+
+    def locate(self, metas):
+        """
+        사진 메타데이터 목록(read_photo_metadata 결과)을 받아
+        lat, lon, time, placement 열을 가진 DataFrame 을 같은 순서로 반환.
+
+        placement 값:
+          - 'exif_gps': EXIF GPS 좌표 사용
+          - 'exif_time': 촬영 시각으로 경로상 위치를 보간
+          - 'fallback': 시각/GPS 정보가 없어 경로를 따라 균등 배치
+          - 'unmatched': 촬영 시각이 허용 범위를 벗어나 'fallback' 과 같이 경로를 따라 균등 배치
+        """
+        count = len(metas)
+        lat = np.full(count, np.nan)
+        lon = np.full(count, np.nan)
+        photo_ns = np.full(count, np.iinfo(np.int64).min, dtype=np.int64)
+        placement = np.full(count, 'fallback', dtype=object)
+
+        has_time = np.zeros(count, dtype=bool)
+        naive = np.zeros(count, dtype=bool)
+        for i, meta in enumerate(metas):
+            ns, naive[i] = self._to_track_ns(meta.get('time'))
+            if ns is not None:
+                photo_ns[i] = ns
+                has_time[i] = True
+
+        # 시간대 없는 사진 시각(현지 시각)을 GPX 의 UTC 기준으로 변환
+        naive &= has_time
+        if self.track_tz is not None and naive.any():
+            utc_offset_s = self.utc_offset_s
+            if utc_offset_s is None:
+                utc_offset_s = self.infer_utc_offset(photo_ns[naive])
+                if utc_offset_s:
+                    print(f"Assuming photos without a time zone were taken at UTC{utc_offset_s / 3600:+g}h")
+            photo_ns[naive] -= int(utc_offset_s * 1e9)
+
+        # 촬영 시각 -> 정렬된 시간 인덱스에서 이분 탐색 후 인접 두 지점 사이를 선형 보간
+        n = len(self.track_ns)
+        if n and has_time.any():
+            p = photo_ns[has_time]
+            idx = np.searchsorted(self.track_ns, p)
+            lo = np.clip(idx - 1, 0, n - 1)
+            hi = np.clip(idx, 0, n - 1)
+
+            span = (self.track_ns[hi] - self.track_ns[lo]).astype(np.float64)
+            weight = np.divide(
+                (p - self.track_ns[lo]).astype(np.float64), span,
+                out=np.zeros_like(span), where=span > 0
+            )
+            weight = np.clip(weight, 0.0, 1.0)
+
+            gap_s = np.minimum(np.abs(p - self.track_ns[lo]), np.abs(p - self.track_ns[hi])) / 1e9
+            matched = gap_s <= self.tolerance_s
+
+            target = np.flatnonzero(has_time)
+            lat[target] = np.where(matched, self.track_lat[lo] + weight * (self.track_lat[hi] - self.track_lat[lo]), np.nan)
+            lon[target] = np.where(matched, self.track_lon[lo] + weight * (self.track_lon[hi] - self.track_lon[lo]), np.nan)
+            placement[target] = np.where(matched, 'exif_time', 'unmatched')
+
+        # EXIF GPS 가 있으면 보간 결과보다 우선
+        for i, meta in enumerate(metas):
+            if meta.get('lat') is not None and meta.get('lon') is not None:
+                lat[i], lon[i] = meta['lat'], meta['lon']
+                placement[i] = 'exif_gps'
+
+        # 시각과 GPS 가 모두 없거나 시각이 경로 범위를 벗어난 사진은 경로를 따라 균등한 간격으로 배치 (결정적)
+        fallback = np.flatnonzero((placement == 'fallback') | (placement == 'unmatched'))
+        if len(fallback) and len(self.all_lat):
+            positions = np.linspace(0, len(self.all_lat) - 1, len(fallback) + 2)[1:-1].round().astype(int)
+            lat[fallback] = self.all_lat[positions]
+            lon[fallback] = self.all_lon[positions]
+
+        times = pd.Series(pd.to_datetime(photo_ns.astype('datetime64[ns]')))
+        if self.track_tz is not None:
+            times = times.dt.tz_localize('UTC').dt.tz_convert(self.track_tz)
+        if len(fallback) and len(self.all_lat):
+            times.iloc[fallback] = self.all_times.iloc[positions].to_numpy()
+
+        return pd.DataFrame({'lat': lat, 'lon': lon, 'time': times, 'placement': placement})
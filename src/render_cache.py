@@ -0,0 +1,113 @@
+import os
+import hashlib
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.atomic_write import write_text_atomic
+from src.scene_cache import hash_file
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_DIR = os.path.join(project_root, 'data', 'cache', 'rendered')
+
+# 지도 렌더링 방식이 바뀌어 기존 결과를 쓰면 안 될 때 올리는 버전
+RENDER_CACHE_VERSION = 3
+
+
+def hash_inputs(gpx_path, photo_paths, options, num_workers=4):
+    """
+    GPX 내용, 사진(파일 이름 + 내용), 렌더링 옵션을 하나의 캐시 키로 합침.
+    사진 이름은 팝업에 표시되므로 내용이 같아도 이름이 다르면 다른 키가 됨.
+    """
+    photo_paths = sorted(photo_paths)
+    with ThreadPoolExecutor(max_workers=num_workers) as pool:
+        hashes = list(pool.map(hash_file, [gpx_path] + photo_paths))
+
+    payload = {
+        'version': RENDER_CACHE_VERSION,
+        'gpx': hashes[0],
+        'photos': [[os.path.basename(p), h] for p, h in zip(photo_paths, hashes[1:])],
+        'options': options,
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class RenderCache:
+    """
+    입력 내용 해시를 키로 렌더링된 지도 HTML 을 파일(<키>.html)로 저장하는 캐시.
+    파일 수정 시각을 마지막 사용 시각으로 사용하며, 전체 크기가 max_bytes 를 넘거나
+    개수가 max_entries 를 넘으면 가장 오래 사용되지 않은 파일부터 삭제(LRU).
+    파일 단위로 기록/교체하므로 여러 워커 프로세스가 같은 폴더를 공유해도 됨.
+    """
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_entries=500, max_bytes=1024 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.html")
+
+    def get(self, key):
+        """
+        저장된 HTML 을 반환. 없으면 None.
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                html = f.read()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return html
+
+    def put(self, key, html):
+        path = self._path(key)
+        write_text_atomic(path, html)
+        self._evict()
+
+    def _entries(self):
+        entries = []
+        for filename in os.listdir(self.cache_dir):
+            if not filename.endswith('.html'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, filename))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, filename))
+        return entries
+
+    def _evict(self):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        count = len(entries)
+        for _, size, filename in entries:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, filename))
+            except OSError:
+                continue
+            count -= 1
+            total -= size
+
+    def stats(self):
+        entries = self._entries()
+        with self._lock:
+            return {
+                'entries': len(entries),
+                'bytes': sum(size for _, size, _ in entries),
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
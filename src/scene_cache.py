@@ -0,0 +1,131 @@
+import os
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_PATH = os.path.join(project_root, 'data', 'cache', 'scene_cache.sqlite')
+
+
+def hash_file(path, chunk_size=1024 * 1024):
+    """
+    파일 내용의 SHA-256 해시를 반환. 같은 사진은 파일명이 달라도 같은 값을 가짐.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_candidates(candidates):
+    """
+    후보 문장 목록의 해시. 문장이 하나라도 바뀌면 기존 캐시는 사용되지 않음.
+    """
+    return hashlib.sha256(json.dumps(list(candidates), ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class SceneCache:
+    """
+    이미지 내용 해시 + 모델 ID + 후보 문장 해시를 키로 장면 분류 결과를 저장하는 SQLite 캐시.
+    저장 개수가 max_entries 를 넘으면 가장 오래 사용되지 않은 항목부터 삭제(LRU).
+    """
+    def __init__(self, db_path=DEFAULT_CACHE_PATH, max_entries=20000):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS scenes (
+                key TEXT PRIMARY KEY,
+                probs TEXT NOT NULL,
+                label_index INTEGER NOT NULL,
+                label TEXT NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_scenes_last_access ON scenes(last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(content_hash, model_id, candidates_hash):
+        return hashlib.sha256(f"{content_hash}:{model_id}:{candidates_hash}".encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """
+        저장된 (확률 벡터, 라벨 인덱스, 라벨) 을 반환. 없으면 None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT probs, label_index, label FROM scenes WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._conn.execute("UPDATE scenes SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+
+        return json.loads(row[0]), row[1], row[2]
+
+    def put(self, key, probs, label_index, label):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scenes (key, probs, label_index, label, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps([round(float(p), 6) for p in probs]), int(label_index), label, time.time())
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM scenes").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM scenes WHERE key IN (SELECT key FROM scenes ORDER BY last_access ASC LIMIT ?)",
+                (overflow,)
+            )
+
+    def stats(self):
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM scenes").fetchone()[0]
+        return {
+            'entries': size,
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache():
+    """
+    프로세스 전역에서 공유하는 기본 장면 캐시를 반환.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = SceneCache()
+    return _default_cache
+
+
+def default_cache_stats():
+    """
+    기본 장면 캐시의 통계를 반환. 이 프로세스에서 아직 열지 않았으면 None (통계를 보려고 파일을 만들지 않음).
+    """
+    with _default_cache_lock:
+        cache = _default_cache
+    return cache.stats() if cache is not None else None
@@ -0,0 +1,196 @@
+import fcntl
+import json
+import os
+import shutil
+import time
+import pandas as pd
+from src.atomic_write import write_atomic
+
+# 세션 폴더 안에 저장되는 업로드 GPX 와 중간 결과 파일 이름
+GPX_FILENAME = 'track.gpx'
+GPX_FRAME_FILENAME = 'gpx_df.pkl'
+PHOTO_FRAME_FILENAME = 'photo_df.pkl'
+OPTIONS_FILENAME = 'render_options.json'
+PHOTO_OPTIONS_FILENAME = 'photo_options.json'
+LOCK_FILENAME = '.lock'
+
+
+class SessionLock:
+    """
+    세션 폴더의 잠금 파일에 fcntl.flock 을 거는 잠금.
+    잠글 때마다 파일을 새로 열기 때문에 같은 프로세스의 다른 스레드와 다른 워커 프로세스(gunicorn) 모두와 배타적.
+    세션 폴더가 이미 삭제되었으면 acquire 에서 FileNotFoundError.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def acquire(self, blocking=True):
+        f = open(self.path, 'a')
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            f.close()
+            return False
+        except BaseException:
+            f.close()
+            raise
+        self._file = f
+        return True
+
+    def release(self):
+        f, self._file = self._file, None
+        fcntl.flock(f, fcntl.LOCK_UN)
+        f.close()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class SessionStore:
+    """
+    세션별 업로드 파일(GPX, 사진)과 파이프라인 중간 결과(gpx_df, photo_df), 사진 위치 옵션과 마지막 렌더링 옵션을
+    세션 폴더 하나에 저장하는 클래스.
+    사진을 추가/삭제하면 새 사진만 분류하고, 스타일만 바꾸면 지도 렌더링만 다시 수행할 수 있도록 함.
+    파일은 임시 파일에 쓴 뒤 교체하므로 다른 워커 프로세스에서 읽어도 반쯤 쓰인 결과를 보지 않음.
+
+    ttl_seconds 가 지정되면 마지막 사용 후 그 시간이 지난 세션 폴더를 cleanup() 에서 삭제.
+    """
+    def __init__(self, root_dir, ttl_seconds=None):
+        self.root_dir = root_dir
+        self.ttl_seconds = ttl_seconds
+
+    def session_dir(self, session_id):
+        return os.path.join(self.root_dir, session_id)
+
+    def gpx_path(self, session_id):
+        return os.path.join(self.session_dir(session_id), GPX_FILENAME)
+
+    def exists(self, session_id):
+        return os.path.isdir(self.session_dir(session_id))
+
+    def create(self, session_id):
+        session_dir = self.session_dir(session_id)
+        os.makedirs(session_dir, exist_ok=True)
+        # 잠금 파일을 미리 만들어 두어, 잠글 때 폴더 수정 시각(만료 기준)이 바뀌지 않도록 함
+        open(os.path.join(session_dir, LOCK_FILENAME), 'a').close()
+        return session_dir
+
+    def touch(self, session_id):
+        """
+        세션 폴더의 수정 시각을 갱신하여 만료 시점을 늦춤.
+        """
+        try:
+            os.utime(self.session_dir(session_id))
+        except OSError:
+            pass
+
+    def delete(self, session_id):
+        shutil.rmtree(self.session_dir(session_id), ignore_errors=True)
+
+    def cleanup(self, now=None):
+        """
+        만료된 세션 폴더를 삭제하고 삭제한 세션 수를 반환.
+        어느 워커 프로세스에서든 작업 중인(잠금이 잡힌) 세션은 건너뛰고,
+        잠근 뒤에도 만료 여부를 다시 확인하여 그 사이에 사용된 세션은 남겨 둠.
+        """
+        if not self.ttl_seconds or not os.path.isdir(self.root_dir):
+            return 0
+
+        now = now or time.time()
+        removed = 0
+        for session_id in os.listdir(self.root_dir):
+            if not self._expired(session_id, now):
+                continue
+
+            lock = self.lock(session_id)
+            try:
+                if not lock.acquire(blocking=False):
+                    continue
+            except OSError:
+                continue
+            try:
+                if self._expired(session_id, now):
+                    shutil.rmtree(self.session_dir(session_id), ignore_errors=True)
+                    removed += 1
+            finally:
+                lock.release()
+
+        if removed:
+            print(f"Removed {removed} expired session(s) from {self.root_dir}")
+        return removed
+
+    def _expired(self, session_id, now):
+        session_dir = self.session_dir(session_id)
+        try:
+            return os.path.isdir(session_dir) and now - os.path.getmtime(session_dir) >= self.ttl_seconds
+        except OSError:
+            return False
+
+    def lock(self, session_id):
+        """
+        같은 세션을 동시에 갱신하거나 작업 중에 만료 삭제하지 않도록 세션별 잠금(SessionLock)을 반환.
+        여러 워커 프로세스 사이에서도 배타적.
+        """
+        return SessionLock(os.path.join(self.session_dir(session_id), LOCK_FILENAME))
+
+    def save(self, session_id, gpx_df=None, photo_df=None, render_options=None, photo_options=None):
+        """
+        주어진 값만 저장 (None 인 항목은 기존 파일 유지).
+        """
+        if gpx_df is not None:
+            self._write_atomic(session_id, GPX_FRAME_FILENAME, gpx_df.to_pickle)
+        if photo_df is not None:
+            self._write_atomic(session_id, PHOTO_FRAME_FILENAME, photo_df.to_pickle)
+        if render_options is not None:
+            self._write_json(session_id, OPTIONS_FILENAME, render_options)
+        if photo_options is not None:
+            self._write_json(session_id, PHOTO_OPTIONS_FILENAME, photo_options)
+
+    def load_gpx_df(self, session_id):
+        return self._read_frame(session_id, GPX_FRAME_FILENAME)
+
+    def load_photo_df(self, session_id):
+        return self._read_frame(session_id, PHOTO_FRAME_FILENAME)
+
+    def load_render_options(self, session_id):
+        return self._read_json(session_id, OPTIONS_FILENAME)
+
+    def load_photo_options(self, session_id):
+        return self._read_json(session_id, PHOTO_OPTIONS_FILENAME)
+
+    def _read_json(self, session_id, filename):
+        path = os.path.join(self.session_dir(session_id), filename)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error reading {filename} for {session_id}: {e}")
+            return {}
+
+    def _write_json(self, session_id, filename, value):
+        def dump(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(value, f)
+        self._write_atomic(session_id, filename, dump)
+
+    def _read_frame(self, session_id, filename):
+        path = os.path.join(self.session_dir(session_id), filename)
+        if not os.path.exists(path):
+            return None
+        try:
+            return pd.read_pickle(path)
+        except Exception as e:
+            print(f"Error reading {filename} for {session_id}: {e}")
+            return None
+
+    def _write_atomic(self, session_id, filename, write):
+        session_dir = self.session_dir(session_id)
+        os.makedirs(session_dir, exist_ok=True)
+        write_atomic(os.path.join(session_dir, filename), write)
@@ -0,0 +1,74 @@
+import os
+import base64
+from concurrent.futures import ThreadPoolExecutor
+from src.image_decode import decode_image
+
+THUMBNAIL_MAX_SIZE = 320
+THUMBNAIL_DIRNAME = 'thumbs'
+
+
+class Thumbnail:
+    """
+    생성된 썸네일 한 장의 경로와 MIME 타입.
+    """
+    def __init__(self, path, mime_type):
+        self.path = path
+        self.mime_type = mime_type
+        self.filename = os.path.basename(path)
+
+    def to_data_uri(self):
+        with open(self.path, 'rb') as f:
+            encoded = base64.b64encode(f.read()).decode('utf-8')
+        return f"data:{self.mime_type};base64,{encoded}"
+
+
+class ThumbnailGenerator:
+    """
+    지도 팝업/툴팁용 작은 썸네일을 한 번만 생성해 재사용하는 클래스.
+    목표 크기에 가깝게 축소 디코딩(decode_image)하여 원본 전체를 풀지 않음.
+    """
+    def __init__(self, output_dir=None, max_size=THUMBNAIL_MAX_SIZE, quality=80, num_workers=4):
+        self.output_dir = output_dir
+        self.max_size = max_size
+        self.quality = quality
+        self.num_workers = num_workers
+
+    def thumbnail_path(self, src_path, ext):
+        # output_dir 를 지정하지 않으면 원본 사진 폴더 아래 thumbs/ 에 저장
+        output_dir = self.output_dir or os.path.join(os.path.dirname(src_path), THUMBNAIL_DIRNAME)
+        return os.path.join(output_dir, f"{os.path.basename(src_path)}{ext}")
+
+    def create(self, src_path):
+        """
+        썸네일을 생성(또는 기존 파일을 재사용)하여 Thumbnail 을 반환. 실패하면 None.
+        투명도가 있는 이미지는 PNG, 나머지는 JPEG 로 저장.
+        """
+        try:
+            for ext, mime_type in (('.jpg', 'image/jpeg'), ('.png', 'image/png')):
+                path = self.thumbnail_path(src_path, ext)
+                if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(src_path):
+                    return Thumbnail(path, mime_type)
+
+            with decode_image(src_path, self.max_size, mode=None) as img:
+                img.thumbnail((self.max_size, self.max_size))
+
+                has_alpha = img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+                ext, mime_type = ('.png', 'image/png') if has_alpha else ('.jpg', 'image/jpeg')
+                path = self.thumbnail_path(src_path, ext)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                if has_alpha:
+                    img.save(path, 'PNG', optimize=True)
+                    return Thumbnail(path, mime_type)
+
+                img.convert('RGB').save(path, 'JPEG', quality=self.quality, optimize=True)
+                return Thumbnail(path, mime_type)
+        except Exception as e:
+            print(f"Error creating thumbnail for {src_path}: {e}")
+            return None
+
+    def create_many(self, src_paths):
+        """
+        여러 사진의 썸네일을 스레드 풀에서 병렬로 생성. 입력과 같은 순서로 반환.
+        """
+        with ThreadPoolExecutor(max_workers=self.num_workers) as pool:
+            return list(pool.map(self.create, src_paths))
@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+from src.track_simplify import EARTH_RADIUS_M
+
+# 심박 존 경계 (최대 심박수 대비 비율): Z1 < 60% <= Z2 < 70% <= Z3 < 80% <= Z4 < 90% <= Z5
+HR_ZONE_BOUNDS = (0.6, 0.7, 0.8, 0.9)
+
+# 페이스는 앞뒤 PACE_WINDOW_S 초, 경사도는 앞뒤 GRADE_WINDOW_M 미터 구간으로 평활화
+PACE_WINDOW_S = 30
+GRADE_WINDOW_M = 20
+
+# 구간 이동 거리가 이보다 짧으면 (정지 등) 페이스/경사도를 계산하지 않음
+MIN_WINDOW_DISTANCE_M = 1.0
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    """
+    두 위경도 배열 사이의 대원 거리(m)를 원소별로 계산.
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _window_bounds(axis, half_width):
+    """
+    정렬된 axis 에서 각 점 기준 [값 - half_width, 값 + half_width] 구간의 (시작, 끝) 인덱스.
+    """
+    start = np.searchsorted(axis, axis - half_width, side='left')
+    end = np.searchsorted(axis, axis + half_width, side='right') - 1
+    return start, end
+
+
+def _window_ratio(numerator, denominator, start, end, scale):
+    """
+    구간 양 끝의 차이 비율 (numerator 변화 / denominator 변화) * scale. 구간 이동 거리가 짧으면 NaN.
+    """
+    d_num = numerator[end] - numerator[start]
+    d_den = denominator[end] - denominator[start]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = d_num / d_den * scale
+    return np.where(d_den >= MIN_WINDOW_DISTANCE_M, ratio, np.nan)
+
+
+def _elapsed_seconds(df):
+    """
+    첫 점 기준 경과 시간(초). 시각이 없거나 순서가 뒤섞였으면 None.
+    """
+    if 'time' not in df.columns:
+        return None
+    times = pd.to_datetime(df['time'], utc=True)
+    if times.isna().any():
+        return None
+
+    elapsed = (times - times.iloc[0]).dt.total_seconds().to_numpy(dtype=np.float64)
+    if np.any(np.diff(elapsed) < 0):
+        return None
+    return elapsed
+
+
+def hr_zones(heart_rates, max_hr=None):
+    """
+    심박수를 최대 심박수 대비 비율로 1~5 존으로 변환. max_hr 가 없으면 기록된 최댓값을 사용.
+    """
+    values = pd.to_numeric(pd.Series(heart_rates), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    max_hr = max_hr or (np.nanmax(values) if np.isfinite(values).any() else None)
+    if not max_hr:
+        return pd.array([pd.NA] * len(values), dtype='UInt8')
+
+    zones = np.searchsorted(HR_ZONE_BOUNDS, values / max_hr, side='right') + 1
+    return pd.arrays.IntegerArray(zones.astype(np.uint8), ~np.isfinite(values))
+
+
+def add_track_metrics(df, max_hr=None, pace_window_s=PACE_WINDOW_S, grade_window_m=GRADE_WINDOW_M):
+    """
+    경로 DataFrame 에 점별 파생 지표 열을 추가한 새 DataFrame 을 반환. 파이썬 반복 없이 NumPy 로 계산.
+    - segment_m: 직전 점과의 거리(m), distance_m: 누적 거리(m)
+    - elapsed_s: 경과 시간(초)
+    - pace_s_per_km: 앞뒤 pace_window_s 초 구간으로 평활화한 페이스(초/km)
+    - grade_pct: 앞뒤 grade_window_m 미터 구간의 경사도(%)
+    - hr_zone: 심박 존(1~5)
+    """
+    df = df.copy()
+    n = len(df)
+    if n == 0:
+        return df
+
+    lat = df['lat'].to_numpy(dtype=np.float64)
+    lon = df['lon'].to_numpy(dtype=np.float64)
+    segment = np.zeros(n, dtype=np.float64)
+    segment[1:] = haversine_m(lat[:-1], lon[:-1], lat[1:], lon[1:])
+    distance = np.cumsum(segment)
+
+    df['segment_m'] = segment.astype(np.float32)
+    df['distance_m'] = distance
+
+    elapsed = _elapsed_seconds(df)
+    if elapsed is not None:
+        start, end = _window_bounds(elapsed, pace_window_s)
+        df['elapsed_s'] = elapsed.astype(np.float32)
+        df['pace_s_per_km'] = _window_ratio(elapsed, distance, start, end, 1000.0).astype(np.float32)
+    else:
+        df['elapsed_s'] = np.float32(np.nan)
+        df['pace_s_per_km'] = np.float32(np.nan)
+
+    if 'elevation' in df.columns:
+        elevation = pd.to_numeric(df['elevation'], errors='coerce').to_numpy(dtype=np.float64)
+        start, end = _window_bounds(distance, grade_window_m)
+        df['grade_pct'] = _window_ratio(elevation, distance, start, end, 100.0).astype(np.float32)
+
+    if 'heart_rate' in df.columns:
+        df['hr_zone'] = hr_zones(df['heart_rate'], max_hr)
+
+    return df
+
+
+def split_points(df, split_m=1000):
+    """
+    split_m 마다 (첫 도달 지점) 의 위치와 구간 기록을 DataFrame 으로 반환.
+    열: split(번호), lat, lon, distance_m, elapsed_s, split_s(해당 구간 소요 시간)
+    """
+    columns = ['split', 'lat', 'lon', 'distance_m', 'elapsed_s', 'split_s']
+    if 'distance_m' not in df.columns or df.empty or not split_m:
+        return pd.DataFrame(columns=columns)
+
+    distance = df['distance_m'].to_numpy(dtype=np.float64)
+    marks = np.arange(split_m, distance[-1] + 1e-9, split_m)
+    if len(marks) == 0:
+        return pd.DataFrame(columns=columns)
+
+    idx = np.searchsorted(distance, marks, side='left')
+    elapsed = df['elapsed_s'].to_numpy(dtype=np.float64) if 'elapsed_s' in df.columns else np.full(len(df), np.nan)
+    split_elapsed = elapsed[idx]
+    return pd.DataFrame({
+        'split': np.arange(1, len(idx) + 1),
+        'lat': df['lat'].to_numpy()[idx],
+        'lon': df['lon'].to_numpy()[idx],
+        'distance_m': distance[idx],
+        'elapsed_s': split_elapsed,
+        'split_s': np.diff(split_elapsed, prepend=0.0),
+    })
+
+
+def format_duration(seconds):
+    """
+    초를 'm:ss' (1시간 이상이면 'h:mm:ss') 문자열로 변환. 값이 없으면 '-'.
+    """
+    if seconds is None or not np.isfinite(seconds):
+        return '-'
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
@@ -0,0 +1,152 @@
+import numpy as np
+
+EARTH_RADIUS_M = 6371000.0
+
+
+def to_local_meters(lat, lon):
+    """
+    위경도 배열을 트랙 중심 기준의 평면 좌표(m)로 근사 변환 (등거리 원통 투영).
+    러닝 트랙 정도의 범위에서는 오차가 무시할 만한 수준.
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    lat0 = np.radians(np.nanmean(lat)) if len(lat) else 0.0
+
+    x = np.radians(lon) * EARTH_RADIUS_M * np.cos(lat0)
+    y = np.radians(lat) * EARTH_RADIUS_M
+    return x, y
+
+
+def _segment_distances(x, y, start, end):
+    """
+    start~end 사이 점들과 선분(start, end) 사이의 수직 거리를 한 번에 계산.
+    """
+    px = x[start + 1:end]
+    py = y[start + 1:end]
+    dx = x[end] - x[start]
+    dy = y[end] - y[start]
+    length_sq = dx * dx + dy * dy
+
+    if length_sq == 0:
+        return np.hypot(px - x[start], py - y[start])
+
+    t = np.clip(((px - x[start]) * dx + (py - y[start]) * dy) / length_sq, 0.0, 1.0)
+    return np.hypot(px - (x[start] + t * dx), py - (y[start] + t * dy))
+
+
+def douglas_peucker_mask(x, y, tolerance_m, keep=None):
+    """
+    Douglas-Peucker 알고리즘으로 남길 점의 불리언 마스크를 반환.
+    keep 에 True 로 표시된 점은 항상 남기며, 그 점들을 경계로 구간을 나누어 단순화.
+    각 구간의 거리 계산은 NumPy 로 벡터화되어, 파이썬 반복은 남는 점 수에 비례.
+    """
+    n = len(x)
+    mask = np.zeros(n, dtype=bool)
+    if n == 0:
+        return mask
+
+    mask[0] = mask[-1] = True
+    if keep is not None:
+        mask |= keep
+
+    anchors = np.flatnonzero(mask)
+    stack = list(zip(anchors[:-1], anchors[1:]))
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+
+        distances = _segment_distances(x, y, start, end)
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance_m:
+            split = start + 1 + farthest
+            mask[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+
+    return mask
+
+
+def bin_values(values, n_bins, vmin, vmax):
+    """
+    값을 [vmin, vmax] 범위의 n_bins 개 구간 번호(0 ~ n_bins-1)로 변환.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if vmax <= vmin:
+        return np.zeros(len(values), dtype=np.int64)
+
+    scaled = (values - vmin) / (vmax - vmin) * n_bins
+    return np.clip(np.nan_to_num(scaled, nan=0.0).astype(np.int64), 0, n_bins - 1)
+
+
+def median_filter(values, window):
+    """
+    길이 window(홀수)의 이동 중앙값. 양 끝은 가장자리 값을 반복하여 채움.
+    점마다 흔들리는 센서 값(심박수 등)이 색상 구간 경계를 오가며 색을 바꾸는 것을 줄임.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if window <= 1 or len(values) == 0:
+        return values
+
+    half = window // 2
+    padded = np.pad(values, half, mode='edge')
+    return np.median(np.lib.stride_tricks.sliding_window_view(padded, 2 * half + 1), axis=1)
+
+
+def merge_short_runs(bins, min_run):
+    """
+    min_run 개보다 짧게 이어지는 색상 구간을 바로 앞 구간의 번호로 바꾼 배열을 반환.
+    경계 근처에서 잠깐씩 바뀌는 색을 없애 단순화 후에도 남아야 하는 경계 점 수를 줄임.
+    """
+    bins = np.array(bins, copy=True)
+    if min_run <= 1 or len(bins) == 0:
+        return bins
+
+    starts = np.concatenate(([0], np.flatnonzero(bins[1:] != bins[:-1]) + 1))
+    ends = np.concatenate((starts[1:], [len(bins)]))
+    previous = None
+    for start, end in zip(starts, ends):
+        if end - start < min_run and previous is not None:
+            bins[start:end] = previous
+        else:
+            previous = bins[start]
+    return bins
+
+
+def color_breakpoints(bins):
+    """
+    색상 구간이 바뀌는 지점의 양쪽 점을 True 로 표시한 마스크.
+    """
+    bins = np.asarray(bins)
+    keep = np.zeros(len(bins), dtype=bool)
+    if len(bins) < 2:
+        return keep
+
+    changed = np.flatnonzero(bins[1:] != bins[:-1])
+    keep[changed] = True
+    keep[changed + 1] = True
+    return keep
+
+
+def color_runs(bins):
+    """
+    같은 색상 구간이 연속되는 (시작, 끝, 구간 번호) 목록을 반환.
+    인접한 두 구간은 경계 점을 공유하여 선이 끊기지 않도록 함.
+    """
+    bins = np.asarray(bins)
+    if len(bins) == 0:
+        return []
+
+    starts = np.concatenate(([0], np.flatnonzero(bins[1:] != bins[:-1]) + 1))
+    ends = np.concatenate((starts[1:], [len(bins) - 1]))
+    return [(int(s), int(e), int(bins[s])) for s, e in zip(starts, ends)]
+
+
+def simplify_track(lat, lon, tolerance_m, bins=None):
+    """
+    트랙을 단순화하여 남길 점의 인덱스 배열을 반환.
+    bins 가 주어지면 색상 구간이 바뀌는 지점은 단순화 대상에서 제외.
+    """
+    x, y = to_local_meters(lat, lon)
+    keep = color_breakpoints(bins) if bins is not None else None
+    return np.flatnonzero(douglas_peucker_mask(x, y, tolerance_m, keep=keep))
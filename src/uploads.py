@@ -0,0 +1,214 @@
+import os
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+from werkzeug.utils import secure_filename
+from src.image_decode import HEIF_SUPPORTED
+
+# 업로드 크기 제한 (MB). 요청 전체 제한은 Flask MAX_CONTENT_LENGTH 로 적용.
+# 파일별 제한은 multipart 파싱 중(CappedSpool)에 한 번, 세션 폴더로 복사할 때(stream_to_file) 다시 적용.
+MAX_PHOTO_MB = int(os.environ.get('RUNNERS_VIEW_MAX_PHOTO_MB', '50'))
+MAX_GPX_MB = int(os.environ.get('RUNNERS_VIEW_MAX_GPX_MB', '50'))
+MAX_REQUEST_MB = int(os.environ.get('RUNNERS_VIEW_MAX_UPLOAD_MB', '1024'))
+
+# 디스크로 복사할 때 한 번에 읽는 크기
+CHUNK_SIZE = 1024 * 1024
+
+# 파일 앞부분으로 형식을 판별하기 위해 읽는 바이트 수
+SNIFF_BYTES = 32
+
+# HEIC/HEIF 컨테이너(ISO BMFF)의 ftyp 브랜드
+HEIF_BRANDS = {b'heic', b'heix', b'heim', b'heis', b'hevc', b'hevx', b'mif1', b'msf1'}
+
+# 검증용 축소 디코딩 크기 (JPEG 는 draft 로 이 크기 근처까지만 디코딩)
+VALIDATE_SIZE = (64, 64)
+
+
+class UploadRejected(Exception):
+    """
+    업로드 파일이 크기 제한을 넘거나 형식이 맞지 않을 때 발생.
+    """
+
+
+def sniff_photo_extension(head):
+    """
+    파일 앞부분(매직 바이트)으로 사진 형식을 판별하여 확장자를 반환. 지원하지 않는 형식이면 None.
+    """
+    if head.startswith(b'\xff\xd8\xff'):
+        return '.jpg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return '.png'
+    if head[4:8] == b'ftyp' and head[8:12] in HEIF_BRANDS:
+        return '.heic'
+    return None
+
+
+def looks_like_xml(head):
+    """
+    GPX(XML) 파일인지 앞부분으로 간단히 확인. (BOM 과 공백 허용)
+    """
+    return head.lstrip(b'\xef\xbb\xbf \t\r\n').startswith(b'<')
+
+
+# multipart 파싱 중 파일 하나를 메모리에 두는 최대 크기 (넘으면 임시 파일로 옮김, Werkzeug 기본값과 같음)
+SPOOL_MEMORY_BYTES = 500 * 1024
+
+
+class CappedSpool:
+    """
+    multipart 본문을 파싱하는 동안 업로드 파일 하나를 담는 임시 파일.
+    max_bytes 를 넘는 부분은 기록하지 않고 버린 뒤 exceeded 로 표시하여,
+    요청 전체 크기 제한 안에서도 파일 하나가 디스크를 과도하게 차지하지 않도록 함.
+    (Werkzeug 는 요청 처리 전에 본문 전체를 파싱하므로 파일별 제한은 이 단계에서 적용해야 함)
+    """
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.exceeded = False
+        self._file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES, mode='rb+')
+
+    def write(self, data):
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            self.exceeded = True
+            return len(data)
+        return self._file.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+
+def capped_stream_factory(total_content_length, content_type, filename=None, content_length=None):
+    """
+    Flask/Werkzeug 의 파일 스트림 생성 함수. 사진/GPX 제한 중 큰 값까지만 임시 파일에 기록.
+    """
+    return CappedSpool(max(MAX_PHOTO_MB, MAX_GPX_MB) * 1024 * 1024)
+
+
+def stream_to_file(stream, path, max_bytes, head=b''):
+    """
+    업로드 스트림을 CHUNK_SIZE 단위로 파일에 기록하고 크기(바이트)를 반환.
+    max_bytes 를 넘거나 파싱 단계에서 이미 제한을 넘은 스트림(CappedSpool)이면
+    기록 중이던 파일을 지우고 UploadRejected 를 발생.
+    """
+    if getattr(stream, 'exceeded', False):
+        raise UploadRejected(f"file exceeds {max_bytes // (1024 * 1024)} MB")
+
+    size = 0
+    try:
+        with open(path, 'wb') as f:
+            chunk = head
+            while chunk:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadRejected(f"file exceeds {max_bytes // (1024 * 1024)} MB")
+                f.write(chunk)
+                chunk = stream.read(CHUNK_SIZE)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return size
+
+
+def validate_image(path):
+    """
+    이미지를 축소 디코딩하여 손상 여부를 확인. 열거나 디코딩할 수 없으면 UploadRejected.
+    """
+    try:
+        with Image.open(path) as img:
+            img.draft('RGB', VALIDATE_SIZE)
+            img.load()
+    except Exception as e:
+        # PIL 메시지에는 서버 경로가 들어 있으므로 서버 로그에만 남기고 클라이언트에는 일반 사유를 반환
+        print(f"Error decoding uploaded image {path}: {e}")
+        raise UploadRejected("not a valid image")
+
+
+def save_gpx(file_storage, path, max_bytes=MAX_GPX_MB * 1024 * 1024):
+    """
+    업로드된 GPX 를 스트리밍으로 저장. XML 이 아니거나 너무 크면 UploadRejected.
+    """
+    head = file_storage.stream.read(SNIFF_BYTES)
+    if not looks_like_xml(head):
+        raise UploadRejected("not a GPX/XML file")
+    return stream_to_file(file_storage.stream, path, max_bytes, head=head)
+
+
+class PhotoUploader:
+    """
+    업로드된 사진들을 세션 폴더에 저장하고 검증하는 클래스.
+
+    - 확장자 대신 매직 바이트로 형식을 판별하고, 판별된 형식의 확장자로 저장
+    - 파일별 크기 제한을 넘는 사진은 저장 도중 중단
+    - 저장과 축소 디코딩 검증을 스레드 풀에서 병렬로 수행하여, 모델 작업 전에 손상된 사진을 걸러냄
+    """
+    def __init__(self, max_photo_bytes=MAX_PHOTO_MB * 1024 * 1024, num_workers=4):
+        self.max_photo_bytes = max_photo_bytes
+        self.num_workers = num_workers
+
+    def save_all(self, file_storages, dest_dir):
+        """
+        사진들을 dest_dir 에 저장. (저장된 파일 이름 목록, [(원래 파일 이름, 거절 사유)]) 를 반환.
+        """
+        saved = []
+        rejected = []
+        tasks = []
+
+        # 형식 판별과 파일 이름 결정은 순서대로 (같은 이름 사진이 동시에 같은 파일에 쓰지 않도록)
+        for photo in file_storages:
+            if not photo or photo.filename == '':
+                continue
+
+            head = photo.stream.read(SNIFF_BYTES)
+            extension = sniff_photo_extension(head)
+            if extension is None:
+                rejected.append((photo.filename, "unsupported image type"))
+                continue
+            if extension == '.heic' and not HEIF_SUPPORTED:
+                rejected.append((photo.filename, "HEIC support is not installed (pillow-heif)"))
+                continue
+
+            filename = self._claim_filename(photo.filename, extension, dest_dir)
+            tasks.append((photo, head, filename))
+
+        lock = threading.Lock()
+
+        def save_one(task):
+            photo, head, filename = task
+            path = os.path.join(dest_dir, filename)
+            try:
+                stream_to_file(photo.stream, path, self.max_photo_bytes, head=head)
+                validate_image(path)
+            except UploadRejected as e:
+                if os.path.exists(path):
+                    os.remove(path)
+                with lock:
+                    rejected.append((photo.filename, str(e)))
+                return
+            with lock:
+                saved.append(filename)
+
+        with ThreadPoolExecutor(max_workers=self.num_workers) as pool:
+            list(pool.map(save_one, tasks))
+
+        for name, reason in rejected:
+            print(f"Rejected upload {name}: {reason}")
+        return sorted(saved), rejected
+
+    @staticmethod
+    def _claim_filename(original, extension, dest_dir):
+        """
+        dest_dir 에 아직 없는 파일 이름을 정하고 빈 파일을 만들어 선점.
+        같은 세션에 이미 저장된 사진이나 동시에 올라온 같은 이름의 사진을 덮어쓰지 않음.
+        """
+        basename = secure_filename(os.path.splitext(original)[0]) or str(uuid.uuid4())
+        filename = f"{basename}{extension}"
+        while True:
+            try:
+                with open(os.path.join(dest_dir, filename), 'xb'):
+                    return filename
+            except FileExistsError:
+                filename = f"{basename}_{uuid.uuid4().hex[:8]}{extension}"
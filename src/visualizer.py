@@ -1,7 +1,9 @@
-import folium
-import branca.colormap as cm
+import numpy as np
 import pandas as pd
-import base64
+from urllib.parse import quote
+from src.thumbnails import ThumbnailGenerator
+from src.track_metrics import HR_ZONE_BOUNDS, format_duration, hr_zones, split_points
+from src.track_simplify import bin_values, color_runs, median_filter, merge_short_runs, simplify_track
 
 # Hex 코드를 Folium 아이콘 색상명으로 변환하는 기능 (현재 DivIcon 사용으로 직접 사용되지는 않음)
 def hex_to_folium_color(hex_color):
@@ -25,65 +27,145 @@ def hex_to_folium_color(hex_color):
     return color_map.get(hex_color.upper(), 'gray')
 
 
+# 사진 주변 아우라 렌더링 방식
+#  - 'layer': 모든 사진의 아우라를 하나의 GeoJSON 레이어로 출력 (기본값)
+#  - 'circle': 사진마다 그라데이션 원 1개
+#  - 'rings': 사진마다 동심원 100개 (기존 방식)
+AURA_MODES = ('layer', 'circle', 'rings')
+AURA_MAX_RADIUS = 120
+
+# 경로 색상 단계 수 (folium.ColorLine 기본값과 동일)
+ROUTE_COLOR_STEPS = 12
+# 경로 색상 구간을 정하기 전 지표 값을 평활화하는 이동 중앙값 길이와, 색상 구간이 유지되어야 하는 최소 점 수
+ROUTE_SMOOTHING_POINTS = 15
+ROUTE_MIN_RUN_POINTS = 20
+
+SPECTRAL_COLORS = ['#0000FF', '#00FFFF', '#00FF00', '#FFFF00', '#FF0000']
+
+# color_by 로 선택할 수 있는 경로 색상 기준: (열 이름, 범례 제목, 낮은 값 -> 높은 값 색상, 범위 계산 방식)
+# 범위 계산 방식이 'robust' 면 정지/GPS 튐으로 생긴 극단값을 제외하도록 2~98 백분위 범위를 사용.
+# 'zones' 면 러닝끼리 같은 존이 같은 색이 되도록 1~5 존 전체 범위를 사용.
+ROUTE_METRICS = {
+    'heart_rate': ('heart_rate', 'Heart Rate (bpm)', SPECTRAL_COLORS, 'minmax'),
+    'hr_zone': ('hr_zone', 'Heart Rate Zone', SPECTRAL_COLORS, 'zones'),
+    'pace': ('pace_s_per_km', 'Pace (sec/km)', SPECTRAL_COLORS[::-1], 'robust'),
+    'grade': ('grade_pct', 'Grade (%)', SPECTRAL_COLORS, 'robust'),
+    'elevation': ('elevation', 'Elevation (m)', SPECTRAL_COLORS, 'minmax'),
+}
+
+# 지표가 없을 때 경로 색상
+ROUTE_DEFAULT_COLOR = '#3388FF'
+
+# 사진 마커 클러스터 옵션 (Leaflet.markercluster). 가까이 확대하면 클러스터를 풀어 핀을 모두 표시.
+PHOTO_CLUSTER_OPTIONS = {
+    'maxClusterRadius': 40,
+    'disableClusteringAtZoom': 17,
+    'showCoverageOnHover': False,
+    'chunkedLoading': True,
+}
+
+# 사진 한 장(row = [lat, lon, color, 이미지 src, 파일 이름, 장면])으로 마커를 만드는 JS 함수.
+# 핀 아이콘은 색상별로 하나만 만들어 공유하고, 팝업/툴팁 내용은 처음 열릴 때 생성.
+PHOTO_MARKER_CALLBACK = """
+(function () {
+    var icons = {};
+
+    function pinIcon(color) {
+        if (!/^#[0-9a-fA-F]{3,8}$/.test(color)) {
+            color = '#808080';
+        }
+        if (!icons[color]) {
+            icons[color] = L.divIcon({
+                className: 'empty',
+                html: '<div style="background-color:' + color + '; width: 14px; height: 14px;'
+                    + ' border-radius: 50% 50% 50% 0; border: 2px solid white;'
+                    + ' transform: rotate(-45deg); box-shadow: none !important;"></div>',
+                iconSize: [15, 15],
+                iconAnchor: [7, 15]
+            });
+        }
+        return icons[color];
+    }
+
+    function element(tag, style, text) {
+        var el = document.createElement(tag);
+        if (style) el.style.cssText = style;
+        if (text !== undefined) el.textContent = text;
+        return el;
+    }
+
+    return function (row) {
+        var src = row[3];
+        var marker = L.marker([row[0], row[1]], {icon: pinIcon(row[2])});
+
+        marker.bindPopup(function () {
+            var box = element('div', 'font-family: sans-serif; color: black;');
+            if (src) {
+                var img = element('img', 'width:100%; max-width:250px;');
+                img.onload = function () { marker.getPopup().update(); };
+                img.src = src;
+                box.appendChild(img);
+            } else {
+                box.appendChild(element('p', 'color:red;', 'Image not found'));
+            }
+            var caption = element('p', 'margin: 5px 0 0 0;');
+            caption.appendChild(element('b', '', row[4]));
+            caption.appendChild(document.createElement('br'));
+            caption.appendChild(document.createTextNode('Result: '));
+            caption.appendChild(element('b', '', row[5]));
+            box.appendChild(caption);
+            return box;
+        }, {maxWidth: 300});
+
+        marker.bindTooltip(function () {
+            if (!src) return '이미지';
+            var img = element('img', 'width:150px;');
+            img.src = src;
+            return img;
+        });
+        return marker;
+    };
+})()
+"""
+
+
+def _aura_gradient_id(hex_color):
+    return f"runner-aura-{hex_color.lstrip('#').lower()}"
+
+
+def _aura_gradient_defs(colors):
+    """
+    색상별로 중심이 진하고 가장자리로 갈수록 투명해지는 SVG 방사형 그라데이션을 정의.
+    Leaflet 의 SVG 원은 fillColor 에 url(#id) 를 지정하여 이 그라데이션으로 채워짐.
+    """
+    gradients = "".join(
+        f'<radialGradient id="{_aura_gradient_id(color)}">'
+        f'<stop offset="0%" stop-color="{color}" stop-opacity="0.7"/>'
+        f'<stop offset="100%" stop-color="{color}" stop-opacity="0"/>'
+        f'</radialGradient>'
+        for color in sorted(set(colors))
+    )
+    return f'<svg width="0" height="0" style="position:absolute;"><defs>{gradients}</defs></svg>'
+
+
 class Visualizer:
     def __init__(self, df):
         self.df = df
         self.center = [df['lat'].mean(), df['lon'].mean()]
 
-    def create_map(self, photo_df=None):
-        # 지도 생성 시 기본 확대/축소 컨트롤을 비활성화
-        m = folium.Map(
-            location=self.center, 
-            zoom_start=15, 
-            tiles='CartoDB positron',
-            zoom_control=False
-        )
-
-        # 경로(ColorLine)를 지도에 추가
-        if 'heart_rate' in self.df.columns and not self.df['heart_rate'].dropna().empty:
-            points = self.df[['lat', 'lon']].values.tolist()
-            heart_rates = self.df['heart_rate'].tolist()
-            vmin = self.df['heart_rate'].min()
-            vmax = self.df['heart_rate'].max()
-            
-            spectral_colors = ['#0000FF', '#00FFFF', '#00FF00', '#FFFF00', '#FF0000']
-            
-            colormap = cm.LinearColormap(
-                colors=spectral_colors, vmin=vmin, vmax=vmax, caption='Heart Rate (bpm)')
+    def _add_aura(self, m, photo_df, aura_mode):
+        """
+        사진 위치에 부드러운 아우라 효과를 추가.
+        """
+        import folium
 
-            folium.ColorLine(
-                positions=points, colors=heart_rates, colormap=colormap, weight=4, opacity=0.7
-            ).add_to(m)
-            m.add_child(colormap)
+        if aura_mode == 'rings':
+            # 부드러운 아우라 이펙트를 동심원으로 구현
+            aura_steps = 100
+            max_radius = AURA_MAX_RADIUS
+            base_opacity = 0.025
 
-        # 사진 데이터를 기반으로 마커를 추가
-        if photo_df is not None and not photo_df.empty:
             for _, row in photo_df.iterrows():
-                encoded = ""
-                try:
-                    with open(row['filepath'], 'rb') as f:
-                        encoded = base64.b64encode(f.read()).decode('utf-8')
-                except (FileNotFoundError, TypeError):
-                    pass
-                
-                tooltip_html = f'<img src="data:image/jpeg;base64,{encoded}" style="width:150px;">' if encoded else "이미지"
-                
-                image_html = f'<img src="data:image/jpeg;base64,{encoded}" style="width:100%; max-width:250px;">' if encoded else '<p style="color:red;">Image not found</p>'
-                popup_html = f"""
-                <div style="font-family: sans-serif; color: black;">
-                    {image_html}<br>
-                    <p style="margin: 5px 0 0 0;">
-                        <b>{row.get('filename', 'N/A')}</b><br>
-                        Result: <b>{row.get('scene', 'N/A')}</b>
-                    </p>
-                </div>
-                """
-
-                # 부드러운 아우라 이펙트를 동심원으로 구현
-                aura_steps = 100
-                max_radius = 120
-                base_opacity = 0.025
-
                 for i in range(aura_steps, 0, -1):
                     folium.Circle(
                         location=[row['lat'], row['lon']],
@@ -94,24 +176,220 @@ class Visualizer:
                         fill_color=row['color'],
                         fill_opacity=(base_opacity / aura_steps) * (aura_steps - i + 1)
                     ).add_to(m)
+            return
+
+        m.get_root().html.add_child(folium.Element(_aura_gradient_defs(photo_df['color'])))
 
-                # 그림자가 없는 커스텀 핀 아이콘을 생성.
-                pin_html = f"""
-                    <div style="
-                        background-color:{row['color']};
-                        width: 14px; height: 14px;
-                        border-radius: 50% 50% 50% 0;
-                        border: 2px solid white;
-                        transform: rotate(-45deg);
-                        box-shadow: none !important;
-                    ">
-                    </div>
-                """
-                folium.Marker(
-                    location=[row['lat'], row['lon']],
-                    icon=folium.DivIcon(html=pin_html, icon_size=(15, 15), icon_anchor=(7, 15)),
-                    popup=folium.Popup(popup_html, max_width=300),
-                    tooltip=tooltip_html
+        if aura_mode == 'circle':
+            for lat, lon, color in zip(photo_df['lat'], photo_df['lon'], photo_df['color']):
+                folium.Circle(
+                    location=[lat, lon],
+                    radius=AURA_MAX_RADIUS,
+                    stroke=False,
+                    fill_color=f"url(#{_aura_gradient_id(color)})",
+                    fill_opacity=1
                 ).add_to(m)
+            return
+
+        features = [
+            {
+                'type': 'Feature',
+                'geometry': {'type': 'Point', 'coordinates': [float(lon), float(lat)]},
+                'properties': {'color': color},
+            }
+            for lat, lon, color in zip(photo_df['lat'], photo_df['lon'], photo_df['color'])
+        ]
+        folium.GeoJson(
+            {'type': 'FeatureCollection', 'features': features},
+            name='aura',
+            marker=folium.Circle(radius=AURA_MAX_RADIUS, stroke=False, fill=True, fill_opacity=1),
+            style_function=lambda feature: {
+                'fillColor': f"url(#{_aura_gradient_id(feature['properties']['color'])})"
+            },
+            control=False
+        ).add_to(m)
+
+    def _photo_sources(self, photo_df, image_base_url, thumbnail_dir):
+        """
+        사진별 썸네일을 한 번만 생성하여 이미지 src 목록을 반환.
+        image_base_url 이 있으면 정적 파일 URL, 없으면 data URI 로 인라인.
+        """
+        generator = ThumbnailGenerator(thumbnail_dir)
+        thumbnails = generator.create_many(photo_df['filepath'].tolist())
+
+        sources = []
+        for thumb in thumbnails:
+            if thumb is None:
+                sources.append("")
+            elif image_base_url:
+                sources.append(f"{image_base_url.rstrip('/')}/{quote(thumb.filename)}")
+            else:
+                sources.append(thumb.to_data_uri())
+        return sources
+
+    def _add_photos(self, m, photo_df, image_sources):
+        """
+        사진 마커를 클러스터 레이어 하나로 추가.
+        사진 정보는 [lat, lon, color, src, 파일 이름, 장면] 배열로 한 번만 직렬화하고,
+        마커/팝업은 브라우저에서 생성하므로 사진 수가 많아도 HTML 과 파이썬 쪽 작업이 작게 유지됨.
+        """
+        from folium.plugins import FastMarkerCluster
+
+        def column(name):
+            if name in photo_df.columns:
+                return photo_df[name].fillna('N/A').astype(str).tolist()
+            return ['N/A'] * len(photo_df)
+
+        lat = np.round(photo_df['lat'].to_numpy(dtype=np.float64), 6).tolist()
+        lon = np.round(photo_df['lon'].to_numpy(dtype=np.float64), 6).tolist()
+        rows = [
+            list(row) for row in zip(lat, lon, photo_df['color'].tolist(), image_sources, column('filename'), column('scene'))
+        ]
+        FastMarkerCluster(
+            rows, callback=PHOTO_MARKER_CALLBACK, name='photos', control=False, **PHOTO_CLUSTER_OPTIONS
+        ).add_to(m)
+
+    def _route_values(self, color_by):
+        """
+        경로 색상에 사용할 지표 값 배열과 (vmin, vmax) 를 반환. 지표가 없으면 (None, None).
+        """
+        column, _, _, range_mode = ROUTE_METRICS[color_by]
+        if column not in self.df.columns:
+            return None, None
+
+        values = pd.to_numeric(self.df[column], errors='coerce').astype(np.float64)
+        if values.dropna().empty:
+            return None, None
+
+        # 정지 구간 등으로 값이 없는 점은 앞뒤 값으로 채워 색이 끊기지 않도록 함
+        values = values.ffill().bfill().to_numpy()
+        if range_mode == 'robust':
+            vmin, vmax = np.percentile(values, [2, 98])
+        elif range_mode == 'zones':
+            vmin, vmax = 1, len(HR_ZONE_BOUNDS) + 1
+        else:
+            vmin, vmax = values.min(), values.max()
+        return values, (float(vmin), float(vmax))
+
+    def _add_route(self, m, color_by, simplify_tolerance_m, hr_bins):
+        """
+        color_by 지표로 색칠한 경로를 추가. 지표가 없으면 단색 경로를 그림.
+        """
+        import folium
+        import branca.colormap as cm
+
+        lat = self.df['lat'].to_numpy(dtype=np.float64)
+        lon = self.df['lon'].to_numpy(dtype=np.float64)
+        values, value_range = self._route_values(color_by)
+
+        if values is None:
+            kept = simplify_track(lat, lon, simplify_tolerance_m) if simplify_tolerance_m else np.arange(len(lat))
+            points = np.round(np.column_stack([lat[kept], lon[kept]]), 6)
+            folium.PolyLine(points.tolist(), color=ROUTE_DEFAULT_COLOR, weight=4, opacity=0.7).add_to(m)
+            return
+
+        _, caption, colors, _ = ROUTE_METRICS[color_by]
+        vmin, vmax = value_range
+        colormap = cm.LinearColormap(colors=colors, vmin=vmin, vmax=vmax, caption=caption)
+
+        # 색상 구간이 바뀌는 지점은 유지한 채로 경로를 단순화.
+        # 잡음 때문에 경계 근처에서 점마다 색이 바뀌면 거의 모든 점이 남으므로 평활화 후 짧은 구간은 합침
+        n_bins = hr_bins or ROUTE_COLOR_STEPS
+        bins = bin_values(median_filter(values, ROUTE_SMOOTHING_POINTS), n_bins, vmin, vmax)
+        bins = merge_short_runs(bins, ROUTE_MIN_RUN_POINTS)
+        bin_centers = vmin + (np.arange(n_bins) + 0.5) * (vmax - vmin) / n_bins
+        if simplify_tolerance_m:
+            kept = simplify_track(lat, lon, simplify_tolerance_m, bins=bins)
+        else:
+            kept = np.arange(len(lat))
+        points = np.round(np.column_stack([lat[kept], lon[kept]]), 6)
+
+        if hr_bins:
+            # 같은 색상 구간의 연속 구간들을 하나의 다중 폴리라인으로 병합
+            lines_by_bin = {}
+            for start, end, bin_idx in color_runs(bins[kept]):
+                lines_by_bin.setdefault(bin_idx, []).append(points[start:end + 1].tolist())
+
+            for bin_idx, lines in sorted(lines_by_bin.items()):
+                folium.PolyLine(
+                    lines, color=colormap(bin_centers[bin_idx]), weight=4, opacity=0.7
+                ).add_to(m)
+        else:
+            # 남긴 점의 색이 구간 번호와 같도록 구간 중앙값으로 색칠
+            folium.ColorLine(
+                positions=points.tolist(), colors=bin_centers[bins[kept]].tolist(), colormap=colormap,
+                nb_steps=ROUTE_COLOR_STEPS, weight=4, opacity=0.7
+            ).add_to(m)
+        m.add_child(colormap)
+
+    def _add_splits(self, m, split_m):
+        """
+        split_m 마다 구간 번호 라벨을 추가. 툴팁에 누적 시간과 구간 기록을 표시.
+        """
+        import folium
+
+        splits = split_points(self.df, split_m)
+        unit = f"{split_m / 1000:g} km"
+        for split in splits.itertuples(index=False):
+            label_html = f"""
+                <div style="
+                    background-color: white; color: black;
+                    border: 2px solid #333; border-radius: 9px;
+                    font: bold 10px sans-serif; text-align: center;
+                    width: 18px; height: 14px; line-height: 14px;
+                ">{split.split}</div>
+            """
+            tooltip = (
+                f"{split.split * split_m / 1000:g} km · {format_duration(split.elapsed_s)}"
+                f" (split {unit}: {format_duration(split.split_s)})"
+            )
+            folium.Marker(
+                location=[split.lat, split.lon],
+                icon=folium.DivIcon(html=label_html, icon_size=(22, 18), icon_anchor=(11, 9)),
+                tooltip=tooltip
+            ).add_to(m)
+
+    def create_map(self, photo_df=None, aura_mode='layer', image_base_url=None, thumbnail_dir=None,
+                   simplify_tolerance_m=2.0, hr_bins=None, color_by='heart_rate', split_m=None, max_hr=None):
+        """
+        경로와 사진 마커를 그린 Folium 지도를 생성.
+        image_base_url 을 지정하면 썸네일을 HTML 에 넣지 않고 해당 URL 아래의 정적 파일로 참조.
+        simplify_tolerance_m: 경로 단순화 허용 오차(m). 0 이나 None 이면 모든 점을 사용.
+        hr_bins: 지정하면 경로 색상 지표를 해당 개수의 색상 구간으로 나누어 구간별 폴리라인으로 출력.
+        color_by: 경로 색상 기준 (ROUTE_METRICS 의 키). pace/grade/hr_zone 은 add_track_metrics 결과가 필요.
+        split_m: 지정하면 해당 거리(m)마다 구간 표시를 추가.
+        max_hr: 심박 존 기준 최대 심박수. 지정하면 hr_zone 을 이 값으로 다시 계산
+            (없으면 러닝마다 기록된 최댓값 기준이라 러닝끼리 존을 비교할 수 없음).
+        """
+        if aura_mode not in AURA_MODES:
+            raise ValueError(f"Unknown aura mode: {aura_mode} (expected one of {AURA_MODES})")
+        if color_by not in ROUTE_METRICS:
+            raise ValueError(f"Unknown color_by: {color_by} (expected one of {tuple(ROUTE_METRICS)})")
+
+        if max_hr and 'heart_rate' in self.df.columns:
+            self.df = self.df.assign(hr_zone=hr_zones(self.df['heart_rate'], max_hr))
+
+        # folium/branca 는 임포트 비용이 커서 지도를 실제로 그릴 때 로딩 (앱/CLI 시작 시간 단축)
+        import folium
+
+        # 지도 생성 시 기본 확대/축소 컨트롤을 비활성화
+        m = folium.Map(
+            location=self.center, 
+            zoom_start=15, 
+            tiles='CartoDB positron',
+            zoom_control=False
+        )
+
+        # 경로를 지도에 추가
+        self._add_route(m, color_by, simplify_tolerance_m, hr_bins)
+        if split_m:
+            self._add_splits(m, split_m)
+
+        # 사진 데이터를 기반으로 마커를 추가
+        if photo_df is not None and not photo_df.empty:
+            self._add_aura(m, photo_df, aura_mode)
+
+            image_sources = self._photo_sources(photo_df, image_base_url, thumbnail_dir)
+            self._add_photos(m, photo_df, image_sources)
 
         return m
\ No newline at end of file
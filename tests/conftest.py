@@ -0,0 +1,40 @@
+import os
+import sys
+import time
+
+import pytest
+
+# 테스트를 프로젝트 루트 밖에서 실행해도 src/, main.py 등을 임포트할 수 있도록 함
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def web(tmp_path, monkeypatch):
+    """
+    세션 폴더, 작업 상태, 렌더링 캐시를 tmp_path 아래로 옮긴 Flask 앱 (app 모듈을 반환).
+    """
+    import app
+    from src.jobs import JobQueue
+    from src.render_cache import RenderCache
+    from src.session_store import SessionStore
+
+    monkeypatch.setattr(app, 'session_store', SessionStore(str(tmp_path / 'uploads'), ttl_seconds=3600))
+    monkeypatch.setattr(app, 'job_queue', JobQueue(max_workers=1, max_queue=4, state_dir=str(tmp_path / 'jobs')))
+    monkeypatch.setattr(app, 'render_cache', RenderCache(cache_dir=str(tmp_path / 'rendered')))
+    return app
+
+
+@pytest.fixture
+def wait_for_job():
+    """
+    작업이 끝날 때까지 /jobs/<id>/status 를 조회하여 마지막 상태를 반환하는 함수.
+    """
+    def wait(client, job_id, timeout=30):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            status = client.get(f'/jobs/{job_id}/status').get_json()
+            if status['status'] in ('done', 'failed'):
+                return status
+            time.sleep(0.05)
+        raise AssertionError(f"job {job_id} did not finish")
+    return wait
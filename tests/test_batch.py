@@ -0,0 +1,171 @@
+import json
+import os
+import sys
+from concurrent.futures import Future
+
+import pandas as pd
+import pytest
+from PIL import Image
+
+import batch
+from generage_mock import create_mock_gpx
+
+pytestmark = pytest.mark.filterwarnings('ignore:CartoDB tiles')
+
+
+class CountingFuture(Future):
+    """
+    result() 로 결과를 가져가면 소비된 것으로 보고 풀의 미처리 작업 수를 줄이는 Future.
+    """
+    def __init__(self, pool):
+        super().__init__()
+        self.pool = pool
+        self.consumed = False
+
+    def result(self, timeout=None):
+        if not self.consumed:
+            self.consumed = True
+            self.pool.outstanding -= 1
+        return super().result(timeout)
+
+
+class InlinePool:
+    """
+    ProcessPoolExecutor 대신 작업을 바로 실행하고, 결과를 가져가지 않은 작업 수의 최댓값을 기록하는 풀.
+    """
+    instances = []
+
+    def __init__(self, max_workers, mp_context=None):
+        self.outstanding = 0
+        self.max_outstanding = 0
+        InlinePool.instances.append(self)
+
+    def submit(self, fn, *args, **kwargs):
+        future = CountingFuture(self)
+        self.outstanding += 1
+        self.max_outstanding = max(self.max_outstanding, self.outstanding)
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class StubAnalyzer:
+    def __init__(self, photo_dir, **kwargs):
+        self.photo_dir = photo_dir
+
+    def analyze_photos(self, gpx_df):
+        files = sorted(f for f in os.listdir(self.photo_dir) if f.endswith('.jpg'))
+        return pd.DataFrame({
+            'filename': files,
+            'filepath': [os.path.join(self.photo_dir, f) for f in files],
+            'lat': gpx_df['lat'].iloc[:len(files)].to_numpy(),
+            'lon': gpx_df['lon'].iloc[:len(files)].to_numpy(),
+            'color': '#FF0000',
+            'scene': 'City (90%)',
+        })
+
+
+@pytest.fixture
+def inline(monkeypatch):
+    InlinePool.instances = []
+    monkeypatch.setattr(batch, 'ProcessPoolExecutor', InlinePool)
+    monkeypatch.setattr('src.analyzer.ImageAnalyzer', StubAnalyzer)
+
+
+@pytest.fixture
+def archive(tmp_path):
+    good = tmp_path / 'archive' / 'good'
+    good.mkdir(parents=True)
+    create_mock_gpx(duration=120, seed=0, output_path=str(good / 'run.gpx'))
+    Image.new('RGB', (40, 30), (0, 120, 0)).save(good / 'photo.jpg')
+
+    broken = tmp_path / 'archive' / 'broken'
+    broken.mkdir()
+    (broken / 'run.gpx').write_text('<gpx><trk><trkseg><trkpt lat="x" lon="1"/></trkseg></trk></gpx>')
+    return tmp_path / 'archive'
+
+
+def test_manifest_paths_are_resolved(tmp_path, archive):
+    manifest = tmp_path / 'runs.json'
+    manifest.write_text(json.dumps([
+        {'name': 'Morning run', 'gpx': 'archive/good/run.gpx', 'photos': 'archive/good'},
+        {'gpx': 'archive/broken/run.gpx'},
+    ]))
+    csv_manifest = tmp_path / 'runs.csv'
+    csv_manifest.write_text('name,gpx,photos\nMorning run,archive/good/run.gpx,archive/good\n,archive/broken/run.gpx,\n')
+
+    for source in (manifest, csv_manifest):
+        runs = batch.discover_runs(str(source))
+        assert [(run.name, run.gpx_path, run.photo_dir) for run in runs] == [
+            ('Morning run', str(archive / 'good' / 'run.gpx'), str(archive / 'good')),
+            ('run', str(archive / 'broken' / 'run.gpx'), None),
+        ]
+
+
+def test_failed_run_does_not_stop_the_batch(inline, archive):
+    runs = batch.discover_runs(str(archive))
+    runs.append(batch.Run('missing', str(archive / 'missing.gpx')))
+    output_dir = archive.parent / 'out'
+
+    batch.run_batch(runs, str(output_dir), workers=1, render_options={'aura_mode': 'circle'})
+
+    by_name = {run.name: run for run in runs}
+    assert by_name['good'].status == 'done'
+    assert by_name['good'].photos == 1
+    assert os.path.exists(by_name['good'].output)
+    assert by_name['broken'].status == 'failed' and by_name['broken'].error.startswith('gpx_load')
+    assert by_name['missing'].status == 'failed' and by_name['missing'].output is None
+
+
+def test_in_flight_work_is_bounded(inline, tmp_path, archive):
+    good_gpx = str(archive / 'good' / 'run.gpx')
+    runs = [batch.Run(f'run_{i}', good_gpx) for i in range(7)]
+
+    batch.run_batch(runs, str(tmp_path / 'out'), workers=1)
+
+    assert all(run.status == 'done' for run in runs)
+    assert InlinePool.instances[0].max_outstanding <= batch.MAX_IN_FLIGHT_PER_WORKER
+
+
+def test_main_writes_summary(inline, monkeypatch, tmp_path, archive):
+    summary_path = tmp_path / 'reports' / 'nested' / 'summary.json'
+    monkeypatch.setattr(sys, 'argv', [
+        'batch.py', str(archive), '--output-dir', str(tmp_path / 'out'), '--workers', '1',
+        '--summary', str(summary_path), '--color-by', 'pace',
+    ])
+
+    assert batch.main() == 1
+
+    summary = json.loads(summary_path.read_text(encoding='utf-8'))
+    assert (summary['runs_total'], summary['runs_done'], summary['runs_failed']) == (2, 1, 1)
+    runs = {run['name']: run for run in summary['runs']}
+    assert runs['good']['status'] == 'done'
+    assert runs['good']['output'] == str(tmp_path / 'out' / 'good.html')
+    assert set(runs['good']['timings']) == {'gpx_load', 'photo_analysis', 'render', 'serialize'}
+    assert runs['broken']['status'] == 'failed'
+
+
+def test_cli_passes_max_hr_to_renderer(inline, monkeypatch, tmp_path, archive):
+    captured = {}
+    monkeypatch.setattr(batch, 'run_batch', lambda runs, output_dir, workers, **kwargs: captured.update(kwargs))
+    monkeypatch.setattr(sys, 'argv', [
+        'batch.py', str(archive), '--output-dir', str(tmp_path / 'out'), '--max-hr', '185', '--color-by', 'hr_zone',
+    ])
+
+    batch.main()
+    assert captured['render_options']['max_hr'] == 185.0
+    assert captured['render_options']['color_by'] == 'hr_zone'
+
+
+def test_cli_rejects_unknown_choices(monkeypatch, archive):
+    monkeypatch.setattr(sys, 'argv', ['batch.py', str(archive), '--aura-mode', 'sparkles'])
+    with pytest.raises(SystemExit):
+        batch.main()
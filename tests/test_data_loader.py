@@ -0,0 +1,96 @@
+import os
+
+import pandas as pd
+import pytest
+
+from generage_mock import create_mock_gpx
+from src.data_loader import DataLoader
+
+GARMIN_GPX = """<?xml version="1.0" encoding="UTF-8"?>
+<gpx version="1.1" creator="test" xmlns="http://www.topografix.com/GPX/1/1"
+     xmlns:gpxtpx="http://www.garmin.com/xmlschemas/TrackPointExtension/v1">
+  <trk><trkseg>
+    <trkpt lat="37.5000" lon="127.0000"><ele>12.5</ele><time>2024-05-01T07:00:00Z</time>
+      <extensions><gpxtpx:TrackPointExtension><gpxtpx:hr>141</gpxtpx:hr></gpxtpx:TrackPointExtension></extensions>
+    </trkpt>
+    <trkpt lat="37.5001" lon="127.0001"><ele>12.7</ele><time>2024-05-01T07:00:01Z</time>
+      <extensions><gpxtpx:TrackPointExtension><gpxtpx:hr>40000</gpxtpx:hr></gpxtpx:TrackPointExtension></extensions>
+    </trkpt>
+    <trkpt lat="37.5002" lon="127.0002"><ele>12.9</ele><time>2024-05-01T07:00:02Z</time>
+      <desc>hr=150</desc>
+      <extensions><gpxtpx:TrackPointExtension><gpxtpx:hr>155</gpxtpx:hr></gpxtpx:TrackPointExtension></extensions>
+    </trkpt>
+    <trkpt lat="37.5003" lon="127.0003"><time>2024-05-01T07:00:03Z</time>
+      <extensions><gpxtpx:TrackPointExtension><gpxtpx:hr>147</gpxtpx:hr></gpxtpx:TrackPointExtension></extensions>
+    </trkpt>
+  </trkseg></trk>
+</gpx>
+"""
+
+
+@pytest.fixture
+def garmin_gpx(tmp_path):
+    path = tmp_path / 'garmin.gpx'
+    path.write_text(GARMIN_GPX, encoding='utf-8')
+    return str(path)
+
+
+@pytest.fixture
+def mock_gpx(tmp_path):
+    return create_mock_gpx(duration=600, seed=1, output_path=str(tmp_path / 'mock_run.gpx'))
+
+
+@pytest.mark.parametrize('source', ['mock_gpx', 'garmin_gpx'])
+def test_stream_and_gpxpy_parsers_match(source, request):
+    path = request.getfixturevalue(source)
+    streamed = DataLoader(path, parser='stream', cache='off').load_gpx_data()
+    parsed = DataLoader(path, parser='gpxpy', cache='off').load_gpx_data()
+
+    assert not streamed.empty
+    assert streamed['heart_rate'].notna().all()
+    pd.testing.assert_frame_equal(streamed, parsed)
+
+
+def test_garmin_heart_rates(garmin_gpx):
+    df = DataLoader(garmin_gpx, parser='stream', cache='off').load_gpx_data()
+    # 범위 밖의 값(40000)은 결측으로 보고 앞 값으로 채움, description 이 확장 요소보다 앞섬
+    assert df['heart_rate'].tolist() == [141, 141, 150, 147]
+
+
+@pytest.mark.parametrize('cache', ['feather', 'parquet'])
+def test_sidecar_cache_hit_and_invalidation(garmin_gpx, cache, monkeypatch):
+    pytest.importorskip('pyarrow')
+    from src import data_loader
+
+    parsed = DataLoader(garmin_gpx, cache=cache).load_gpx_data()
+    assert os.path.exists(f"{garmin_gpx}.{cache}")
+
+    # 캐시 적중: XML 을 다시 파싱하지 않음
+    monkeypatch.setattr(DataLoader, '_load_streaming', lambda self: pytest.fail("GPX parsed again"))
+    pd.testing.assert_frame_equal(DataLoader(garmin_gpx, cache=cache).load_gpx_data(), parsed)
+    monkeypatch.undo()
+
+    # 내용이 바뀌면(크기 동일) 캐시를 버리고 다시 파싱
+    with open(garmin_gpx, encoding='utf-8') as f:
+        changed = f.read().replace('<gpxtpx:hr>141<', '<gpxtpx:hr>142<')
+    with open(garmin_gpx, 'w', encoding='utf-8') as f:
+        f.write(changed)
+    os.utime(garmin_gpx, ns=(0, os.stat(f"{garmin_gpx}.{cache}").st_mtime_ns + 10 ** 9))
+    assert DataLoader(garmin_gpx, cache=cache).load_gpx_data()['heart_rate'].iloc[0] == 142
+
+    # 수정 시각만 바뀌면 해시로 확인한 뒤 서명을 갱신하여, 다음 로딩은 해시 없이 적중
+    os.utime(garmin_gpx, ns=(0, os.stat(garmin_gpx).st_mtime_ns + 10 ** 9))
+    hashed = []
+    real_hash_file = data_loader.hash_file
+    monkeypatch.setattr(data_loader, 'hash_file', lambda path: hashed.append(path) or real_hash_file(path))
+    monkeypatch.setattr(DataLoader, '_load_streaming', lambda self: pytest.fail("GPX parsed again"))
+
+    assert DataLoader(garmin_gpx, cache=cache).load_gpx_data()['heart_rate'].iloc[0] == 142
+    assert hashed == [garmin_gpx]
+    assert DataLoader(garmin_gpx, cache=cache).load_gpx_data()['heart_rate'].iloc[0] == 142
+    assert hashed == [garmin_gpx]
+
+
+def test_sidecar_cache_off_by_default(garmin_gpx):
+    DataLoader(garmin_gpx).load_gpx_data()
+    assert not [name for name in os.listdir(os.path.dirname(garmin_gpx)) if name != 'garmin.gpx']
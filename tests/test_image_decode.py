@@ -0,0 +1,56 @@
+import pytest
+from PIL import Image
+
+from src.image_decode import decode_image
+
+MIN_SIZE = 64
+
+
+def save_png(tmp_path, img, **params):
+    path = tmp_path / f"{img.mode.replace(';', '_')}.png"
+    img.save(path, **params)
+    return str(path)
+
+
+def palette_image(size):
+    return Image.new('RGB', size, (200, 30, 30)).quantize(colors=4)
+
+
+@pytest.mark.parametrize('make_image, params, expected_mode', [
+    (lambda size: palette_image(size), {}, 'RGB'),
+    (lambda size: palette_image(size), {'transparency': 0}, 'RGBA'),
+    (lambda size: Image.new('1', size, 1), {}, 'L'),
+    (lambda size: Image.new('I;16', size, 40000), {}, 'L'),
+    (lambda size: Image.new('RGBA', size, (10, 20, 30, 128)), {}, 'RGBA'),
+])
+def test_reduces_png_modes(tmp_path, make_image, params, expected_mode):
+    path = save_png(tmp_path, make_image((MIN_SIZE * 5, MIN_SIZE * 4)), **params)
+
+    with decode_image(path, MIN_SIZE, mode=None) as img:
+        assert img.mode == expected_mode
+        # 짧은 변 256 -> 정수 배(4) 축소 후에도 MIN_SIZE 이상
+        assert img.size == (MIN_SIZE * 5 // 4, MIN_SIZE)
+
+    with decode_image(path, MIN_SIZE) as img:
+        assert img.mode == 'RGB'
+        assert min(img.size) >= MIN_SIZE
+
+
+def test_16bit_keeps_gray_level(tmp_path):
+    path = save_png(tmp_path, Image.new('I;16', (MIN_SIZE * 2, MIN_SIZE * 2), 32768))
+
+    with decode_image(path, MIN_SIZE, mode=None) as img:
+        assert img.getpixel((0, 0)) == 128
+
+
+def test_exif_rotated_jpeg(tmp_path):
+    path = str(tmp_path / 'rotated.jpg')
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: 90도 회전 필요
+    Image.new('RGB', (MIN_SIZE * 8, MIN_SIZE * 4), (0, 128, 255)).save(path, exif=exif)
+
+    with decode_image(path, MIN_SIZE) as img:
+        width, height = img.size
+        assert width < height
+        assert width >= MIN_SIZE
+        assert height == 2 * width
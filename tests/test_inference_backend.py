@@ -0,0 +1,63 @@
+import pytest
+from PIL import Image
+
+from src.inference_backend import InferenceConfig
+
+
+@pytest.mark.parametrize('key, expected', [
+    ('openai/clip-vit-base-patch32', ('openai/clip-vit-base-patch32', 'torch', 'none')),
+    ('openai/clip-vit-base-patch32@onnx+int8', ('openai/clip-vit-base-patch32', 'onnx', 'int8')),
+    ('openai/clip-vit-base-patch32@torchscript+none', ('openai/clip-vit-base-patch32', 'torchscript', 'none')),
+    # 로컬 경로의 '@' 는 백엔드 구분자가 아님
+    ('/home/runner@host/models/clip', ('/home/runner@host/models/clip', 'torch', 'none')),
+    ('/home/runner@host/models/clip@torch+int8', ('/home/runner@host/models/clip', 'torch', 'int8')),
+])
+def test_parse(key, expected):
+    config = InferenceConfig.parse(key)
+    assert (config.model_id, config.backend, config.quantize) == expected
+
+
+@pytest.mark.parametrize('config', [
+    InferenceConfig('openai/clip-vit-base-patch32', 'torch', 'none'),
+    InferenceConfig('openai/clip-vit-base-patch32', 'onnx', 'int8'),
+    InferenceConfig('/data/user@example/clip', 'torchscript', 'int8'),
+])
+def test_key_round_trip(config):
+    parsed = InferenceConfig.parse(config.key)
+    assert parsed.to_dict() == config.to_dict()
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        InferenceConfig('openai/clip-vit-base-patch32', 'tensorrt', 'none')
+
+
+def test_stub_model_classifies_batches(tmp_path):
+    torch = pytest.importorskip('torch')
+    from benchmarks.stub_model import STUB_MODEL_ID, register_stub_model
+    from src.analyzer import ImageAnalyzer
+    from src.model_registry import ModelRegistry
+
+    photo_files = []
+    for i in range(5):
+        path = tmp_path / f"photo_{i}.jpg"
+        Image.new('RGB', (320, 240), (i * 40, 120, 60)).save(path)
+        photo_files.append(str(path))
+
+    registry = ModelRegistry()
+    register_stub_model(registry)
+    analyzer = ImageAnalyzer(str(tmp_path), model_id=STUB_MODEL_ID, registry=registry,
+                             batch_size=2, scene_cache=False)
+
+    batches = list(analyzer.iter_batches(photo_files))
+    assert [len(loaded) for loaded in batches] == [2, 2, 1]
+
+    for loaded in batches:
+        paths, tensors = zip(*loaded)
+        probs = analyzer.predict_probs(torch.stack(tensors))
+        assert probs.shape == (len(paths), len(analyzer.candidates))
+        assert torch.allclose(probs.sum(dim=1), torch.ones(len(paths)))
+
+        best_idx = probs[0].argmax().item()
+        color, label = analyzer.describe(best_idx, probs[0][best_idx].item())
+        assert color.startswith('#') and label.endswith('%)')
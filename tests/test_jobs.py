@@ -0,0 +1,115 @@
+import io
+import os
+import threading
+import time
+
+import pytest
+
+from src.jobs import GENERIC_ERROR_MESSAGE, JobFailed, JobQueue, QueueFullError
+
+
+def wait_for(job_queue, job_id, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = job_queue.status(job_id)
+        if status and status['status'] in ('done', 'failed'):
+            return status
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def blocking_queue(release, **kwargs):
+    """
+    워커 하나가 release 가 설정될 때까지 첫 작업에 묶여 있는 대기열.
+    """
+    job_queue = JobQueue(max_workers=1, max_queue=1, **kwargs)
+    started = threading.Event()
+
+    def block(job):
+        started.set()
+        release.wait(10)
+        return 'first'
+
+    first = job_queue.submit(block)
+    assert started.wait(10)
+    return job_queue, first
+
+
+def test_submit_raises_when_queue_is_full():
+    release = threading.Event()
+    job_queue, first = blocking_queue(release)
+    try:
+        second = job_queue.submit(lambda job: 'second')
+        assert job_queue.is_full()
+        with pytest.raises(QueueFullError):
+            job_queue.submit(lambda job: 'third')
+    finally:
+        release.set()
+
+    assert wait_for(job_queue, first.id)['status'] == 'done'
+    assert wait_for(job_queue, second.id)['status'] == 'done'
+    assert job_queue.result(second.id) == 'second'
+
+
+def test_upload_rejected_with_503_when_queue_is_full(web, monkeypatch):
+    release = threading.Event()
+    job_queue, _ = blocking_queue(release)
+    monkeypatch.setattr(web, 'job_queue', job_queue)
+    try:
+        job_queue.submit(lambda job: 'queued')
+        response = web.app.test_client().post(
+            '/', data={'gpx_file': (io.BytesIO(b'<gpx/>'), 'run.gpx')}, content_type='multipart/form-data',
+        )
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '30'
+        # 파일을 저장하기 전에 거절하므로 세션 폴더가 생기지 않음
+        root_dir = web.session_store.root_dir
+        assert not os.path.isdir(root_dir) or not os.listdir(root_dir)
+    finally:
+        release.set()
+
+
+def test_result_is_written_to_file_and_streamed(web, monkeypatch):
+    monkeypatch.setattr(web, 'RESULT_CHUNK_SIZE', 1024)
+    map_html = '<div class="map">' + 'x' * 10000 + '</div>'
+    job = web.job_queue.submit(lambda job: map_html)
+    assert wait_for(web.job_queue, job.id)['status'] == 'done'
+
+    # 결과는 메모리가 아니라 state_dir 의 파일로 보관
+    assert job.result is None
+    with open(web.job_queue.result_path(job.id), encoding='utf-8') as f:
+        assert f.read() == map_html
+
+    response = web.app.test_client().get(f'/jobs/{job.id}/result')
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.get_data(as_text=True) == web.RESULT_PAGE_HEAD + map_html + web.RESULT_PAGE_TAIL
+
+
+def test_finished_jobs_are_trimmed_but_status_survives(tmp_path):
+    job_queue = JobQueue(max_workers=1, max_queue=8, max_finished=2, state_dir=str(tmp_path))
+    jobs = [job_queue.submit(lambda job, i=i: f'result {i}') for i in range(4)]
+    # 완료 처리(정리 포함)가 모두 끝날 때까지 대기
+    job_queue._queue.join()
+
+    assert [job_queue.get(job.id) is not None for job in jobs] == [False, False, True, True]
+    # 메모리에서 빠진 작업도 state_dir 의 기록으로 상태와 결과를 제공
+    assert job_queue.status(jobs[0].id)['status'] == 'done'
+    assert job_queue.result(jobs[0].id) == 'result 0'
+
+
+def test_only_job_failed_messages_reach_the_client(web):
+    def user_error(job):
+        raise JobFailed("지도 생성 실패. GPX 파일 확인 필요.")
+
+    def internal_error(job):
+        raise RuntimeError("cannot open /srv/runners-view/data/uploads/secret/track.gpx")
+
+    failed = web.job_queue.submit(user_error)
+    crashed = web.job_queue.submit(internal_error)
+    assert wait_for(web.job_queue, failed.id)['error'] == "지도 생성 실패. GPX 파일 확인 필요."
+    assert wait_for(web.job_queue, crashed.id)['error'] == GENERIC_ERROR_MESSAGE
+
+    response = web.app.test_client().get(f'/jobs/{crashed.id}/result')
+    assert response.status_code == 500
+    assert response.get_data(as_text=True) == GENERIC_ERROR_MESSAGE
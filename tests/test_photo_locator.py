@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.photo_locator import PhotoLocator
+
+START = datetime(2024, 1, 1, 0, 0, 0)
+KST = timezone(timedelta(hours=9))
+
+
+@pytest.fixture
+def gpx_df():
+    # 00:00 ~ 01:00 UTC, 1초 간격, 위도가 일정하게 증가하는 경로
+    n = 3601
+    return pd.DataFrame({
+        'time': pd.date_range(START, periods=n, freq='s', tz='UTC'),
+        'lat': np.linspace(37.0, 37.1, n),
+        'lon': np.full(n, 127.0),
+    })
+
+
+def lat_at(gpx_df, seconds):
+    return gpx_df['lat'].iloc[seconds]
+
+
+def meta(time):
+    return {'time': time, 'lat': None, 'lon': None}
+
+
+def test_offset_aware_photo_is_matched(gpx_df):
+    result = PhotoLocator(gpx_df).locate([meta(datetime(2024, 1, 1, 9, 30, tzinfo=KST))])
+
+    assert result['placement'].tolist() == ['exif_time']
+    assert result['lat'].iloc[0] == pytest.approx(lat_at(gpx_df, 1800))
+
+
+def test_naive_local_time_offset_is_inferred(gpx_df):
+    # 시간대 정보 없는 카메라 현지 시각(KST)
+    metas = [meta(START + timedelta(hours=9, minutes=m)) for m in (10, 30, 50)]
+    locator = PhotoLocator(gpx_df)
+
+    assert locator.infer_utc_offset(
+        [pd.Timestamp(m['time']).value for m in metas]
+    ) == 9 * 3600
+
+    result = locator.locate(metas)
+    assert result['placement'].tolist() == ['exif_time'] * 3
+    assert result['lat'].iloc[1] == pytest.approx(lat_at(gpx_df, 1800))
+
+
+def test_naive_local_time_with_explicit_offset(gpx_df):
+    result = PhotoLocator(gpx_df, utc_offset_s=9 * 3600).locate([meta(START + timedelta(hours=9, minutes=30))])
+
+    assert result['placement'].tolist() == ['exif_time']
+    assert result['lat'].iloc[0] == pytest.approx(lat_at(gpx_df, 1800))
+
+
+def test_naive_time_already_in_utc_is_not_shifted(gpx_df):
+    result = PhotoLocator(gpx_df).locate([meta(START + timedelta(minutes=30))])
+
+    assert result['placement'].tolist() == ['exif_time']
+    assert result['lat'].iloc[0] == pytest.approx(lat_at(gpx_df, 1800))
+
+
+def test_out_of_window_photo_is_placed_along_route(gpx_df):
+    metas = [
+        meta(datetime(2024, 1, 1, 0, 30, tzinfo=timezone.utc)),
+        meta(datetime(2024, 1, 1, 5, 0, tzinfo=timezone.utc)),
+    ]
+    result = PhotoLocator(gpx_df).locate(metas)
+
+    assert result['placement'].tolist() == ['exif_time', 'unmatched']
+    assert result[['lat', 'lon']].notna().all().all()
+    assert gpx_df['lat'].min() <= result['lat'].iloc[1] <= gpx_df['lat'].max()
+
+
+def test_naive_outlier_does_not_change_inferred_offset(gpx_df):
+    metas = [meta(START + timedelta(hours=9, minutes=m)) for m in (10, 30)]
+    metas.append(meta(START + timedelta(hours=20)))
+    result = PhotoLocator(gpx_df).locate(metas)
+
+    assert result['placement'].tolist() == ['exif_time', 'exif_time', 'unmatched']
+    assert result['lat'].notna().all()
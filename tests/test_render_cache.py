@@ -0,0 +1,128 @@
+import io
+import os
+
+import pandas as pd
+import pytest
+from PIL import Image
+
+from generage_mock import create_mock_gpx
+from src.render_cache import RenderCache, hash_inputs
+
+pytestmark = pytest.mark.filterwarnings('ignore:CartoDB tiles')
+
+
+def jpeg_bytes(color):
+    buf = io.BytesIO()
+    Image.new('RGB', (48, 32), color).save(buf, 'JPEG')
+    return buf.getvalue()
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    gpx = tmp_path / 'track.gpx'
+    gpx.write_text('<gpx><trk><trkseg><trkpt lat="1" lon="2"/></trkseg></trk></gpx>')
+    photo = tmp_path / 'a.jpg'
+    photo.write_bytes(jpeg_bytes((255, 0, 0)))
+    return str(gpx), [str(photo)]
+
+
+def test_key_changes_with_inputs(tmp_path, inputs):
+    gpx, photos = inputs
+    options = {'render': {'aura_mode': 'layer'}}
+    key = hash_inputs(gpx, photos, options)
+    assert hash_inputs(gpx, photos, {'render': {'aura_mode': 'layer'}}) == key
+
+    assert hash_inputs(gpx, photos, {'render': {'aura_mode': 'rings'}}) != key
+    assert hash_inputs(gpx, [], options) != key
+
+    renamed = tmp_path / 'b.jpg'
+    renamed.write_bytes(open(photos[0], 'rb').read())
+    assert hash_inputs(gpx, [str(renamed)], options) != key
+
+    with open(photos[0], 'wb') as f:
+        f.write(jpeg_bytes((0, 0, 255)))
+    changed_photo = hash_inputs(gpx, photos, options)
+    assert changed_photo != key
+
+    with open(gpx, 'a') as f:
+        f.write('\n')
+    assert hash_inputs(gpx, photos, options) not in (key, changed_photo)
+
+
+def set_mtime(cache, key, mtime):
+    os.utime(cache._path(key), (mtime, mtime))
+
+
+def test_evicts_least_recently_used_by_count(tmp_path):
+    cache = RenderCache(cache_dir=str(tmp_path), max_entries=2)
+    cache.put('a', 'A')
+    cache.put('b', 'B')
+    set_mtime(cache, 'a', 1000)
+    set_mtime(cache, 'b', 2000)
+    assert cache.get('a') == 'A'  # 사용하면 가장 최근 항목이 됨
+
+    cache.put('c', 'C')
+    assert cache.get('b') is None
+    assert cache.get('a') == 'A'
+    assert cache.get('c') == 'C'
+    assert cache.stats()['entries'] == 2
+
+
+def test_evicts_by_size(tmp_path):
+    cache = RenderCache(cache_dir=str(tmp_path), max_bytes=250)
+    cache.put('a', 'x' * 100)
+    cache.put('b', 'y' * 100)
+    set_mtime(cache, 'a', 1000)
+    set_mtime(cache, 'b', 2000)
+
+    cache.put('c', 'z' * 100)
+    assert cache.get('a') is None
+    assert cache.get('b') == 'y' * 100
+    assert cache.stats()['bytes'] == 200
+
+
+def fake_analyze_photos(gpx_df, photo_dir, **kwargs):
+    files = sorted(f for f in os.listdir(photo_dir) if f.endswith('.jpg'))
+    return pd.DataFrame({
+        'filename': files,
+        'filepath': [os.path.join(photo_dir, f) for f in files],
+        'lat': gpx_df['lat'].iloc[:len(files)].to_numpy(),
+        'lon': gpx_df['lon'].iloc[:len(files)].to_numpy(),
+        'color': '#FF0000',
+        'scene': 'City (90%)',
+    })
+
+
+def test_resubmission_hits_cache_across_sessions(web, wait_for_job, tmp_path, monkeypatch):
+    monkeypatch.setattr(web, 'analyze_photos', fake_analyze_photos)
+    monkeypatch.setattr(web, 'SERVE_THUMBNAILS', True)
+    gpx = open(create_mock_gpx(duration=120, seed=0, output_path=str(tmp_path / 'run.gpx')), 'rb').read()
+    client = web.app.test_client()
+
+    def upload():
+        response = client.post(
+            '/',
+            data={'gpx_file': (io.BytesIO(gpx), 'run.gpx'), 'photo_files': [(io.BytesIO(jpeg_bytes((9, 9, 9))), 'p.jpg')]},
+            content_type='multipart/form-data', headers={'Accept': 'application/json'},
+        )
+        body = response.get_json()
+        assert wait_for_job(client, body['job_id'])['status'] == 'done'
+        return body['session_id'], body['job_id'], client.get(f"/jobs/{body['job_id']}/result")
+
+    first_session, _, _ = upload()
+    assert web.render_cache.stats()['hits'] == 0
+
+    session_id, job_id, response = upload()
+    assert web.render_cache.stats()['hits'] == 1
+
+    html = response.get_data(as_text=True)
+    assert f"/thumbs/{session_id}/p.jpg.jpg" in html
+    assert first_session not in html
+    assert web.THUMBS_URL_PLACEHOLDER not in html
+    assert client.get(f"/thumbs/{session_id}/p.jpg.jpg").status_code == 200
+
+    # 완료된 결과는 ETag 가 같으면 본문 없이 304
+    etag = response.headers['ETag']
+    cached = client.get(f"/jobs/{job_id}/result", headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.get_data() == b''
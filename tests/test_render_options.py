@@ -0,0 +1,50 @@
+import pytest
+
+from app import parse_render_options
+
+
+def test_valid_options_are_converted():
+    options = parse_render_options({
+        'aura_mode': 'circle', 'simplify_tolerance_m': '2.5', 'hr_bins': 5, 'color_by': 'pace', 'split_m': 1000,
+        'max_hr': '190',
+    })
+    assert options == {
+        'aura_mode': 'circle', 'simplify_tolerance_m': 2.5, 'hr_bins': 5, 'color_by': 'pace', 'split_m': 1000.0,
+        'max_hr': 190.0,
+    }
+
+
+def test_null_means_default():
+    assert parse_render_options({'hr_bins': None, 'aura_mode': None}) == {}
+
+
+@pytest.mark.parametrize('data', [
+    {'hr_bins': 0},
+    {'hr_bins': -3},
+    {'simplify_tolerance_m': -1},
+    {'simplify_tolerance_m': 'nan'},
+    {'split_m': -1000},
+    {'split_m': 1},
+    {'max_hr': 0},
+    {'max_hr': 400},
+    {'aura_mode': 'sparkles'},
+    {'color_by': 'cadence'},
+    {'hr_bins': 'many'},
+    {'unknown': 1},
+    ['aura_mode'],
+])
+def test_invalid_options_are_rejected(data):
+    with pytest.raises(ValueError):
+        parse_render_options(data)
+
+
+def test_restyle_returns_400_for_invalid_options():
+    import app
+
+    session_id = 'test-session'
+    app.session_store.create(session_id)
+    try:
+        response = app.app.test_client().post(f'/sessions/{session_id}/render', json={'hr_bins': -1})
+        assert response.status_code == 400
+    finally:
+        app.session_store.delete(session_id)
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+from PIL import Image
+
+from src import analyzer as analyzer_module
+from src.analyzer import ImageAnalyzer
+from src.scene_cache import SceneCache
+
+
+def gpx_df():
+    return pd.DataFrame({
+        'time': pd.date_range('2024-05-01 07:00', periods=10, freq='s', tz='UTC'),
+        'lat': np.linspace(37.50, 37.51, 10),
+        'lon': np.linspace(127.00, 127.01, 10),
+    })
+
+
+def test_default_cache_is_not_opened_without_photos(tmp_path, monkeypatch):
+    def fail():
+        raise AssertionError("scene cache opened")
+
+    monkeypatch.setattr(analyzer_module, 'get_default_cache', fail)
+    analyzer = ImageAnalyzer(str(tmp_path))
+    assert analyzer.analyze_photos(gpx_df()).empty
+    # 이전 결과로 모두 재사용되어 조회할 사진이 없어도 캐시를 열지 않음
+    assert analyzer._lookup_cache([]) == {}
+
+
+def test_default_cache_opened_on_first_lookup(tmp_path, monkeypatch):
+    cache = SceneCache(str(tmp_path / 'scene_cache.sqlite'))
+    monkeypatch.setattr(analyzer_module, 'get_default_cache', lambda: cache)
+    Image.new('RGB', (32, 32)).save(tmp_path / 'a.jpg')
+
+    analyzer = ImageAnalyzer(str(tmp_path))
+    assert analyzer._lookup_cache([str(tmp_path / 'a.jpg')]) == {}
+    assert analyzer.scene_cache is cache
+    assert cache.stats()['misses'] == 1
+
+
+def test_metrics_report_scene_cache_counters(tmp_path, monkeypatch):
+    import app
+    from src import scene_cache
+
+    monkeypatch.setattr(scene_cache, '_default_cache', None)
+    assert app.app.test_client().get('/metrics').get_json()['scene_cache'] is None
+
+    cache = SceneCache(str(tmp_path / 'scene_cache.sqlite'))
+    cache.put('k', [0.25, 0.75], 1, 'Park')
+    cache.get('k')
+    cache.get('missing')
+    monkeypatch.setattr(scene_cache, '_default_cache', cache)
+
+    stats = app.app.test_client().get('/metrics').get_json()['scene_cache']
+    assert stats == {'entries': 1, 'max_entries': cache.max_entries, 'hits': 1, 'misses': 1}
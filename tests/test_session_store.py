@@ -0,0 +1,79 @@
+import os
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+from src.session_store import SessionStore
+
+TTL_SECONDS = 3600
+
+# 다른 워커 프로세스처럼 세션을 잠그고, 표준 입력이 닫힐 때까지 잡고 있음
+HOLD_LOCK = """
+import sys
+from src.session_store import SessionStore
+with SessionStore(sys.argv[1]).lock(sys.argv[2]):
+    print('locked', flush=True)
+    sys.stdin.read()
+"""
+
+
+def make_session(store, session_id, age_seconds=0):
+    session_dir = store.create(session_id)
+    store.save(session_id, render_options={'aura_mode': 'layer'}, gpx_df=pd.DataFrame({'lat': [1.0]}))
+    mtime = time.time() - age_seconds
+    os.utime(session_dir, (mtime, mtime))
+    return session_dir
+
+
+def test_cleanup_removes_only_expired_sessions(tmp_path):
+    store = SessionStore(str(tmp_path), ttl_seconds=TTL_SECONDS)
+    make_session(store, 'old', age_seconds=TTL_SECONDS + 60)
+    make_session(store, 'fresh', age_seconds=60)
+
+    assert store.cleanup() == 1
+    assert not store.exists('old')
+    assert store.exists('fresh')
+    assert store.load_render_options('fresh') == {'aura_mode': 'layer'}
+
+
+def test_touch_extends_expiry(tmp_path):
+    store = SessionStore(str(tmp_path), ttl_seconds=TTL_SECONDS)
+    make_session(store, 'used', age_seconds=TTL_SECONDS + 60)
+    store.touch('used')
+
+    assert store.cleanup() == 0
+    assert store.exists('used')
+
+
+def test_lock_is_exclusive_within_process(tmp_path):
+    store = SessionStore(str(tmp_path), ttl_seconds=TTL_SECONDS)
+    make_session(store, 'busy')
+
+    with store.lock('busy'):
+        assert not store.lock('busy').acquire(blocking=False)
+    other = store.lock('busy')
+    assert other.acquire(blocking=False)
+    other.release()
+
+
+def test_cleanup_skips_session_locked_by_another_process(tmp_path):
+    store = SessionStore(str(tmp_path), ttl_seconds=TTL_SECONDS)
+    make_session(store, 'busy', age_seconds=TTL_SECONDS + 60)
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    holder = subprocess.Popen(
+        [sys.executable, '-c', HOLD_LOCK, str(tmp_path), 'busy'],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, cwd=project_root,
+    )
+    try:
+        assert holder.stdout.readline().strip() == 'locked'
+        assert store.cleanup() == 0
+        assert store.exists('busy')
+    finally:
+        holder.stdin.close()
+        holder.wait(timeout=10)
+
+    assert store.cleanup() == 1
+    assert not store.exists('busy')
@@ -0,0 +1,23 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 앱/CLI 임포트 시점에 로딩되면 안 되는 무거운 모듈 (모델은 첫 분류 시, folium 은 첫 렌더링 시 로딩)
+HEAVY_MODULES = ('torch', 'transformers', 'folium', 'branca')
+
+
+@pytest.mark.parametrize('module', ['app', 'main', 'batch'])
+def test_import_does_not_load_heavy_modules(module):
+    script = (
+        f"import sys, {module}; "
+        f"loaded = [name for name in {HEAVY_MODULES!r} if name in sys.modules]; "
+        f"assert not loaded, loaded"
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', script], cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
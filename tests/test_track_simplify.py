@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from generage_mock import create_mock_gpx
+from src.data_loader import DataLoader
+from src.track_simplify import (
+    bin_values, color_breakpoints, median_filter, merge_short_runs, simplify_track,
+)
+from src.visualizer import ROUTE_COLOR_STEPS, ROUTE_MIN_RUN_POINTS, ROUTE_SMOOTHING_POINTS
+
+
+@pytest.fixture(scope='module')
+def mock_track(tmp_path_factory):
+    path = create_mock_gpx(
+        duration=14400, seed=0, output_path=str(tmp_path_factory.mktemp('gpx') / 'mock_run.gpx')
+    )
+    return DataLoader(path, cache='off').load_gpx_data()
+
+
+def route_bins(values, n_bins=ROUTE_COLOR_STEPS):
+    # Visualizer._add_route 와 같은 방식으로 색상 구간을 계산
+    smoothed = median_filter(values, ROUTE_SMOOTHING_POINTS)
+    bins = bin_values(smoothed, n_bins, values.min(), values.max())
+    return merge_short_runs(bins, ROUTE_MIN_RUN_POINTS)
+
+
+def test_median_filter_removes_spikes():
+    values = np.array([100, 100, 180, 100, 100, 100, 60, 100], dtype=float)
+    assert median_filter(values, 3).tolist() == [100] * 8
+    assert median_filter(values, 1).tolist() == values.tolist()
+
+
+def test_merge_short_runs():
+    bins = np.array([0, 0, 0, 1, 0, 0, 2, 2, 2, 2])
+    assert merge_short_runs(bins, 3).tolist() == [0, 0, 0, 0, 0, 0, 2, 2, 2, 2]
+    assert merge_short_runs(bins, 1).tolist() == bins.tolist()
+
+
+def test_mock_track_simplifies_and_keeps_colors(mock_track):
+    lat = mock_track['lat'].to_numpy()
+    lon = mock_track['lon'].to_numpy()
+    values = mock_track['heart_rate'].astype(float).ffill().bfill().to_numpy()
+    bins = route_bins(values)
+
+    kept = simplify_track(lat, lon, 2.0, bins=bins)
+    assert len(kept) < 0.15 * len(lat)
+
+    # 색이 바뀌는 지점은 모두 남아 있어야 함
+    mask = np.zeros(len(lat), dtype=bool)
+    mask[kept] = True
+    assert mask[color_breakpoints(bins)].all()
+
+    # 남긴 점에서 시작하는 선분 색(시작 점의 구간)으로 원래 모든 점의 색이 복원됨
+    segment_of = np.searchsorted(kept, np.arange(len(lat)), side='right') - 1
+    np.testing.assert_array_equal(bins[kept][segment_of], bins)
@@ -0,0 +1,102 @@
+import io
+
+import pytest
+
+from src import uploads
+from src.uploads import CappedSpool, UploadRejected, stream_to_file
+
+
+def test_capped_spool_discards_data_over_limit(tmp_path):
+    spool = CappedSpool(max_bytes=10)
+    spool.write(b'0123456789')
+    assert not spool.exceeded
+    spool.write(b'abc')
+    assert spool.exceeded
+    spool.seek(0)
+    assert spool.read() == b'0123456789'
+
+    with pytest.raises(UploadRejected):
+        stream_to_file(spool, str(tmp_path / 'out.jpg'), max_bytes=100)
+    assert not (tmp_path / 'out.jpg').exists()
+
+
+def test_oversized_photo_is_rejected_while_parsing(monkeypatch):
+    import app
+
+    monkeypatch.setattr(uploads, 'MAX_PHOTO_MB', 1)
+    monkeypatch.setattr(uploads, 'MAX_GPX_MB', 1)
+    session_id = 'test-upload-session'
+    app.session_store.create(session_id)
+    try:
+        photo = b'\xff\xd8\xff\xe0' + b'\0' * (2 * 1024 * 1024)
+        response = app.app.test_client().post(
+            f'/sessions/{session_id}/photos',
+            data={'photo_files': (io.BytesIO(photo), 'big.jpg')},
+            content_type='multipart/form-data',
+        )
+        assert response.status_code == 400
+        rejected = response.get_json()['rejected']
+        assert rejected[0]['filename'] == 'big.jpg'
+        assert 'exceeds' in rejected[0]['reason']
+    finally:
+        app.session_store.delete(session_id)
+
+
+def test_undecodable_photo_reason_hides_server_path():
+    import app
+
+    session_id = 'test-upload-session'
+    app.session_store.create(session_id)
+    try:
+        response = app.app.test_client().post(
+            f'/sessions/{session_id}/photos',
+            data={'photo_files': (io.BytesIO(b'\xff\xd8\xff\xe0' + b'garbage' * 10), 'broken.jpg')},
+            content_type='multipart/form-data',
+        )
+        assert response.status_code == 400
+        assert response.get_json()['rejected'] == [{'filename': 'broken.jpg', 'reason': 'not a valid image'}]
+    finally:
+        app.session_store.delete(session_id)
+
+
+def jpeg_bytes(color):
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.new('RGB', (32, 32), color).save(buf, 'JPEG')
+    return buf.getvalue()
+
+
+def test_same_name_upload_does_not_overwrite(tmp_path):
+    from werkzeug.datastructures import FileStorage
+
+    uploader = uploads.PhotoUploader()
+    first, _ = uploader.save_all([FileStorage(io.BytesIO(jpeg_bytes((255, 0, 0))), 'run.jpg')], str(tmp_path))
+    second, _ = uploader.save_all([FileStorage(io.BytesIO(jpeg_bytes((0, 0, 255))), 'run.jpg')], str(tmp_path))
+
+    assert first == ['run.jpg']
+    assert len(second) == 1 and second[0] != 'run.jpg' and second[0].endswith('.jpg')
+    assert (tmp_path / 'run.jpg').read_bytes() == jpeg_bytes((255, 0, 0))
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(first + second)
+
+
+def test_upload_response_lists_stored_names(monkeypatch):
+    import app
+
+    class StubJob:
+        id = 'stub-job'
+
+    monkeypatch.setattr(app, 'submit_session_job', lambda session_id: StubJob())
+    session_id = 'test-upload-session'
+    app.session_store.create(session_id)
+    try:
+        response = app.app.test_client().post(
+            f'/sessions/{session_id}/photos',
+            data={'photo_files': [(io.BytesIO(jpeg_bytes((0, 255, 0))), 'finish line.jpeg')]},
+            content_type='multipart/form-data',
+        )
+        assert response.status_code == 202
+        assert response.get_json()['saved'] == ['finish_line.jpg']
+        assert app.app.test_client().delete(f'/sessions/{session_id}/photos/finish_line.jpg').status_code == 202
+    finally:
+        app.session_store.delete(session_id)
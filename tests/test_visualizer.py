@@ -0,0 +1,94 @@
+import collections
+
+import numpy as np
+import pandas as pd
+import pytest
+from PIL import Image
+
+from src.visualizer import AURA_MODES, Visualizer
+
+# 사진 한 장이 늘어날 때 허용하는 HTML 증가량 (바이트, 썸네일은 URL 로 참조)
+MAX_BYTES_PER_PHOTO = {'layer': 300, 'circle': 700, 'rings': 60000}
+
+# 사진 수에 비례하는 지도 객체 수 (layer 는 아우라/마커가 각각 레이어 하나)
+CIRCLES_PER_PHOTO = {'layer': 0, 'circle': 1, 'rings': 100}
+
+pytestmark = pytest.mark.filterwarnings('ignore:CartoDB tiles')
+
+
+@pytest.fixture
+def gpx_df():
+    n = 500
+    return pd.DataFrame({
+        'lat': np.linspace(37.50, 37.51, n),
+        'lon': np.linspace(127.00, 127.01, n),
+        'heart_rate': np.linspace(120, 170, n),
+    })
+
+
+def make_photo_df(tmp_path, gpx_df, count):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"photo_{i}.jpg"
+        Image.new('RGB', (64, 48), (i % 256, 100, 50)).save(path)
+        paths.append(str(path))
+    idx = np.linspace(0, len(gpx_df) - 1, count).astype(int)
+    return pd.DataFrame({
+        'filename': [f"photo_{i}.jpg" for i in range(count)],
+        'filepath': paths,
+        'lat': gpx_df['lat'].to_numpy()[idx],
+        'lon': gpx_df['lon'].to_numpy()[idx],
+        'color': '#FF0000',
+        'scene': 'City (90%)',
+    })
+
+
+def render(gpx_df, photo_df, aura_mode, tmp_path):
+    m = Visualizer(gpx_df).create_map(
+        photo_df=photo_df, aura_mode=aura_mode, image_base_url='/thumbs/test', thumbnail_dir=str(tmp_path / 'thumbs')
+    )
+    children = collections.Counter(type(child).__name__ for child in m._children.values())
+    return children, len(m.get_root().render().encode('utf-8'))
+
+
+@pytest.mark.parametrize('aura_mode', AURA_MODES)
+def test_map_objects_and_html_size(tmp_path, gpx_df, aura_mode):
+    count = 40
+    base_children, base_bytes = render(gpx_df, None, aura_mode, tmp_path)
+    children, html_bytes = render(gpx_df, make_photo_df(tmp_path, gpx_df, count), aura_mode, tmp_path)
+    _, double_bytes = render(gpx_df, make_photo_df(tmp_path, gpx_df, 2 * count), aura_mode, tmp_path)
+
+    # 사진 마커는 사진 수와 관계없이 클러스터 레이어 하나
+    assert children['FastMarkerCluster'] == 1
+    assert children['Marker'] == 0
+    assert children['Circle'] == CIRCLES_PER_PHOTO[aura_mode] * count
+    assert children['GeoJson'] == (1 if aura_mode == 'layer' else 0)
+
+    extra = sum(children.values()) - sum(base_children.values())
+    assert extra == 1 + CIRCLES_PER_PHOTO[aura_mode] * count + children['GeoJson']
+    # 사진 레이어의 고정 비용(스크립트, 그라데이션 정의 등)을 빼고 사진당 증가량만 비교
+    assert double_bytes - html_bytes <= MAX_BYTES_PER_PHOTO[aura_mode] * count
+    assert html_bytes - base_bytes <= MAX_BYTES_PER_PHOTO[aura_mode] * count + 10000
+
+
+def test_layer_mode_object_count_does_not_grow_with_photos(tmp_path, gpx_df):
+    few, _ = render(gpx_df, make_photo_df(tmp_path, gpx_df, 5), 'layer', tmp_path)
+    many, _ = render(gpx_df, make_photo_df(tmp_path, gpx_df, 200), 'layer', tmp_path)
+
+    assert few == many
+
+
+def test_max_hr_makes_zones_comparable_across_runs(gpx_df):
+    easy = gpx_df.assign(heart_rate=gpx_df['heart_rate'] - 20)
+    zone_colors = []
+    for df in (gpx_df, easy):
+        vis = Visualizer(df)
+        vis.create_map(color_by='hr_zone', max_hr=200)
+        zone_colors.append(vis._route_values('hr_zone'))
+
+    # 고정 max_hr 기준이라 같은 심박수는 같은 존, 색상 범위도 러닝과 무관하게 1~5 존
+    (hard_zones, hard_range), (easy_zones, easy_range) = zone_colors
+    assert hard_range == easy_range == (1.0, 5.0)
+    assert hard_zones[0] == 2 and hard_zones[-1] == 4
+    assert easy_zones[0] == 1 and easy_zones[-1] == 3
+    assert 'hr_zone' not in gpx_df.columns